@@ -1,64 +1,97 @@
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional
 
 import httpx
 
+try:
+    import sentry_sdk
+except ImportError:
+    sentry_sdk = None
+
+from .inference import get_active_model, get_backend
 from .interventions import INTERVENTIONS
+from .jsonstream import JSONObjectStream
+from .metrics import metrics
+from .preprocess import estimate_tokens, split_into_chunks, trim_to_budget
+from .prompts import DEFAULT_PROMPT_VERSION, PROMPT_REGISTRY, select_prompt_variant, strip_reasoning
+from .residency import model_residency
+from .semantic_cache import SEMANTIC_CACHE_LOOKUPS, semantic_cache, semantic_cache_enabled
 
 logger = logging.getLogger(__name__)
 
 VALID_NODES = list(INTERVENTIONS.keys())
 DEFAULT_NODE = "Stress"
 DEFAULT_SUBLABEL = "unspecified"
+JSON_PARSE_ERROR_REASONING = "JSON parse error"
+WARMING_UP_REASONING = "AI is warming up or busy. Please try again."
+UNAVAILABLE_REASONING = "AI service unavailable."
+# Reasonings that mark a prediction as a fallback rather than a model classification
+FALLBACK_REASONINGS = frozenset({JSON_PARSE_ERROR_REASONING, WARMING_UP_REASONING, UNAVAILABLE_REASONING})
 
-SYSTEM_PROMPT = """
-You are a Behavioral Science Specialist in LoopBreaker.
+# Fields the classifier must return; once the streamed object has them the
+# generation is closed instead of waiting for Ollama to finish.
+REQUIRED_FIELDS = ("node", "sublabel", "confidence")
+
+AI_STREAM_EARLY_STOPS = metrics.counter(
+    "ai_stream_early_stops_total",
+    "Streamed generations closed as soon as the JSON object was complete.",
+)
+
+AI_INPUT_TOKENS = metrics.histogram(
+    "ai_input_tokens",
+    "Estimated journal-entry tokens sent to the model, before and after trimming.",
+    buckets=(64, 128, 256, 512, 768, 1024, 1536, 2048),
+)
+
+AI_TOKENS_PER_SECOND = metrics.histogram(
+    "ai_tokens_per_second",
+    "Model throughput per request: prompt evaluation and generation tokens per second.",
+    buckets=(1, 2, 5, 10, 20, 40, 80, 160, 320, 640, 1280),
+)
+
+AI_PROMPT_TOKENS = metrics.histogram(
+    "ai_prompt_tokens",
+    "Prompt tokens evaluated by the model per request (system prompt included).",
+    buckets=(128, 256, 512, 768, 1024, 1536, 2048, 4096),
+)
+
+AI_GENERATED_TOKENS = metrics.histogram(
+    "ai_generated_tokens",
+    "Tokens generated by the model per request.",
+    buckets=(8, 16, 32, 64, 96, 128, 256, 512),
+)
+
+AI_MODEL_LOAD_SECONDS = metrics.histogram(
+    "ai_model_load_seconds",
+    "Time the model server spent loading weights for a request.",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+
+SYSTEM_PROMPT = PROMPT_REGISTRY.get(DEFAULT_PROMPT_VERSION).system
 
-THE 8-NODE REWIRE FEEDBACK LOOP (context for understanding):
-1. STRESS — Physiological spikes and overwhelm
-2. COPING STRUGGLE — Decreased executive function, difficulty regulating
-3. PROCRASTINATION — Avoidance and task delay behaviors
-4. NEGLECT NEEDS — Ignoring sleep, food, movement, social connection
-5. HYPERVIGILANCE — Heightened sensitivity, anxiety, defensive scanning
-6. NEGATIVE BELIEFS — Distorted self-talk, rumination, catastrophizing
-7. LOW SELF-ESTEEM — Degraded self-worth, internalized criticism
-8. SHAME — Isolation, worthlessness, loop restart condition
-
-YOUR TASK:
-Classify the user's journal entry into ONE of these 7 emotional states:
-- Procrastination (avoidance, distraction, fear of failure)
-- Anxiety (worry, panic, dread, hypervigilance)
-- Stress (overload, tension, urgency, burnout)
-- Shame (guilt, embarrassment, self-blame, isolation)
-- Overwhelm (paralysis, cognitive overload, scattered)
-- Numbness (disconnected, apathy, exhaustion, freeze)
-- Isolation (loneliness, withdrawal, avoidance of others)
-
-Also extract a specific emotion sublabel and confidence.
+# Same instructions without the free-text field: the label alone picks the
+# intervention, so /analyze can skip generating reasoning tokens.
+CLASSIFY_ONLY_PROMPT = strip_reasoning(SYSTEM_PROMPT)
+
+REASONING_PROMPT = """
+You are a Behavioral Science Specialist in LoopBreaker.
+The journal entry below was classified as {node} ({sublabel}).
+In one or two sentences, explain which words or patterns in the entry point to this state. Do not give advice.
 
 Return ONLY this JSON format:
-{"node": "StateName", "sublabel": "SubLabel", "confidence": 0.8, "reasoning": "brief explanation"}
-
-SUBLABELS BY STATE:
-- Procrastination: Avoidance, Perfectionism, Fear of Failure
-- Anxiety: Worry, Panic, Dread, Hypervigilance
-- Stress: Overload, Tension, Urgency, Burnout
-- Shame: Guilt, Embarrassment, Self-Blame, Isolation
-- Overwhelm: Paralysis, Cognitive Overload, Scattered
-- Numbness: Disconnected, Apathy, Exhaustion, Freeze
-- Isolation: Loneliness, Withdrawal, Avoidance of Others
-
-EXAMPLES:
-"I can't start my work" → {"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "avoiding task initiation"}
-"Everything feels threatening" → {"node": "Anxiety", "sublabel": "Dread", "confidence": 0.85, "reasoning": "pervasive anticipatory fear"}
-"I'm behind on deadlines" → {"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "time pressure and workload"}
-"I feel terrible about myself" → {"node": "Shame", "sublabel": "Self-Blame", "confidence": 0.85, "reasoning": "self-directed criticism"}
-"Too many things at once" → {"node": "Overwhelm", "sublabel": "Cognitive Overload", "confidence": 0.9, "reasoning": "mental capacity exceeded"}
-"I don't feel anything" → {"node": "Numbness", "sublabel": "Disconnected", "confidence": 0.85, "reasoning": "emotional blunting present"}
-"I don't want to see anyone" → {"node": "Isolation", "sublabel": "Isolation", "confidence": 0.9, "reasoning": "social avoidance pattern"}
-"""
+{{"reasoning": "brief explanation"}}
+
+Journal entry: "{text}"
+
+JSON response:"""
+
+# Enough for {"node": ..., "sublabel": ..., "confidence": ...} with some slack
+DEFAULT_CLASSIFY_MAX_TOKENS = 48
+DEFAULT_REASONING_MAX_TOKENS = 96
 
 
 def clean_ai_response(raw_json: str) -> Dict[str, Any]:
@@ -73,7 +106,7 @@ def clean_ai_response(raw_json: str) -> Dict[str, Any]:
             "detected_node": DEFAULT_NODE,
             "emotion_sublabel": DEFAULT_SUBLABEL,
             "confidence": 0.5,
-            "reasoning": "JSON parse error",
+            "reasoning": JSON_PARSE_ERROR_REASONING,
         }
 
     node = data.get("node", DEFAULT_NODE)
@@ -112,36 +145,313 @@ def clean_ai_response(raw_json: str) -> Dict[str, Any]:
         "reasoning": str(reasoning),
     }
 
-async def query_local_ai(text: str, request_id: str = "") -> Dict[str, Any]:
-    prompt = (
-        f"{SYSTEM_PROMPT}\n\n"
-        f"Journal entry: \"{text}\"\n\n"
-        "JSON response:"
+def get_warm_models() -> List[str]:
+    """The serving model plus any extra models listed in OLLAMA_WARM_MODELS."""
+    extra = [m.strip() for m in os.getenv("OLLAMA_WARM_MODELS", "").split(",") if m.strip()]
+    return [get_active_model(), *extra]
+
+
+def stream_early_stop_enabled() -> bool:
+    return os.getenv("AI_STREAM_EARLY_STOP", "false").lower() == "true"
+
+
+def extract_timing(raw_data: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Converts the Ollama timing fields of a generate response (durations in
+    nanoseconds) into seconds and derives tokens per second. Fields the
+    server did not report, e.g. after an early-stopped stream, are omitted.
+    """
+    def seconds(key: str) -> Optional[float]:
+        value = raw_data.get(key)
+        return value / 1e9 if isinstance(value, (int, float)) else None
+
+    timing: Dict[str, float] = {}
+    prompt_tokens = raw_data.get("prompt_eval_count")
+    generated_tokens = raw_data.get("eval_count")
+    prompt_seconds = seconds("prompt_eval_duration")
+    eval_seconds = seconds("eval_duration")
+    load_seconds = seconds("load_duration")
+    total_seconds = seconds("total_duration")
+
+    if isinstance(prompt_tokens, int):
+        timing["prompt_tokens"] = prompt_tokens
+        if prompt_seconds:
+            timing["prompt_tokens_per_second"] = round(prompt_tokens / prompt_seconds, 2)
+    if prompt_seconds is not None:
+        timing["prompt_eval_seconds"] = round(prompt_seconds, 4)
+    if isinstance(generated_tokens, int):
+        timing["generated_tokens"] = generated_tokens
+        if eval_seconds:
+            timing["tokens_per_second"] = round(generated_tokens / eval_seconds, 2)
+    if eval_seconds is not None:
+        timing["eval_seconds"] = round(eval_seconds, 4)
+    if load_seconds is not None:
+        timing["load_seconds"] = round(load_seconds, 4)
+    if total_seconds is not None:
+        timing["total_seconds"] = round(total_seconds, 4)
+    return timing
+
+
+def record_timing(model: str, timing: Dict[str, float]) -> None:
+    """Exports extracted timing as per-model histograms and on the current Sentry scope."""
+    if "prompt_tokens" in timing:
+        AI_PROMPT_TOKENS.observe(timing["prompt_tokens"], model=model)
+    if "generated_tokens" in timing:
+        AI_GENERATED_TOKENS.observe(timing["generated_tokens"], model=model)
+    if "prompt_tokens_per_second" in timing:
+        AI_TOKENS_PER_SECOND.observe(timing["prompt_tokens_per_second"], model=model, phase="prompt")
+    if "tokens_per_second" in timing:
+        AI_TOKENS_PER_SECOND.observe(timing["tokens_per_second"], model=model, phase="generation")
+    if "load_seconds" in timing:
+        AI_MODEL_LOAD_SECONDS.observe(timing["load_seconds"], model=model)
+    if sentry_sdk and timing:
+        sentry_sdk.set_context("ai_timing", {"model": model, **timing})
+
+
+def get_classify_max_tokens() -> int:
+    return int(os.getenv("AI_CLASSIFY_MAX_TOKENS", DEFAULT_CLASSIFY_MAX_TOKENS))
+
+
+def chunked_classification_enabled() -> bool:
+    return os.getenv("AI_CHUNKED_CLASSIFICATION", "false").lower() == "true"
+
+
+def combine_chunk_predictions(predictions: List[Dict[str, Any]], weights: List[float]) -> Dict[str, Any]:
+    """
+    Voting rule for chunked classification.
+
+    1. Fallback predictions (service errors, unparseable output) do not vote.
+       If every chunk fell back, the first fallback is returned as-is.
+    2. Each remaining chunk votes for its node with weight
+       confidence x chunk size (estimated tokens), so long, confident chunks
+       count most. The node with the largest total wins; ties go to the node
+       with the single most confident chunk, then to the earliest chunk.
+    3. The sublabel is chosen the same way among the winning node's chunks,
+       ignoring the "unspecified" sublabel.
+    4. Confidence is the weighted mean confidence of the winning chunks,
+       scaled by (1 + agreement) / 2 where agreement = winning weight / total
+       weight: unanimous chunks keep their confidence, an even two-way split
+       loses a quarter of it. As in clean_ai_response, confidence below 0.6
+       resets the sublabel.
+    """
+    voting = [
+        (p, w) for p, w in zip(predictions, weights) if p.get("reasoning") not in FALLBACK_REASONINGS
+    ]
+    if not voting:
+        return predictions[0]
+
+    node_weight: Dict[str, float] = {}
+    node_best: Dict[str, float] = {}
+    node_first: Dict[str, int] = {}
+    for index, (p, w) in enumerate(voting):
+        node = p["detected_node"]
+        node_weight[node] = node_weight.get(node, 0.0) + p["confidence"] * w
+        node_best[node] = max(node_best.get(node, 0.0), p["confidence"])
+        node_first.setdefault(node, index)
+    winner = max(node_weight, key=lambda n: (node_weight[n], node_best[n], -node_first[n]))
+
+    winning = [(p, w) for p, w in voting if p["detected_node"] == winner]
+    sublabel_weight: Dict[str, float] = {}
+    for p, w in winning:
+        sublabel = p.get("emotion_sublabel")
+        if sublabel and sublabel != DEFAULT_SUBLABEL:
+            sublabel_weight[sublabel] = sublabel_weight.get(sublabel, 0.0) + p["confidence"] * w
+    sublabel = max(sublabel_weight, key=sublabel_weight.get) if sublabel_weight else DEFAULT_SUBLABEL
+
+    total_weight = sum(p["confidence"] * w for p, w in voting) or 1.0
+    winning_size = sum(w for _, w in winning) or 1.0
+    mean_confidence = sum(p["confidence"] * w for p, w in winning) / winning_size
+    agreement = node_weight[winner] / total_weight
+    confidence = round(mean_confidence * (1 + agreement) / 2, 4)
+    if confidence < 0.6:
+        sublabel = DEFAULT_SUBLABEL
+
+    lead = max(winning, key=lambda pw: pw[0]["confidence"])[0]
+    return {
+        "detected_node": winner,
+        "emotion_sublabel": sublabel,
+        "confidence": confidence,
+        "reasoning": f"{lead['reasoning']} ({len(winning)}/{len(predictions)} sections agree)",
+    }
+
+
+async def _query_chunked(
+    text: str,
+    request_id: str,
+    include_reasoning: bool = True,
+    model: Optional[str] = None,
+    record_metrics: bool = True,
+) -> Dict[str, Any]:
+    """Classifies sentence-aligned chunks concurrently and combines them by vote."""
+    parallel = max(1, int(os.getenv("OLLAMA_NUM_PARALLEL", "4")))
+    chunks = split_into_chunks(
+        text,
+        target_tokens=int(os.getenv("AI_CHUNK_TARGET_TOKENS", "200")),
+        max_chunks=int(os.getenv("AI_CHUNK_MAX", str(parallel))),
     )
+    semaphore = asyncio.Semaphore(parallel)
 
-    model = os.getenv("OLLAMA_MODEL", "llama3.2:3b")
-    ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    async def classify(index: int, chunk: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await _query_single(
+                chunk,
+                request_id=f"{request_id}:{index}" if request_id else "",
+                include_reasoning=include_reasoning,
+                model=model,
+                record_metrics=record_metrics,
+                trim_input=False,
+            )
+
+    predictions = await asyncio.gather(*(classify(i, c) for i, c in enumerate(chunks)))
+    combined = combine_chunk_predictions(list(predictions), [estimate_tokens(c) for c in chunks])
+    versions = {p["prompt_version"] for p in predictions if p.get("prompt_version")}
+    if versions:
+        combined["prompt_version"] = versions.pop()
+    if not include_reasoning and combined["reasoning"] not in FALLBACK_REASONINGS:
+        combined["reasoning"] = ""
+    logger.info(
+        "AI chunked classification",
+        extra={
+            "event": "ai_chunked",
+            "chunks": len(chunks),
+            "votes": [p["detected_node"] for p in predictions],
+            "node": combined["detected_node"],
+            "request_id": request_id,
+        },
+    )
+    return combined
+
+
+async def query_local_ai(
+    text: str,
+    request_id: str = "",
+    include_reasoning: bool = True,
+    model: Optional[str] = None,
+    record_metrics: bool = True,
+) -> Dict[str, Any]:
+    """
+    Classifies a journal entry. With `include_reasoning=False` the model is
+    asked for the label only, under a small output budget, and the returned
+    "reasoning" is empty (fallback reasonings are still reported); call
+    `generate_reasoning` afterwards to fill it in. `model` overrides the
+    backend's default model (used by shadow evaluation and smoke tests,
+    which always bypass the semantic cache). With `record_metrics=False`
+    (shadow evaluation) the call stays out of the production latency, token
+    and residency metrics and out of the semantic cache. The semantic cache
+    keeps labels only: a hit returns an empty "reasoning", since the stored
+    one explained a different entry.
+    """
+    use_cache = semantic_cache_enabled() and model is None and record_metrics
+    embedding = None
+    if use_cache:
+        active = get_active_model()
+        namespace = (
+            f"{active}|{select_prompt_variant(active).version}|{'full' if include_reasoning else 'classify_only'}"
+        )
+        try:
+            embedding = await get_backend().embed(text)
+        except Exception:
+            SEMANTIC_CACHE_LOOKUPS.inc(result="error")
+            logger.warning(
+                "Semantic cache embedding failed", exc_info=True, extra={"event": "ai_cache_error", "request_id": request_id}
+            )
+        if embedding is not None:
+            cached = await asyncio.to_thread(semantic_cache.lookup, embedding, namespace)
+            if cached is not None:
+                prediction, similarity = cached
+                logger.info(
+                    "AI semantic cache hit",
+                    extra={
+                        "event": "ai_cache_hit",
+                        "similarity": round(similarity, 4),
+                        "node": prediction["detected_node"],
+                        "request_id": request_id,
+                    },
+                )
+                return prediction
+
+    if chunked_classification_enabled() and len(text) >= int(os.getenv("AI_CHUNK_MIN_CHARS", "1500")):
+        prediction = await _query_chunked(text, request_id, include_reasoning, model, record_metrics)
+    else:
+        prediction = await _query_single(text, request_id, include_reasoning, model, record_metrics)
+
+    if embedding is not None and prediction["reasoning"] not in FALLBACK_REASONINGS:
+        await asyncio.to_thread(semantic_cache.add, embedding, namespace, {**prediction, "reasoning": ""})
+    return prediction
+
+
+async def _query_single(
+    text: str,
+    request_id: str = "",
+    include_reasoning: bool = True,
+    model: Optional[str] = None,
+    record_metrics: bool = True,
+    trim_input: bool = True,
+) -> Dict[str, Any]:
+    # Bound prompt-eval cost: long entries are reduced to their most salient
+    # sentences. Chunks are sized by the chunker and classified whole
+    # (trim_input=False), so the vote covers the entire entry.
+    trim = trim_to_budget(text) if trim_input else trim_to_budget(text, budget=0)
+    if record_metrics:
+        AI_INPUT_TOKENS.observe(trim.original_tokens, stage="original")
+        AI_INPUT_TOKENS.observe(trim.trimmed_tokens, stage="trimmed")
+    if trim.was_trimmed:
+        logger.info(
+            "AI input trimmed to token budget",
+            extra={
+                "event": "ai_input_trimmed",
+                "original_chars": trim.original_chars,
+                "trimmed_chars": trim.trimmed_chars,
+                "original_tokens": trim.original_tokens,
+                "trimmed_tokens": trim.trimmed_tokens,
+                "request_id": request_id,
+            },
+        )
+
+    backend = get_backend()
+    model = model or get_active_model()
+    variant = select_prompt_variant(model)
+    prompt = variant.render(trim.text, include_reasoning)
+    was_resident = model_residency.is_resident(model)
+    started = time.perf_counter()
 
     logger.info(
         "AI request",
-        extra={"event": "ai_query", "model": model, "text_length": len(text), "request_id": request_id},
+        extra={
+            "event": "ai_query",
+            "model": model,
+            "backend": backend.name,
+            "text_length": len(text),
+            "prompt_text_length": trim.trimmed_chars,
+            "include_reasoning": include_reasoning,
+            "prompt_version": variant.version,
+            "request_id": request_id,
+        },
     )
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{ollama_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json",
-                },
-                timeout=30,
-            )
+        raw_data = await backend.classify(
+            prompt,
+            model,
+            required_fields=REQUIRED_FIELDS,
+            stream_early_stop=stream_early_stop_enabled(),
+            options=None if include_reasoning else {"num_predict": get_classify_max_tokens()},
+            stop_at_fields=not include_reasoning,
+        )
 
-        response.raise_for_status()
-        raw_data = response.json()
+        timing = extract_timing(raw_data)
+        residency = None
+        if record_metrics:
+            if raw_data.get("early_stop"):
+                AI_STREAM_EARLY_STOPS.inc(model=model)
+            record_timing(model, timing)
+            residency = model_residency.record_request(
+                model,
+                time.perf_counter() - started,
+                was_resident=was_resident,
+                load_duration_seconds=timing.get("load_seconds"),
+                success="response" in raw_data,
+            )
 
         if "response" not in raw_data:
             logger.warning(
@@ -152,16 +462,33 @@ async def query_local_ai(text: str, request_id: str = "") -> Dict[str, Any]:
                 "detected_node": DEFAULT_NODE,
                 "emotion_sublabel": DEFAULT_SUBLABEL,
                 "confidence": 0.5,
-                "reasoning": "AI is warming up or busy. Please try again.",
+                "reasoning": WARMING_UP_REASONING,
             }
 
         ai_response = raw_data["response"]
+        if not include_reasoning:
+            # The output budget can cut the model off mid-way through an extra
+            # field; keep the object up to the last complete required field.
+            parser = JSONObjectStream(REQUIRED_FIELDS, stop_at_fields=True)
+            parser.feed(ai_response)
+            ai_response = parser.text
         logger.info(
             "Ollama raw response",
-            extra={"event": "ai_response", "snippet": ai_response[:300], "request_id": request_id},
+            extra={
+                "event": "ai_response",
+                "snippet": ai_response[:300],
+                "residency": residency,
+                "early_stop": bool(raw_data.get("early_stop")),
+                "request_id": request_id,
+                **timing,
+            },
         )
-        
-        return clean_ai_response(ai_response)
+
+        result = clean_ai_response(ai_response)
+        if not include_reasoning and result["reasoning"] not in FALLBACK_REASONINGS:
+            result["reasoning"] = ""
+        result["prompt_version"] = variant.version
+        return result
 
     except httpx.HTTPStatusError as exc:
         logger.error(
@@ -172,9 +499,52 @@ async def query_local_ai(text: str, request_id: str = "") -> Dict[str, Any]:
     except Exception:
         logger.error("AI client error", exc_info=True, extra={"event": "ai_generic_error", "request_id": request_id})
 
+    # The server may have dropped the model; the next call should count as cold.
+    if record_metrics:
+        model_residency.mark_unloaded(model)
+
     return {
         "detected_node": DEFAULT_NODE,
         "emotion_sublabel": DEFAULT_SUBLABEL,
         "confidence": 0.5,
-        "reasoning": "AI service unavailable.",
+        "reasoning": UNAVAILABLE_REASONING,
     }
+
+
+async def generate_reasoning(text: str, node: str, sublabel: str, request_id: str = "") -> Optional[str]:
+    """
+    Explains an existing classification in a separate, lower-priority call.
+    Returns None if the model is unavailable or the output cannot be parsed.
+    """
+    trim = trim_to_budget(text)
+    prompt = REASONING_PROMPT.format(node=node, sublabel=sublabel or DEFAULT_SUBLABEL, text=trim.text)
+    backend = get_backend()
+    model = get_active_model()
+    started = time.perf_counter()
+    try:
+        raw_data = await backend.classify(
+            prompt,
+            model,
+            required_fields=("reasoning",),
+            stream_early_stop=stream_early_stop_enabled(),
+            options={"num_predict": int(os.getenv("AI_REASONING_MAX_TOKENS", DEFAULT_REASONING_MAX_TOKENS))},
+        )
+        reasoning = json.loads(raw_data["response"]).get("reasoning")
+    except Exception:
+        logger.warning(
+            "AI reasoning generation failed",
+            exc_info=True,
+            extra={"event": "ai_reasoning_failed", "request_id": request_id},
+        )
+        return None
+
+    logger.info(
+        "AI reasoning generated",
+        extra={
+            "event": "ai_reasoning",
+            "model": model,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "request_id": request_id,
+        },
+    )
+    return str(reasoning) if reasoning else None
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+AUDIT_REPLICATIONS = metrics.counter(
+    "crisis_audit_replications_total",
+    "Crisis audit records written to Neo4j from the local log, by kind and outcome (replicated, failed).",
+)
+AUDIT_REPLICATION_LAG = metrics.histogram(
+    "crisis_audit_replication_lag_seconds",
+    "Time from appending a crisis audit record locally to replicating it to Neo4j.",
+    buckets=(0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 60.0, 300.0, 3600.0),
+)
+
+
+class DurableAuditLog:
+    """
+    Append-only local log of crisis records awaiting replication to Neo4j.
+
+    Each append is written as JSON lines and fsync'd before returning, so a
+    crisis record survives a crash or a Neo4j outage. Replicated record IDs
+    go to a sidecar `<path>.replicated` file; on startup, records without an
+    entry there are pending again. Replaying a record twice is harmless
+    because the Neo4j writes MERGE on the record's ID. Once nothing is
+    pending, both files are truncated so the log does not grow forever.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if path:
+            self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    @property
+    def replicated_path(self) -> str:
+        return f"{self.path}.replicated"
+
+    def configure(self) -> None:
+        """Reads CRISIS_AUDIT_LOG_PATH; unset keeps the synchronous Neo4j writes."""
+        self.path = os.getenv("CRISIS_AUDIT_LOG_PATH") or None
+        self._pending.clear()
+        if self.path:
+            self.load()
+
+    def load(self) -> None:
+        """Rebuilds the pending queue from disk, skipping torn or malformed lines."""
+        with self._lock:
+            self._pending.clear()
+            replicated = set(self._read_lines(self.replicated_path))
+            for line in self._read_lines(self.path):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable crisis audit log line", extra={"event": "crisis_audit_torn_line"})
+                    continue
+                if not isinstance(record, dict) or "id" not in record:
+                    logger.warning("Skipping crisis audit log line without an id", extra={"event": "crisis_audit_torn_line"})
+                    continue
+                if record["id"] not in replicated:
+                    self._pending[record["id"]] = record
+        if self._pending:
+            logger.info(
+                "%d crisis audit record(s) pending replication",
+                len(self._pending),
+                extra={"event": "crisis_audit_pending", "pending": len(self._pending)},
+            )
+
+    @staticmethod
+    def _read_lines(path: str) -> List[str]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Durably appends records of the form {"id", "kind", "payload"}.
+
+        Raises OSError if the log cannot be written or synced.
+        """
+        stamped = [{**record, "logged_at": time.time()} for record in records]
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in stamped)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            for record in stamped:
+                self._pending[record["id"]] = record
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._pending.values())
+
+    def mark_replicated(self, record_id: str) -> None:
+        with self._lock:
+            record = self._pending.pop(record_id, None)
+            if record is None:
+                return
+            if not self._pending:
+                # Everything is in Neo4j; start both files afresh
+                for path in (self.path, self.replicated_path):
+                    with open(path, "w", encoding="utf-8"):
+                        pass
+                return
+            # No fsync: losing this line only means a harmless replay
+            with open(self.replicated_path, "a", encoding="utf-8") as f:
+                f.write(record_id + "\n")
+
+    def status(self) -> Dict[str, Any]:
+        pending = self.pending()
+        return {
+            "enabled": self.enabled,
+            "pending": len(pending),
+            "oldest_pending_seconds": round(time.time() - pending[0]["logged_at"], 3) if pending else None,
+        }
+
+
+def _write(db: Any, record: Dict[str, Any]) -> bool:
+    if record["kind"] == "crisis_event":
+        return db.log_crisis_event(**record["payload"]) is not None
+    if record["kind"] == "journal_entry":
+        return bool(db.save_journal_entry(**record["payload"]))
+    logger.error("Unknown crisis audit record kind %r; dropping it", record["kind"])
+    return True
+
+
+class AuditReplicator:
+    """
+    Copies pending crisis audit records to Neo4j in the order they were logged.
+
+    `replicate` is called right after a crisis response has been sent; the
+    background loop retries whatever is still pending with exponential
+    backoff (base_delay doubling up to max_delay) while Neo4j is failing.
+    A failed record blocks those after it, so an event is never stored
+    after the journal entry that references it.
+    """
+
+    def __init__(self, log: DurableAuditLog, base_delay: float = 1.0, max_delay: float = 60.0) -> None:
+        self.log = log
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.db: Any = None
+        self.delay = base_delay
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, db: Any) -> None:
+        self.db = db
+        self.base_delay = float(os.getenv("CRISIS_AUDIT_RETRY_SECONDS", self.base_delay))
+        self.max_delay = float(os.getenv("CRISIS_AUDIT_MAX_RETRY_SECONDS", self.max_delay))
+        self.delay = self.base_delay
+
+    async def replicate(self, db: Any = None) -> bool:
+        """Writes pending records until one fails; True if nothing is left."""
+        db = db or self.db
+        async with self._lock:
+            for record in self.log.pending():
+                try:
+                    ok = await asyncio.to_thread(_write, db, record)
+                except Exception:
+                    logger.warning("Crisis audit replication raised", exc_info=True)
+                    ok = False
+                if not ok:
+                    AUDIT_REPLICATIONS.inc(kind=record["kind"], outcome="failed")
+                    logger.warning(
+                        "Crisis audit record %s not replicated; will retry",
+                        record["id"],
+                        extra={"event": "crisis_audit_retry", "record_id": record["id"], "kind": record["kind"]},
+                    )
+                    self._wake.set()
+                    return False
+                await asyncio.to_thread(self.log.mark_replicated, record["id"])
+                AUDIT_REPLICATIONS.inc(kind=record["kind"], outcome="replicated")
+                AUDIT_REPLICATION_LAG.observe(time.time() - record["logged_at"])
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            if not self.log.pending():
+                self._wake.clear()
+                await self._wake.wait()
+            if await self.replicate():
+                self.delay = self.base_delay
+            else:
+                await asyncio.sleep(self.delay)
+                self.delay = min(self.delay * 2, self.max_delay)
+
+    def start(self) -> None:
+        """Starts retrying pending records (including any left from before a restart)."""
+        if self._task is None and self.log.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+crisis_audit_log = DurableAuditLog()
+audit_replicator = AuditReplicator(crisis_audit_log)
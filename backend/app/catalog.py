@@ -0,0 +1,171 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .interventions import INTERVENTIONS
+
+EDUCATION_DEPTHS = ("introduce", "reinforce", "deepen")
+
+# Served when the classifier returns a node the catalog does not know
+FALLBACK_BREAKER = {
+    "title": "General Check-in",
+    "task": "Take a moment to breathe and observe your surroundings.",
+    "education": "Checking in helps move from reactive patterns to conscious awareness.",
+}
+
+
+class CatalogError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Breaker:
+    """
+    One intervention as `/analyze` serves it, with education already at one depth.
+
+    `variants` and `msc_steps` are rendered in the response shape
+    (education at "introduce" depth) and shared by every request; like the
+    other fields they must be treated as read-only.
+    """
+
+    title: str
+    task: str
+    education: str
+    type: Optional[str] = None
+    variants: Optional[Tuple[Dict[str, str], ...]] = None
+    msc_steps: Optional[Tuple[Dict[str, Any], ...]] = None
+    movement: Optional[Dict[str, Any]] = None
+
+
+def _education(raw: Any, path: str) -> Dict[str, str]:
+    """Education text per depth; a plain string, or a missing depth, falls back to "introduce"."""
+    if isinstance(raw, str):
+        return dict.fromkeys(EDUCATION_DEPTHS, raw)
+    if not isinstance(raw, dict) or not isinstance(raw.get("introduce"), str):
+        raise CatalogError(f"{path}: education must be a string or a dict with an 'introduce' text")
+    unknown = set(raw) - set(EDUCATION_DEPTHS)
+    if unknown:
+        raise CatalogError(f"{path}: unknown education depths {sorted(unknown)}")
+    if not all(isinstance(text, str) for text in raw.values()):
+        raise CatalogError(f"{path}: education texts must be strings")
+    return {depth: raw.get(depth, raw["introduce"]) for depth in EDUCATION_DEPTHS}
+
+
+def _require_text(raw: Dict[str, Any], key: str, path: str) -> str:
+    value = raw.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise CatalogError(f"{path}: '{key}' must be a non-empty string")
+    return value
+
+
+def _check_breaker(raw: Any, path: str) -> Dict[str, str]:
+    if not isinstance(raw, dict):
+        raise CatalogError(f"{path}: expected an intervention dict")
+    _require_text(raw, "title", path)
+    _require_text(raw, "task", path)
+    if "type" in raw and not isinstance(raw["type"], str):
+        raise CatalogError(f"{path}: 'type' must be a string")
+    if "movement" in raw and not isinstance(raw["movement"], dict):
+        raise CatalogError(f"{path}: 'movement' must be a dict")
+    return _education(raw.get("education"), path)
+
+
+def _render_msc_steps(raw: Any, path: str) -> Tuple[Dict[str, Any], ...]:
+    if not isinstance(raw, list) or not raw:
+        raise CatalogError(f"{path}: msc_steps must be a non-empty list")
+    steps = []
+    for i, step in enumerate(raw):
+        step_path = f"{path}.msc_steps[{i}]"
+        if not isinstance(step, dict) or not isinstance(step.get("step"), int):
+            raise CatalogError(f"{step_path}: 'step' must be an int")
+        steps.append({
+            "step": step["step"],
+            "name": _require_text(step, "name", step_path),
+            "task": _require_text(step, "task", step_path),
+            "education": _education(step.get("education"), step_path)["introduce"],
+        })
+    return tuple(steps)
+
+
+def _breakers(
+    raw: Dict[str, Any],
+    education: Dict[str, str],
+    variants: Optional[Tuple[Dict[str, str], ...]] = None,
+    msc_steps: Optional[Tuple[Dict[str, Any], ...]] = None,
+) -> Dict[str, Breaker]:
+    movement = dict(raw["movement"]) if "movement" in raw else None
+    return {
+        depth: Breaker(
+            title=raw["title"],
+            task=raw["task"],
+            education=education[depth],
+            type=raw.get("type"),
+            variants=variants,
+            msc_steps=msc_steps,
+            movement=movement,
+        )
+        for depth in EDUCATION_DEPTHS
+    }
+
+
+def compile_catalog(catalog: Dict[str, Any]) -> Mapping[Tuple[str, Optional[str], str], Breaker]:
+    """
+    Validates an `INTERVENTIONS`-style catalog and flattens it into a table
+    keyed by (node, sublabel, depth).
+
+    States with sublabel variants keep one entry per sublabel plus the
+    default under sublabel None; states without variants only have the
+    None entry. Every entry of a state shares its rendered variant list
+    (when it has more than one variant) and its MSC steps. Raises
+    CatalogError naming the offending entry.
+    """
+    table: Dict[Tuple[str, Optional[str], str], Breaker] = {}
+    for node, options in catalog.items():
+        if not isinstance(node, str) or not isinstance(options, dict):
+            raise CatalogError(f"{node!r}: expected a state name mapped to a dict")
+        if None not in options:
+            education = _check_breaker(options, node)
+            msc_steps = _render_msc_steps(options["msc_steps"], node) if "msc_steps" in options else None
+            for depth, breaker in _breakers(options, education, msc_steps=msc_steps).items():
+                table[(node, None, depth)] = breaker
+            continue
+
+        educations = {}
+        for sublabel, variant in options.items():
+            if sublabel is not None and not isinstance(sublabel, str):
+                raise CatalogError(f"{node}: sublabel keys must be strings, got {sublabel!r}")
+            educations[sublabel] = _check_breaker(variant, f"{node}.{sublabel}")
+        rendered = tuple(
+            {
+                "title": variant["title"],
+                "task": variant["task"],
+                "education": educations[sublabel]["introduce"],
+                "type": variant.get("type", ""),
+            }
+            for sublabel, variant in options.items()
+            if sublabel is not None
+        )
+        variants = rendered if len(rendered) > 1 else None
+        for sublabel, variant in options.items():
+            for depth, breaker in _breakers(variant, educations[sublabel], variants).items():
+                table[(node, sublabel, depth)] = breaker
+    return MappingProxyType(table)
+
+
+CATALOG = compile_catalog(INTERVENTIONS)
+_FALLBACK = MappingProxyType(_breakers(FALLBACK_BREAKER, _check_breaker(FALLBACK_BREAKER, "fallback")))
+
+
+def lookup(node: str, sublabel: Optional[str], depth: str = "introduce") -> Breaker:
+    """
+    The intervention for a classified node and sublabel: the sublabel's
+    variant if the state has one, else the state's default, else the
+    general check-in. An unknown depth is served at "introduce".
+    """
+    if depth not in _FALLBACK:
+        depth = "introduce"
+    return (
+        CATALOG.get((node, sublabel, depth))
+        or CATALOG.get((node, None, depth))
+        or _FALLBACK[depth]
+    )
@@ -1,6 +1,26 @@
+import logging
+import multiprocessing
 import os
-import re
-from typing import List, Tuple
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .crisis_telemetry import CrisisTelemetry
+from .lexicon import Lexicon, LexiconError, load_lexicon_file
+from .matcher import KeywordMatcher, StreamingMatcher
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CRISIS_SCREEN_SESSIONS = metrics.counter(
+    "crisis_screen_sessions_total",
+    "Live crisis screening sessions (WebSocket /ws/crisis-screen) by how they ended.",
+)
+CRISIS_SCREEN_ALERTS = metrics.counter(
+    "crisis_screen_alerts_total",
+    "Crisis alerts pushed to live screening sessions.",
+)
 
 
 class CrisisSafetyService:
@@ -40,37 +60,65 @@ class CrisisSafetyService:
         "sexual assault",
     ]
 
-    def __init__(self, keywords: List[str] = None):
+    def __init__(
+        self, keywords: List[str] = None, lexicon_path: Optional[str] = None, batch_workers: Optional[int] = None
+    ):
         """
         Initialize service with keyword list.
 
         Args:
-            keywords: List of crisis keywords. If None, loads from CRISIS_KEYWORDS env var or defaults.
+            keywords: List of crisis keywords. If None, loads the lexicon file at
+                lexicon_path (or CRISIS_LEXICON_PATH), else the CRISIS_KEYWORDS env var,
+                else defaults.
+            lexicon_path: Versioned lexicon file (see app.lexicon.load_lexicon_file).
+            batch_workers: Size of the screen_batch process pool (default
+                CRISIS_BATCH_WORKERS or the CPU count).
         """
+        self.batch_workers = batch_workers or int(os.getenv("CRISIS_BATCH_WORKERS", "0")) or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lexicon: Optional[Lexicon] = None
+        self._pool_lock = threading.Lock()
+        self.telemetry = CrisisTelemetry()
+
         if keywords is not None:
-            self.keywords = keywords
+            self.lexicon = Lexicon("custom", list(keywords), source="custom")
+            return
+
+        lexicon_path = lexicon_path or os.getenv("CRISIS_LEXICON_PATH")
+        if lexicon_path:
+            try:
+                self.lexicon = load_lexicon_file(lexicon_path)
+                return
+            except LexiconError:
+                # Never start without crisis detection; fall back and keep going
+                logger.exception("Crisis lexicon %s is invalid; using built-in keywords", lexicon_path)
+
+        env_keywords = os.getenv("CRISIS_KEYWORDS", "")
+        if env_keywords:
+            self.lexicon = Lexicon("env", [k.strip() for k in env_keywords.split(",")], source="env")
         else:
-            env_keywords = os.getenv("CRISIS_KEYWORDS", "")
-            if env_keywords:
-                self.keywords = [k.strip() for k in env_keywords.split(",")]
-            else:
-                self.keywords = self.DEFAULT_KEYWORDS
+            self.lexicon = Lexicon("builtin", list(self.DEFAULT_KEYWORDS))
+
+    @property
+    def keywords(self) -> List[str]:
+        return self.lexicon.keywords
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        return self.lexicon.matcher
 
-        self.regex_pattern = self._compile_pattern()
+    @property
+    def lexicon_version(self) -> str:
+        return self.lexicon.version
 
-    def _compile_pattern(self) -> re.Pattern:
+    def swap_lexicon(self, lexicon: Lexicon) -> None:
         """
-        Compile regex pattern for all keywords (case-insensitive).
-        Uses word boundaries to avoid partial matches.
+        Install an already compiled and validated lexicon.
 
-        Returns:
-            Compiled regex pattern
+        A single reference assignment, so concurrent detections never wait:
+        each one uses whichever lexicon it read when it started.
         """
-        # Escape special regex chars in keywords
-        escaped = [re.escape(k) for k in self.keywords]
-        # Create pattern with word boundaries: \b(keyword1|keyword2|keyword3)\b
-        pattern_str = r"\b(" + "|".join(escaped) + r")\b"
-        return re.compile(pattern_str, re.IGNORECASE)
+        self.lexicon = lexicon
 
     def detect_crisis(self, text: str) -> Tuple[bool, List[str]]:
         """
@@ -82,21 +130,195 @@ class CrisisSafetyService:
         Returns:
             Tuple of (is_crisis: bool, detected_keywords: List[str])
         """
-        # Validate input: must be non-empty string
-        if not text or not isinstance(text, str) or len(text) < 10:
-            return False, []
-
-        # Find all keyword matches
-        matches = self.regex_pattern.findall(text.lower())
-
-        if matches:
-            # Deduplicate while preserving order
-            seen = set()
-            unique_keywords = []
-            for match in matches:
-                if match not in seen:
-                    unique_keywords.append(match)
-                    seen.add(match)
-            return True, unique_keywords
+        is_crisis, keywords, _ = self.detect_crisis_versioned(text)
+        return is_crisis, keywords
+
+    def detect_crisis_versioned(self, text: str) -> Tuple[bool, List[str], str]:
+        """
+        Detect crisis keywords in text, also reporting the lexicon version used.
+
+        Args:
+            text: User's journal entry text
+
+        Returns:
+            Tuple of (is_crisis: bool, detected_keywords: List[str], lexicon_version: str)
+        """
+        lexicon = self.lexicon
+        started = time.perf_counter()
+        is_crisis, keywords = _screen(lexicon, text)
+        self.telemetry.record(keywords, lexicon.version, time.perf_counter() - started)
+        return is_crisis, keywords, lexicon.version
+
+    def _batch_pool(self, lexicon: Lexicon) -> ProcessPoolExecutor:
+        """
+        The `batch_workers` worker processes holding `lexicon`. The pool is
+        only replaced when the lexicon changes; a batch still running on the
+        old pool is left to finish.
+        """
+        with self._pool_lock:
+            if self._pool is not None and self._pool_lexicon is not lexicon:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+            if self._pool is None:
+                # Not fork: the server process has threads (event loop executors, the Neo4j driver)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.batch_workers,
+                    mp_context=multiprocessing.get_context(_BATCH_START_METHOD),
+                    initializer=_init_batch_worker,
+                    initargs=(lexicon,),
+                )
+                self._pool_lexicon = lexicon
+            return self._pool
+
+    def screen_batch(self, texts: Sequence[str], workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Screen many texts (imports, backfills) with the current lexicon.
+
+        Texts are split into one chunk per worker and screened in a pool of
+        `batch_workers` processes, each holding one compiled copy of the
+        lexicon, so CPU cores are used in parallel. Small batches, or
+        workers=1, are screened in this process. Nothing is logged or stored.
+
+        Args:
+            texts: Texts to screen; the same rules as detect_crisis apply to each
+            workers: Chunks screened in parallel, at most `batch_workers` (the default)
+
+        Returns:
+            {"results": [{"index", "is_crisis", "keywords"}], "crisis_count",
+             "lexicon_version", "workers", "bytes", "seconds", "mb_per_second"}
+        """
+        lexicon = self.lexicon
+        # The pool size is fixed; a batch only caps how many chunks it is split into
+        workers = min(workers or self.batch_workers, self.batch_workers, len(texts) // BATCH_MIN_CHUNK)
+        workers = max(1, workers)
+
+        started = time.perf_counter()
+        if workers == 1:
+            screened = _screen_chunk(lexicon, list(texts))
+        else:
+            chunk_size = -(-len(texts) // workers)
+            chunks = [list(texts[i:i + chunk_size]) for i in range(0, len(texts), chunk_size)]
+            pool = self._batch_pool(lexicon)
+            screened = [hit for chunk in pool.map(_screen_chunk_in_worker, chunks) for hit in chunk]
+        seconds = time.perf_counter() - started
+
+        total_bytes = sum(len(t.encode("utf-8")) for t in texts if isinstance(t, str))
+        results = [
+            {"index": index, "is_crisis": is_crisis, "keywords": keywords}
+            for index, (is_crisis, keywords) in enumerate(screened)
+        ]
+        return {
+            "results": results,
+            "crisis_count": sum(1 for r in results if r["is_crisis"]),
+            "lexicon_version": lexicon.version,
+            "workers": workers,
+            "bytes": total_bytes,
+            "seconds": round(seconds, 4),
+            "mb_per_second": round(total_bytes / 1_000_000 / seconds, 3) if seconds else None,
+        }
 
+    def close(self) -> None:
+        """Shut down batch worker processes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+# Below this many texts per worker, process start-up and pickling cost more than they save
+BATCH_MIN_CHUNK = 64
+
+# Forking a multithreaded server can deadlock the child; forkserver (or spawn
+# where it is unavailable) starts workers from a clean process
+_BATCH_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# The lexicon a batch worker process was started with
+_worker_lexicon: Optional[Lexicon] = None
+
+
+def _screen(lexicon: Lexicon, text: str) -> Tuple[bool, List[str]]:
+    # Validate input: must be non-empty string
+    if not text or not isinstance(text, str) or len(text) < 10:
         return False, []
+
+    # Find all keyword matches (typo-tolerant if CRISIS_FUZZY_MATCHING is on)
+    matches = lexicon.find(text)
+
+    if matches:
+        # Deduplicate while preserving order
+        return True, list(dict.fromkeys(matches))
+
+    return False, []
+
+
+def _screen_chunk(lexicon: Lexicon, texts: List[str]) -> List[Tuple[bool, List[str]]]:
+    return [_screen(lexicon, text) for text in texts]
+
+
+def _init_batch_worker(lexicon: Lexicon) -> None:
+    global _worker_lexicon
+    _worker_lexicon = lexicon
+
+
+def _screen_chunk_in_worker(texts: List[str]) -> List[Tuple[bool, List[str]]]:
+    return _screen_chunk(_worker_lexicon, texts)
+
+
+class CrisisScreenSession:
+    """
+    Screens an entry for crisis keywords while it is being typed.
+
+    Wraps a StreamingMatcher over the service's current lexicon, so each
+    keystroke costs time proportional to the characters added or removed.
+    If the lexicon is hot-swapped mid-session, the buffer is rescanned once
+    with the new lexicon; keywords already reported are not reported again.
+    Typo-tolerant matching does not apply here, only in detect_crisis.
+    """
+
+    def __init__(self, service: CrisisSafetyService, max_chars: int = 20000):
+        self.service = service
+        self.max_chars = max_chars
+        self.lexicon = service.lexicon
+        self.stream = StreamingMatcher(self.lexicon.matcher)
+
+    @property
+    def lexicon_version(self) -> str:
+        return self.lexicon.version
+
+    def _sync_lexicon(self) -> List[str]:
+        if self.service.lexicon is self.lexicon:
+            return []
+        reported, text = self.stream.reported, self.stream.text
+        self.lexicon = self.service.lexicon
+        self.stream = StreamingMatcher(self.lexicon.matcher)
+        self.stream.reported = dict(reported)
+        return self.stream.append(text)
+
+    def append(self, text: str) -> List[str]:
+        """
+        Add typed text.
+
+        Returns:
+            Keywords completed since the last call
+
+        Raises:
+            ValueError: If the entry would exceed max_chars
+        """
+        if len(self.stream) + len(text) > self.max_chars:
+            raise ValueError(f"Entry exceeds {self.max_chars} characters")
+        return self._sync_lexicon() + self.stream.append(text)
+
+    def delete(self, count: int) -> List[str]:
+        """Remove the last `count` characters."""
+        found = self._sync_lexicon()
+        self.stream.delete(count)
+        return found
+
+    def finish(self) -> List[str]:
+        """Report keywords at the very end of the entry."""
+        return self._sync_lexicon() + self.stream.finish()
+
+    @property
+    def keywords(self) -> List[str]:
+        """Every keyword reported in this session, in order."""
+        return list(self.stream.reported)
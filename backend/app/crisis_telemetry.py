@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from itertools import combinations
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from .metrics import metrics, percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARY_SECONDS = 3600.0
+
+# Recent detect_crisis latencies kept for the summary percentiles
+LATENCY_WINDOW = 10000
+
+# Keywords and keyword pairs listed in the summary
+SUMMARY_TOP = 20
+
+CRISIS_DETECTIONS = metrics.counter(
+    "crisis_detections_total",
+    "detect_crisis calls by lexicon version and outcome (crisis, clear).",
+)
+CRISIS_KEYWORD_HITS = metrics.counter(
+    "crisis_keyword_hits_total",
+    "Entries in which each crisis keyword was detected, by lexicon version.",
+)
+CRISIS_KEYWORD_PAIRS = metrics.counter(
+    "crisis_keyword_cooccurrence_total",
+    "Entries in which two crisis keywords were both detected, by lexicon version.",
+)
+CRISIS_DETECT_LATENCY = metrics.histogram(
+    "crisis_detect_seconds",
+    "Time spent in detect_crisis, by lexicon version.",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1),
+)
+
+
+class CrisisTelemetry:
+    """
+    Per-keyword counts, keyword co-occurrence and detection latency.
+
+    Every detection updates the Prometheus metrics above and a window of
+    plain counters that `summary` reports: how often each keyword fired,
+    its share of all crisis detections (a keyword that fires in most
+    entries, or mostly alone, is a false-positive suspect), which keywords
+    fire together, and detection latency percentiles. The window resets
+    after each periodic summary is logged (CRISIS_TELEMETRY_SUMMARY_SECONDS,
+    0 to disable).
+    """
+
+    def __init__(self, interval: float = DEFAULT_SUMMARY_SECONDS) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._started = time.time()
+        self._detections: Counter = Counter()
+        self._crises: Counter = Counter()
+        self._keywords: Counter = Counter()
+        self._alone: Counter = Counter()
+        self._pairs: Counter = Counter()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def configure(self) -> None:
+        self.interval = float(os.getenv("CRISIS_TELEMETRY_SUMMARY_SECONDS", DEFAULT_SUMMARY_SECONDS))
+
+    def record(self, keywords: Sequence[str], lexicon_version: str, seconds: float) -> None:
+        """Records one detection; `keywords` are the de-duplicated keywords found."""
+        outcome = "crisis" if keywords else "clear"
+        CRISIS_DETECTIONS.inc(lexicon_version=lexicon_version, outcome=outcome)
+        CRISIS_DETECT_LATENCY.observe(seconds, lexicon_version=lexicon_version)
+        ordered = sorted(keywords)
+        pairs = list(combinations(ordered, 2))
+        for keyword in ordered:
+            CRISIS_KEYWORD_HITS.inc(keyword=keyword, lexicon_version=lexicon_version)
+        for a, b in pairs:
+            CRISIS_KEYWORD_PAIRS.inc(keyword_a=a, keyword_b=b, lexicon_version=lexicon_version)
+
+        with self._lock:
+            self._detections[lexicon_version] += 1
+            self._latencies.append(seconds)
+            if not keywords:
+                return
+            self._crises[lexicon_version] += 1
+            self._keywords.update((keyword, lexicon_version) for keyword in ordered)
+            if len(ordered) == 1:
+                self._alone[(ordered[0], lexicon_version)] += 1
+            self._pairs.update((a, b, lexicon_version) for a, b in pairs)
+
+    def summary(self, reset: bool = False) -> Dict[str, Any]:
+        """Counts since the last reset; `reset` starts a new window."""
+        with self._lock:
+            window = time.time() - self._started
+            detections, crises = dict(self._detections), dict(self._crises)
+            keywords, alone, pairs = self._keywords, self._alone, self._pairs
+            latencies = list(self._latencies)
+            if reset:
+                self._reset()
+
+        return {
+            "window_seconds": round(window, 1),
+            "detections": sum(detections.values()),
+            "crisis_detections": sum(crises.values()),
+            "lexicon_versions": {
+                version: {"detections": count, "crisis_detections": crises.get(version, 0)}
+                for version, count in detections.items()
+            },
+            "keywords": [
+                {
+                    "keyword": keyword,
+                    "lexicon_version": version,
+                    "hits": hits,
+                    "share_of_crises": round(hits / crises[version], 4),
+                    "alone": alone[(keyword, version)],
+                }
+                for (keyword, version), hits in keywords.most_common(SUMMARY_TOP)
+            ],
+            "co_occurrence": [
+                {"keywords": [a, b], "lexicon_version": version, "hits": hits}
+                for (a, b, version), hits in pairs.most_common(SUMMARY_TOP)
+            ],
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 4),
+                "p95": round(percentile(latencies, 95) * 1000, 4),
+                "p99": round(percentile(latencies, 99) * 1000, 4),
+                "max": round(max(latencies) * 1000, 4) if latencies else 0.0,
+            },
+        }
+
+    def log_summary(self) -> Dict[str, Any]:
+        summary = self.summary(reset=True)
+        top: List[str] = [f"{k['keyword']}={k['hits']}" for k in summary["keywords"][:5]]
+        logger.info(
+            "Crisis detection summary: %d detections, %d crises, top keywords %s, p99 %.3fms",
+            summary["detections"],
+            summary["crisis_detections"],
+            ", ".join(top) or "none",
+            summary["latency_ms"]["p99"],
+            extra={"event": "crisis_telemetry_summary", **summary},
+        )
+        return summary
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.log_summary()
+            except Exception:
+                logger.exception("Crisis telemetry summary failed")
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
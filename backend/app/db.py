@@ -1,18 +1,89 @@
+import base64
+import functools
+import json
 import logging
 import os
+import threading
 import time
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Tuple, List, Dict, Optional, Any
 from neo4j import GraphDatabase
 from neo4j.exceptions import ServiceUnavailable
 
 from .interventions import INTERVENTIONS
+from .read_cache import ReadCache
 
 logger = logging.getLogger(__name__)
 
+# Indexes behind the crisis review queue and crisis analytics. Each is
+# created on its own so one failure (e.g. duplicates blocking a uniqueness
+# constraint on an old database) does not stop the rest.
+CRISIS_SCHEMA = [
+    "CREATE CONSTRAINT crisis_event_id IF NOT EXISTS FOR (c:CrisisEvent) REQUIRE c.id IS UNIQUE",
+    "CREATE INDEX crisis_event_review IF NOT EXISTS FOR (c:CrisisEvent) ON (c.reviewed, c.timestamp)",
+    "CREATE INDEX crisis_event_timestamp IF NOT EXISTS FOR (c:CrisisEvent) ON (c.timestamp)",
+    "CREATE CONSTRAINT crisis_bucket_key IF NOT EXISTS FOR (b:CrisisBucket) REQUIRE (b.granularity, b.start) IS UNIQUE",
+    "CREATE CONSTRAINT journal_entry_id IF NOT EXISTS FOR (j:JournalEntry) REQUIRE j.id IS UNIQUE",
+    "CREATE INDEX journal_entry_crisis_audit_id IF NOT EXISTS FOR (j:JournalEntry) ON (j.crisis_audit_id)",
+]
+
+# Hourly and daily crisis counts, kept up to date as events are logged
+CRISIS_BUCKET_UNITS = ("hour", "day")
+
+# Recorded on a (:SchemaMigration {name: "crisis_events"}) node once the
+# crisis event upgrade has run; bump it when the upgrade changes
+CRISIS_MIGRATION_VERSION = 1
+
+# Adds event `c` to its hour and day CrisisBucket nodes when `created` is true
+_INCREMENT_BUCKETS = """
+    FOREACH (unit IN CASE WHEN created THEN $units ELSE [] END |
+        MERGE (b:CrisisBucket {granularity: unit, start: datetime.truncate(unit, c.timestamp)})
+        ON CREATE SET b.count = 0
+        SET b.count = b.count + 1
+    )
+"""
+
+
+def _writes(method):
+    """Moves the data version on after a write method, whether or not it succeeded."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._bump_data_version()
+    return wrapper
+
+
+def _cached(method):
+    """Serves an analytics read from the read cache, keyed by method and arguments."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._read_cache is None or not self.is_available:
+            return method(self, *args, **kwargs)
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self._read_cache.get(
+            key, lambda: self.data_version, lambda: method(self, *args, **kwargs), name=method.__name__
+        )
+    return wrapper
+
+
 class BehavioralStateManager:
+    _data_epoch = "0"
+    _data_counter = 0
+    _data_lock = threading.Lock()
+    _read_cache: Optional[ReadCache] = None
+
     def __init__(self, uri: str, user: str, password: str, max_retries: int = 5) -> None:
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
         self.is_available = True
+        # Changes on every write so read endpoints can answer If-None-Match
+        # without querying. The epoch makes tags from before a restart stale.
+        self._data_epoch = uuid.uuid4().hex[:8]
+        # Analytics reads are cached until the next write or for this long (0 disables)
+        ttl = float(os.getenv("DB_READ_CACHE_TTL_SECONDS", "30"))
+        self._read_cache = ReadCache(ttl) if ttl > 0 else None
         
         # Retry logic for Neo4j connection
         for attempt in range(1, max_retries + 1):
@@ -43,6 +114,23 @@ class BehavioralStateManager:
     def close(self) -> None:
         self.driver.close()
 
+    @property
+    def data_version(self) -> str:
+        """
+        Opaque token that changes whenever data readable through this manager
+        may have changed. Read it before querying: a write that lands during
+        the query then yields a different token on the next request.
+        """
+        return f"{self._data_epoch}-{self._data_counter}"
+
+    def _bump_data_version(self) -> None:
+        # Also called when a read fails, so a degraded (empty) response is
+        # never confirmed as current once Neo4j is back
+        with self._data_lock:
+            self._data_counter += 1
+        if self._read_cache is not None:
+            self._read_cache.invalidate()
+
     def _bootstrap_nodes(self) -> None:
         """Creates the foundation and warms up the schema."""
         nodes = list(INTERVENTIONS.keys())
@@ -57,6 +145,69 @@ class BehavioralStateManager:
                 WITH e, i DETACH DELETE e, i
             """)
 
+        self._migrate_crisis_events()
+
+    def _migrate_crisis_events(self) -> None:
+        """
+        Creates the crisis indexes and upgrades events written before them:
+        ISO-string timestamps become datetimes (counted into the hourly and
+        daily buckets as they are converted), and journal entries get a
+        HAS_CRISIS_EVENT relationship to the event they reference.
+
+        The upgrade scans every CrisisEvent and JournalEntry, so it only runs
+        until a SchemaMigration marker records CRISIS_MIGRATION_VERSION. Both
+        steps skip records already upgraded, so it is safe to interrupt.
+        A failed step is logged and retried at the next start; it does not
+        take the database offline.
+        """
+        with self.driver.session() as session:
+            for statement in CRISIS_SCHEMA:
+                try:
+                    session.run(statement).consume()
+                except ServiceUnavailable:
+                    raise
+                except Exception:
+                    logger.warning("Could not create crisis index: %s", statement, exc_info=True)
+
+            try:
+                marker = session.run(
+                    "MATCH (m:SchemaMigration {name: 'crisis_events'}) RETURN m.version AS version"
+                ).single()
+                if marker is not None and (marker["version"] or 0) >= CRISIS_MIGRATION_VERSION:
+                    return
+
+                session.run("""
+                    MATCH (c:CrisisEvent)
+                    WHERE c.timestamp = toString(c.timestamp)
+                    CALL {
+                        WITH c
+                        SET c.timestamp = datetime(c.timestamp),
+                            c.reviewed = coalesce(c.reviewed, false)
+                        WITH c, true AS created
+                        """ + _INCREMENT_BUCKETS + """
+                    } IN TRANSACTIONS OF 10000 ROWS
+                """, units=list(CRISIS_BUCKET_UNITS)).consume()
+
+                session.run("""
+                    MATCH (j:JournalEntry)
+                    WHERE j.crisis_audit_id IS NOT NULL AND NOT (j)-[:HAS_CRISIS_EVENT]->()
+                    MATCH (c:CrisisEvent {id: j.crisis_audit_id})
+                    CALL {
+                        WITH j, c
+                        MERGE (j)-[:HAS_CRISIS_EVENT]->(c)
+                    } IN TRANSACTIONS OF 10000 ROWS
+                """).consume()
+
+                session.run(
+                    "MERGE (m:SchemaMigration {name: 'crisis_events'}) SET m.version = $version",
+                    version=CRISIS_MIGRATION_VERSION,
+                ).consume()
+            except ServiceUnavailable:
+                raise
+            except Exception:
+                logger.warning("Crisis event migration failed; will retry at next start", exc_info=True)
+
+    @_writes
     def log_and_analyze(
         self,
         node_name: str,
@@ -107,6 +258,7 @@ class BehavioralStateManager:
             logger.error("DB log_and_analyze error", exc_info=True)
             return "Low", False
 
+    @_writes
     def cleanup_stale_interventions(self, hours_old: int = 1) -> None:
         """Marks old, unresolved interventions as skipped."""
         if not self.is_available:
@@ -135,6 +287,7 @@ class BehavioralStateManager:
         except Exception as e:
             logger.error(f"Cleanup error: {e}", exc_info=True)
 
+    @_writes
     def resolve_intervention(
         self,
         was_successful: bool,
@@ -187,6 +340,7 @@ class BehavioralStateManager:
             self.is_available = False
             logger.error("DB resolve_intervention error", exc_info=True)
 
+    @_writes
     def increment_intervention_seen_count(self, intervention_title: str) -> None:
         """Increment seen_count for an intervention.
 
@@ -205,6 +359,7 @@ class BehavioralStateManager:
             logger.error("DB increment seen_count error", exc_info=True)
             # Non-critical; do not propagate
 
+    @_cached
     def get_history(self) -> List[Dict[str, Any]]:
         """Fetches the last 20 entries for the Dashboard."""
         if not self.is_available:
@@ -235,8 +390,10 @@ class BehavioralStateManager:
                 return history_data
         except Exception:
             logger.error("DB history error", exc_info=True)
+            self._bump_data_version()
             return []
 
+    @_cached
     def get_ai_insight(self) -> Optional[Dict[str, Any]]:
         """Calculates patterns and resilience scores."""
         if not self.is_available:
@@ -317,8 +474,10 @@ class BehavioralStateManager:
         except Exception:
             self.is_available = False
             logger.error("DB insight error", exc_info=True)
+            self._bump_data_version()
             return None
 
+    @_cached
     def get_trend_stats(self) -> Dict[str, int]:
         """Returns count of entries per emotional state."""
         if not self.is_available:
@@ -335,8 +494,10 @@ class BehavioralStateManager:
                 return {record["state"]: record["count"] for record in result}
         except Exception:
             logger.error("DB trend stats error", exc_info=True)
+            self._bump_data_version()
             return {}
 
+    @_writes
     def create_thought_record(
         self,
         situation: str,
@@ -432,6 +593,7 @@ class BehavioralStateManager:
             logger.error("DB shame count error", exc_info=True)
             return 0
 
+    @_writes
     def reset_all_data(self) -> bool:
         """Wipes user data while keeping Node labels."""
         if not self.is_available:
@@ -482,6 +644,7 @@ class BehavioralStateManager:
             logger.error("DB loop path error", exc_info=True)
             return []
 
+    @_cached
     def analyze_loop_path(self, days: int = 30) -> Dict[str, Any]:
         """
         Analyze personal loop patterns: entry point, cycle length, transitions.
@@ -650,21 +813,33 @@ class BehavioralStateManager:
             logger.error("DB get intervention effectiveness error", exc_info=True)
             return {}
 
+    @_writes
     def log_crisis_event(
         self,
         user_id: str,
         keywords: List[str],
         detected_state: Optional[str] = None,
         ip_address: Optional[str] = None,
+        lexicon_version: Optional[str] = None,
+        event_id: Optional[str] = None,
+        timestamp: Optional[str] = None,
     ) -> Optional[str]:
         """
         Log crisis event to audit table for clinical review.
 
+        Idempotent when event_id is given: replaying the same event (e.g. from
+        the local crisis audit log) never creates a duplicate, and only a
+        newly created event is added to the hourly and daily CrisisBucket
+        counts.
+
         Args:
             user_id: User's ID (or None for anonymous)
             keywords: List of detected crisis keywords
             detected_state: AI-detected emotional state (if available)
             ip_address: Request IP address for audit trail
+            lexicon_version: Version of the crisis lexicon that matched
+            event_id: Pre-assigned event ID; generated if omitted
+            timestamp: ISO time the crisis was detected; now if omitted
 
         Returns:
             Crisis event ID (UUID), or None if DB unavailable
@@ -676,19 +851,24 @@ class BehavioralStateManager:
             import uuid
             from datetime import datetime
 
-            event_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat()
+            event_id = event_id or str(uuid.uuid4())
+            timestamp = timestamp or datetime.utcnow().isoformat()
 
             query = """
-            CREATE (c:CrisisEvent {
-                id: $event_id,
-                user_id: $user_id,
-                timestamp: $timestamp,
-                detected_keywords: $keywords,
-                detected_state: $detected_state,
-                ip_address: $ip_address,
-                flagged_for_review: false
-            })
+            MERGE (c:CrisisEvent {id: $event_id})
+            ON CREATE SET
+                c.user_id = $user_id,
+                c.timestamp = datetime($timestamp),
+                c.detected_keywords = $keywords,
+                c.detected_state = $detected_state,
+                c.ip_address = $ip_address,
+                c.lexicon_version = $lexicon_version,
+                c.flagged_for_review = false,
+                c.reviewed = false,
+                c.created_now = true
+            WITH c, coalesce(c.created_now, false) AS created
+            REMOVE c.created_now
+            """ + _INCREMENT_BUCKETS + """
             RETURN c.id as id
             """
 
@@ -702,6 +882,8 @@ class BehavioralStateManager:
                         "keywords": keywords,
                         "detected_state": detected_state,
                         "ip_address": ip_address,
+                        "lexicon_version": lexicon_version,
+                        "units": list(CRISIS_BUCKET_UNITS),
                     },
                 )
                 result.consume()
@@ -715,6 +897,117 @@ class BehavioralStateManager:
             )
             return None
 
+    def get_crisis_review_queue(self, limit: int = 50, cursor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Unreviewed crisis events, oldest first, with the journal text that
+        triggered them.
+
+        Keyset-paginated on (timestamp, id): pass the returned `next_cursor`
+        to get the following page. Each page is an index range seek, so it
+        costs the same at any depth, and events reviewed or added between
+        pages do not shift the others. Raises ValueError for a malformed
+        cursor; returns None if the DB is unavailable.
+        """
+        after = _decode_cursor(cursor) if cursor else None
+        if not self.is_available:
+            return None
+        if after:
+            where = """
+                c.reviewed = false AND c.timestamp >= datetime($after_ts)
+                AND (c.timestamp > datetime($after_ts) OR c.id > $after_id)
+            """
+        else:
+            where = "c.reviewed = false AND c.timestamp IS NOT NULL"
+        try:
+            with self.driver.session() as session:
+                result = session.run(f"""
+                    MATCH (c:CrisisEvent)
+                    WHERE {where}
+                    WITH c ORDER BY c.timestamp, c.id LIMIT $limit
+                    OPTIONAL MATCH (j:JournalEntry)-[:HAS_CRISIS_EVENT]->(c)
+                    RETURN
+                        c.id as id,
+                        c.timestamp as timestamp,
+                        c.detected_keywords as keywords,
+                        c.lexicon_version as lexicon_version,
+                        j.id as journal_entry_id,
+                        j.raw_text as raw_text
+                    ORDER BY c.timestamp, c.id
+                """,
+                    after_ts=after[0] if after else None,
+                    after_id=after[1] if after else None,
+                    limit=limit + 1,
+                )
+                events = []
+                for record in result:
+                    clean = record.data()
+                    clean["timestamp"] = str(clean["timestamp"]) if clean.get("timestamp") else ""
+                    events.append(clean)
+        except Exception:
+            logger.error("DB crisis review queue error", exc_info=True)
+            return None
+
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = _encode_cursor(events[-1]["timestamp"], events[-1]["id"])
+        return {"events": events, "next_cursor": next_cursor}
+
+    @_writes
+    def review_crisis_event(self, event_id: str, notes: Optional[str] = None) -> Optional[bool]:
+        """
+        Marks a crisis event reviewed, removing it from the review queue.
+        Returns False if there is no such event, None if the DB is unavailable.
+        """
+        if not self.is_available:
+            return None
+        try:
+            with self.driver.session() as session:
+                record = session.run("""
+                    MATCH (c:CrisisEvent {id: $id})
+                    SET c.reviewed = true,
+                        c.reviewed_at = datetime(),
+                        c.review_notes = $notes
+                    RETURN c.id as id
+                """, id=event_id, notes=notes or "").single()
+            return record is not None
+        except Exception:
+            logger.error("DB review crisis event error", exc_info=True)
+            return None
+
+    def get_crisis_counts(self, granularity: str, since: datetime, until: datetime) -> Optional[List[Dict[str, Any]]]:
+        """
+        Crisis event counts per hour or day in [since, until), read from the
+        pre-aggregated CrisisBucket nodes rather than by scanning events.
+        Buckets with no events are included with a count of 0.
+        """
+        if granularity not in CRISIS_BUCKET_UNITS:
+            raise ValueError(f"granularity must be one of {', '.join(CRISIS_BUCKET_UNITS)}")
+        if not self.is_available:
+            return None
+        step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+        start = since.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        if granularity == "day":
+            start = start.replace(hour=0)
+        try:
+            with self.driver.session() as session:
+                result = session.run("""
+                    MATCH (b:CrisisBucket {granularity: $granularity})
+                    WHERE b.start >= datetime($since) AND b.start < datetime($until)
+                    RETURN b.start.epochSeconds as epoch, b.count as count
+                """, granularity=granularity, since=start.isoformat(), until=until.isoformat())
+                counts = {record["epoch"]: record["count"] for record in result}
+        except Exception:
+            logger.error("DB crisis counts error", exc_info=True)
+            return None
+
+        buckets = []
+        while start < until:
+            buckets.append({"start": start.isoformat(), "count": counts.get(int(start.timestamp()), 0)})
+            start += step
+        return buckets
+
+    @_writes
     def save_journal_entry(
         self,
         entry_id: str,
@@ -727,33 +1020,43 @@ class BehavioralStateManager:
         intervention_title: str,
         intervention_type: str,
         crisis_audit_id: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        timestamp: Optional[str] = None,
     ) -> bool:
         """
         Saves the raw journal text and analysis result as a JournalEntry node.
         Called from /analyze after AI classification. Non-critical — failure
-        does not block the response.
+        does not block the response. Saving the same entry_id again is a
+        no-op, so replays are safe; `timestamp` (ISO) keeps the original time.
+        A crisis entry is linked to its CrisisEvent by HAS_CRISIS_EVENT.
         """
         if not self.is_available:
             return False
         try:
             with self.driver.session() as session:
                 session.run("""
-                    CREATE (j:JournalEntry {
-                        id: $id,
-                        timestamp: datetime(),
-                        raw_text: $raw_text,
-                        detected_state: $state,
-                        sublabel: $sublabel,
-                        confidence: $confidence,
-                        reasoning: $reasoning,
-                        risk_level: $risk_level,
-                        intervention_title: $title,
-                        intervention_type: $itype,
-                        crisis_detected: $crisis_detected,
-                        crisis_audit_id: $crisis_audit_id
-                    })
+                    MERGE (j:JournalEntry {id: $id})
+                    ON CREATE SET
+                        j.timestamp = coalesce(datetime($timestamp), datetime()),
+                        j.raw_text = $raw_text,
+                        j.detected_state = $state,
+                        j.sublabel = $sublabel,
+                        j.confidence = $confidence,
+                        j.reasoning = $reasoning,
+                        j.risk_level = $risk_level,
+                        j.intervention_title = $title,
+                        j.intervention_type = $itype,
+                        j.crisis_detected = $crisis_detected,
+                        j.crisis_audit_id = $crisis_audit_id,
+                        j.prompt_version = $prompt_version
+                    WITH j
+                    OPTIONAL MATCH (c:CrisisEvent {id: $crisis_audit_id})
+                    FOREACH (_ IN CASE WHEN c IS NULL THEN [] ELSE [1] END |
+                        MERGE (j)-[:HAS_CRISIS_EVENT]->(c)
+                    )
                 """,
                     id=entry_id,
+                    timestamp=timestamp,
                     raw_text=raw_text,
                     state=detected_state,
                     sublabel=sublabel or "",
@@ -764,6 +1067,7 @@ class BehavioralStateManager:
                     itype=intervention_type or "",
                     crisis_detected=crisis_audit_id is not None,
                     crisis_audit_id=crisis_audit_id,
+                    prompt_version=prompt_version,
                 )
             return True
         except Exception:
@@ -792,7 +1096,8 @@ class BehavioralStateManager:
                         j.intervention_title as intervention_title,
                         j.intervention_type as intervention_type,
                         j.user_outcome as user_outcome,
-                        j.user_notes as user_notes
+                        j.user_notes as user_notes,
+                        j.prompt_version as prompt_version
                     ORDER BY j.timestamp DESC
                     LIMIT $limit
                 """, limit=min(limit, 500))
@@ -804,8 +1109,50 @@ class BehavioralStateManager:
                 return entries
         except Exception:
             logger.error("DB get journal entries error", exc_info=True)
+            self._bump_data_version()
             return []
 
+    def get_journal_entry(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns one journal entry's text and classification, or None if missing.
+        """
+        if not self.is_available:
+            return None
+        try:
+            with self.driver.session() as session:
+                record = session.run("""
+                    MATCH (j:JournalEntry {id: $id})
+                    RETURN
+                        j.id as id,
+                        j.raw_text as raw_text,
+                        j.detected_state as detected_state,
+                        j.sublabel as sublabel,
+                        j.reasoning as reasoning
+                """, id=entry_id).single()
+                return record.data() if record else None
+        except Exception:
+            logger.error("DB get journal entry error", exc_info=True)
+            return None
+
+    @_writes
+    def update_journal_reasoning(self, entry_id: str, reasoning: str) -> bool:
+        """
+        Attaches reasoning generated after /analyze returned to its journal entry.
+        """
+        if not self.is_available:
+            return False
+        try:
+            with self.driver.session() as session:
+                session.run("""
+                    MATCH (j:JournalEntry {id: $id})
+                    SET j.reasoning = $reasoning
+                """, id=entry_id, reasoning=reasoning)
+            return True
+        except Exception:
+            logger.error("DB update journal reasoning error", exc_info=True)
+            return False
+
+    @_writes
     def record_journal_outcome(
         self,
         entry_id: str,
@@ -829,6 +1176,20 @@ class BehavioralStateManager:
             logger.error("DB record journal outcome error", exc_info=True)
             return False
 
+def _encode_cursor(timestamp: str, event_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, event_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        timestamp, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(timestamp, str) or not isinstance(event_id, str):
+        raise ValueError("Invalid cursor")
+    return timestamp, event_id
+
+
 def create_db_manager() -> BehavioralStateManager:
     uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     user = os.getenv("NEO4J_USER", "neo4j")
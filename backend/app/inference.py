@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from .jsonstream import JSONObjectStream
+
+try:
+    import llama_cpp
+except ImportError:
+    llama_cpp = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OLLAMA_MODEL = "llama3.2:3b"
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+DEFAULT_EMBED_MODEL = "nomic-embed-text"
+
+
+def get_ollama_model() -> str:
+    return os.getenv("OLLAMA_MODEL", DEFAULT_OLLAMA_MODEL)
+
+
+def get_ollama_url() -> str:
+    return os.getenv("OLLAMA_URL", DEFAULT_OLLAMA_URL)
+
+
+class InferenceBackend(ABC):
+    """
+    Runs classification prompts and text embeddings for the analysis engine.
+
+    `classify` returns a dict shaped like Ollama's /api/generate response:
+    "response" holds the generated text (absent if the backend produced none)
+    and the Ollama timing fields (`load_duration`, `prompt_eval_count`,
+    `prompt_eval_duration`, `eval_count`, `eval_duration`, in nanoseconds)
+    are included when known. `early_stop` is True when generation was cut off
+    once the JSON object was complete. With `stop_at_fields` the stream is
+    also cut once the required fields are present, before any later field.
+    """
+
+    name = "base"
+    # Whether `pull` and the `model` argument work, i.e. a runtime model swap is possible
+    supports_swap = False
+
+    @abstractmethod
+    def default_model(self) -> str:
+        """Model identifier used when the caller does not pick one."""
+
+    @abstractmethod
+    async def classify(
+        self,
+        prompt: str,
+        model: str,
+        required_fields: Iterable[str] = (),
+        stream_early_stop: bool = False,
+        options: Optional[Dict[str, Any]] = None,
+        stop_at_fields: bool = False,
+    ) -> Dict[str, Any]:
+        """Generates a JSON classification for the prompt."""
+
+    @abstractmethod
+    async def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        """Returns an embedding vector for the text."""
+
+    @abstractmethod
+    async def warm(self, model: str, keep_alive: str, timeout: float = 120.0) -> None:
+        """Makes sure the model is loaded; raises on failure."""
+
+    async def pull(self, model: str, timeout: float = 1800.0) -> None:
+        """Fetches a model so it can be served; raises on failure. Only called when `supports_swap`."""
+        raise NotImplementedError(f"The {self.name} backend cannot switch models at runtime")
+
+
+class OllamaBackend(InferenceBackend):
+    """Talks to an Ollama server over HTTP. The URL is read per call so it follows OLLAMA_URL."""
+
+    name = "ollama"
+    supports_swap = True
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 30) -> None:
+        self._url = url
+        self.timeout = timeout
+
+    @property
+    def url(self) -> str:
+        return self._url or get_ollama_url()
+
+    def default_model(self) -> str:
+        return get_ollama_model()
+
+    async def classify(
+        self,
+        prompt: str,
+        model: str,
+        required_fields: Iterable[str] = (),
+        stream_early_stop: bool = False,
+        options: Optional[Dict[str, Any]] = None,
+        stop_at_fields: bool = False,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "format": "json",
+        }
+        if options:
+            payload["options"] = options
+
+        async with httpx.AsyncClient() as client:
+            if stream_early_stop:
+                return await self._stream_generate(client, payload, required_fields, stop_at_fields)
+            response = await client.post(f"{self.url}/api/generate", json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+
+    async def _stream_generate(
+        self,
+        client: httpx.AsyncClient,
+        payload: Dict[str, Any],
+        required_fields: Iterable[str],
+        stop_at_fields: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Streams a generation and stops reading as soon as the JSON object is
+        complete. Leaving the stream context closes the connection, which makes
+        Ollama abort the rest of the generation. Timing stats are only present
+        when the server reached its final chunk.
+        """
+        parser = JSONObjectStream(required_fields, stop_at_fields=stop_at_fields)
+        received_response = False
+        final: Dict[str, Any] = {}
+
+        async with client.stream(
+            "POST", f"{self.url}/api/generate", json={**payload, "stream": True}, timeout=self.timeout
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if "response" in chunk:
+                    received_response = True
+                    if parser.feed(chunk["response"]):
+                        break
+                if chunk.get("done"):
+                    final = chunk
+                    break
+
+        result = {k: v for k, v in final.items() if k != "response"}
+        if received_response:
+            result["response"] = parser.text
+        result["early_stop"] = (parser.object_closed or parser.complete) and not final
+        return result
+
+    async def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.url}/api/embeddings",
+                json={"model": model or os.getenv("OLLAMA_EMBED_MODEL", DEFAULT_EMBED_MODEL), "prompt": text},
+                timeout=self.timeout,
+            )
+        response.raise_for_status()
+        return response.json()["embedding"]
+
+    async def pull(self, model: str, timeout: float = 1800.0) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.url}/api/pull", json={"model": model, "stream": False}, timeout=timeout
+            )
+        response.raise_for_status()
+
+    async def warm(self, model: str, keep_alive: str, timeout: float = 120.0) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": "ok",
+                    "stream": False,
+                    "keep_alive": keep_alive,
+                    "options": {"num_predict": 1},
+                },
+                timeout=timeout,
+            )
+        response.raise_for_status()
+
+
+class LlamaCppBackend(InferenceBackend):
+    """
+    Runs a quantized GGUF model in-process through llama-cpp-python.
+
+    llama.cpp contexts are not thread-safe, so each worker thread gets its own
+    `Llama` instance from a small pool; `LLAMA_CPP_WORKERS` sets the pool size
+    and `LLAMA_CPP_THREADS` the CPU threads each instance uses. Instances are
+    created lazily on first use (or by `warm`), so importing the backend is cheap.
+    """
+
+    name = "llamacpp"
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        embed_model_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        threads: Optional[int] = None,
+        n_ctx: int = 4096,
+        max_tokens: int = 128,
+    ) -> None:
+        self.model_path = model_path or os.getenv("LLAMA_CPP_MODEL_PATH", "")
+        self.embed_model_path = embed_model_path or os.getenv("LLAMA_CPP_EMBED_MODEL_PATH", self.model_path)
+        self.workers = workers or int(os.getenv("LLAMA_CPP_WORKERS", "2"))
+        self.threads = threads or int(os.getenv("LLAMA_CPP_THREADS", str(max(1, (os.cpu_count() or 2) // self.workers))))
+        self.n_ctx = n_ctx
+        self.max_tokens = max_tokens
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="llamacpp")
+        self._pool: "queue.Queue" = queue.Queue()
+        self._created = 0
+        # Executor threads create instances concurrently
+        self._create_lock = threading.Lock()
+        self._embed_lock = threading.Lock()
+        self._embedder = None
+
+    def default_model(self) -> str:
+        return os.path.basename(self.model_path) or "llamacpp"
+
+    def _new_instance(self, path: str, embedding: bool = False):
+        if llama_cpp is None:
+            raise RuntimeError("llama-cpp-python is not installed; pip install llama-cpp-python")
+        if not path:
+            raise RuntimeError("LLAMA_CPP_MODEL_PATH must point to a GGUF model file")
+        return llama_cpp.Llama(
+            model_path=path,
+            n_ctx=self.n_ctx,
+            n_threads=self.threads,
+            embedding=embedding,
+            verbose=False,
+        )
+
+    def _reserve_instance(self) -> bool:
+        """Claims one of the `workers` instance slots; False once all are taken."""
+        with self._create_lock:
+            if self._created >= self.workers:
+                return False
+            self._created += 1
+            return True
+
+    def _create_reserved(self):
+        try:
+            return self._new_instance(self.model_path)
+        except Exception:
+            with self._create_lock:
+                self._created -= 1
+            raise
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            if self._reserve_instance():
+                return self._create_reserved()
+            return self._pool.get()
+
+    def _complete(
+        self,
+        prompt: str,
+        required_fields: Iterable[str],
+        stream_early_stop: bool,
+        options: Dict[str, Any],
+        stop_at_fields: bool,
+    ) -> Dict[str, Any]:
+        llm = self._acquire()
+        try:
+            started = time.perf_counter()
+            parser = JSONObjectStream(required_fields, stop_at_fields=stop_at_fields)
+            generated = 0
+            for chunk in llm.create_completion(
+                prompt,
+                max_tokens=options.get("num_predict", self.max_tokens),
+                temperature=options.get("temperature", 0.2),
+                stream=True,
+            ):
+                generated += 1
+                if parser.feed(chunk["choices"][0]["text"]) and stream_early_stop:
+                    break
+            elapsed = time.perf_counter() - started
+            prompt_tokens = len(llm.tokenize(prompt.encode("utf-8")))
+            return {
+                "response": parser.text,
+                "load_duration": 0,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": generated,
+                "eval_duration": int(elapsed * 1e9),
+                "early_stop": stream_early_stop and (parser.object_closed or parser.complete),
+            }
+        finally:
+            self._pool.put(llm)
+
+    async def classify(
+        self,
+        prompt: str,
+        model: str,
+        required_fields: Iterable[str] = (),
+        stream_early_stop: bool = False,
+        options: Optional[Dict[str, Any]] = None,
+        stop_at_fields: bool = False,
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self._complete,
+            prompt,
+            tuple(required_fields),
+            stream_early_stop,
+            options or {},
+            stop_at_fields,
+        )
+
+    def _embed(self, text: str) -> List[float]:
+        if self._embedder is None:
+            with self._embed_lock:
+                if self._embedder is None:
+                    self._embedder = self._new_instance(self.embed_model_path, embedding=True)
+        return list(self._embedder.embed(text))
+
+    async def embed(self, text: str, model: Optional[str] = None) -> List[float]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._embed, text)
+
+    async def warm(self, model: str, keep_alive: str, timeout: float = 120.0) -> None:
+        # Loading a GGUF file is the cold cost; do it once per worker up front
+        loop = asyncio.get_running_loop()
+
+        def load_all() -> None:
+            while self._reserve_instance():
+                self._pool.put(self._create_reserved())
+
+        await loop.run_in_executor(self._executor, load_all)
+
+
+BACKENDS = {
+    OllamaBackend.name: OllamaBackend,
+    LlamaCppBackend.name: LlamaCppBackend,
+}
+
+_instances: Dict[str, InferenceBackend] = {}
+
+# Model chosen at runtime (see app.model_swap); None means the backend default.
+# Requests read it once when they start, so swapping it never affects a call
+# that is already in flight.
+_active_model: Optional[str] = None
+
+
+def get_backend(name: Optional[str] = None) -> InferenceBackend:
+    """Returns the configured backend (INFERENCE_BACKEND, default "ollama"), created once per process."""
+    name = (name or os.getenv("INFERENCE_BACKEND", OllamaBackend.name)).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+
+def get_active_model() -> str:
+    """The model new classification requests should use."""
+    return _active_model or get_backend().default_model()
+
+
+def set_active_model(model: Optional[str]) -> None:
+    global _active_model
+    _active_model = model
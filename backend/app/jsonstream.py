@@ -0,0 +1,101 @@
+import json
+from typing import Iterable, Optional
+
+
+class JSONObjectStream:
+    """
+    Incremental scanner for a single JSON object arriving in token-sized pieces.
+
+    Tracks string/escape state and nesting depth so it can tell, without
+    re-parsing the whole buffer on every token, when the top-level object has
+    closed. Anything the model emits after that (trailing whitespace, a second
+    object, chatter) is ignored.
+
+    `complete` becomes True once the object has closed and contains every
+    required field. With `stop_at_fields=True` it also becomes True as soon as
+    the required fields are present at the top level, even if the model is
+    still writing later fields (e.g. a long "reasoning"); `text` is then the
+    object closed right after the last complete field.
+    """
+
+    def __init__(self, required_fields: Iterable[str] = (), stop_at_fields: bool = False) -> None:
+        self.required_fields = frozenset(required_fields)
+        self.stop_at_fields = stop_at_fields
+        self._buffer: list = []
+        self._length = 0
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._closed_prefix: Optional[str] = None
+        self.complete = False
+
+    @property
+    def raw(self) -> str:
+        return "".join(self._buffer)
+
+    @property
+    def text(self) -> str:
+        """The JSON object text if one was captured, otherwise everything received."""
+        if self._closed_prefix is not None:
+            return self._closed_prefix
+        raw = self.raw
+        if self._start is not None and self._end is not None:
+            return raw[self._start : self._end]
+        return raw
+
+    @property
+    def object_closed(self) -> bool:
+        return self._end is not None
+
+    def _has_required(self, candidate: str) -> bool:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            return False
+        return isinstance(data, dict) and self.required_fields <= data.keys()
+
+    def feed(self, piece: str) -> bool:
+        """Consumes the next piece of model output. Returns True once generation can stop."""
+        if self.complete or self.object_closed:
+            return self.complete
+
+        offset = self._length
+        self._buffer.append(piece)
+        self._length += len(piece)
+
+        for i, ch in enumerate(piece):
+            pos = offset + i
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                if self._start is not None:
+                    self._in_string = True
+            elif ch in "{[":
+                if self._start is None:
+                    if ch != "{":
+                        continue
+                    self._start = pos
+                self._depth += 1
+            elif ch in "}]" and self._start is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = pos + 1
+                    self.complete = self._has_required(self.text)
+                    # An object without the required fields is still final
+                    return True
+            elif ch == "," and self._depth == 1 and self.stop_at_fields:
+                candidate = self.raw[self._start : pos] + "}"
+                if self._has_required(candidate):
+                    self._closed_prefix = candidate
+                    self.complete = True
+                    return True
+        return False
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .matcher import DEFAULT_FUZZY_EXCLUDE, FuzzyKeywordMatcher, KeywordMatcher
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELOAD_SECONDS = 30.0
+
+LEXICON_RELOADS = metrics.counter(
+    "crisis_lexicon_reloads_total",
+    "Crisis lexicon reload attempts by outcome (applied, unchanged, rejected).",
+)
+
+
+class LexiconError(ValueError):
+    pass
+
+
+def fuzzy_max_distance() -> int:
+    """Edit distance allowed by typo-tolerant matching, or 0 when CRISIS_FUZZY_MATCHING is off."""
+    if os.getenv("CRISIS_FUZZY_MATCHING", "false").lower() != "true":
+        return 0
+    return int(os.getenv("CRISIS_FUZZY_MAX_DISTANCE", "1"))
+
+
+@dataclass(frozen=True)
+class Lexicon:
+    """
+    A crisis keyword list with its version and the matchers compiled from it.
+
+    With `fuzzy_distance` above 0 a typo-tolerant matcher is compiled as
+    well; it only adds keywords where the exact matcher found nothing, so
+    exact results are never changed.
+    """
+
+    version: str
+    keywords: List[str]
+    source: str = "builtin"
+    fuzzy_distance: int = field(default_factory=fuzzy_max_distance)
+    fuzzy_exclude: Tuple[str, ...] = DEFAULT_FUZZY_EXCLUDE
+    matcher: KeywordMatcher = field(init=False, repr=False, compare=False)
+    fuzzy_matcher: Optional[FuzzyKeywordMatcher] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "matcher", KeywordMatcher(self.keywords))
+        fuzzy = FuzzyKeywordMatcher(self.keywords, self.fuzzy_distance, self.fuzzy_exclude) if self.fuzzy_distance else None
+        object.__setattr__(self, "fuzzy_matcher", fuzzy)
+
+    def find(self, text: str) -> List[str]:
+        """Keywords in order of appearance: exact matches as typed, fuzzy ones as the lexicon spells them."""
+        spans = self.matcher.find_spans(text)
+        if self.fuzzy_matcher is not None:
+            exact = list(spans)
+            spans.extend(
+                match for match in self.fuzzy_matcher.find_all(text)
+                if not any(match[0] < end and start < match[1] for start, end, _ in exact)
+            )
+            spans.sort()
+        return [keyword for _, _, keyword in spans]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "keywords": len(self.keywords),
+            "fuzzy_distance": self.fuzzy_distance,
+        }
+
+
+def _keyword_list(raw: Any) -> List[str]:
+    """Accepts a flat list or a {language: [keywords]} mapping; returns stripped, de-duplicated keywords."""
+    groups = raw.values() if isinstance(raw, dict) else [raw]
+    keywords: List[str] = []
+    for group in groups:
+        if not isinstance(group, list) or not all(isinstance(k, str) for k in group):
+            raise LexiconError("'keywords' must be a list of strings or a mapping of language to lists of strings")
+        keywords.extend(k.strip() for k in group)
+    if any(not k for k in keywords):
+        raise LexiconError("Lexicon contains an empty keyword")
+    keywords = list(dict.fromkeys(keywords))
+    if not keywords:
+        raise LexiconError("Lexicon has no keywords")
+    return keywords
+
+
+def validate_lexicon(lexicon: Lexicon, match: Sequence[str] = (), no_match: Sequence[str] = ()) -> None:
+    """
+    Raises LexiconError unless every keyword can actually be matched and the
+    lexicon's own check sentences behave as declared.
+
+    A keyword that starts or ends with punctuation never sits on a word
+    boundary, so it would silently never fire; those are rejected here
+    rather than discovered after a missed crisis.
+    """
+    unmatchable = [k for k in lexicon.keywords if lexicon.matcher.find_all(f"I said {k} today") == []]
+    if unmatchable:
+        raise LexiconError(f"Keywords can never match at word boundaries: {', '.join(unmatchable)}")
+    missed = [text for text in match if not lexicon.find(text)]
+    if missed:
+        raise LexiconError(f"Check sentences not detected: {missed}")
+    flagged = [text for text in no_match if lexicon.find(text)]
+    if flagged:
+        raise LexiconError(f"Check sentences wrongly detected: {flagged}")
+
+
+def load_lexicon_file(path: str) -> Lexicon:
+    """
+    Reads, compiles and validates a lexicon file:
+
+        {
+          "version": "2026-10-01",
+          "keywords": {"en": ["suicide", ...], "es": ["suicidio", ...]},
+          "checks": {"match": ["I want to end my life"], "no_match": ["I had a good day"]},
+          "fuzzy_exclude": ["overdone"]
+        }
+
+    `keywords` may also be a flat list. `fuzzy_exclude` lists ordinary words
+    that typo-tolerant matching must not treat as misspelled keywords.
+    Raises LexiconError if the file is unreadable or fails validation.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise LexiconError(f"Could not read lexicon {path}: {exc}") from exc
+    if not isinstance(data, dict):
+        raise LexiconError("Lexicon file must contain a JSON object")
+
+    version = data.get("version")
+    if not isinstance(version, str) or not version.strip():
+        raise LexiconError("Lexicon 'version' must be a non-empty string")
+
+    exclude = data.get("fuzzy_exclude", [])
+    if not isinstance(exclude, list) or not all(isinstance(w, str) for w in exclude):
+        raise LexiconError("'fuzzy_exclude' must be a list of strings")
+
+    lexicon = Lexicon(
+        version.strip(),
+        _keyword_list(data.get("keywords")),
+        source=path,
+        fuzzy_exclude=tuple(dict.fromkeys([*DEFAULT_FUZZY_EXCLUDE, *exclude])),
+    )
+    checks = data.get("checks") or {}
+    validate_lexicon(lexicon, match=checks.get("match", []), no_match=checks.get("no_match", []))
+    return lexicon
+
+
+class LexiconReloader:
+    """
+    Watches a lexicon file and hot-swaps the crisis service's lexicon.
+
+    When the file's modification time changes, it is parsed, compiled and
+    validated in a worker thread, so the event loop keeps serving requests
+    while a large lexicon compiles. Only a lexicon that passes validation
+    and carries a new version is installed, by replacing the service's
+    single lexicon reference; detection calls in progress finish with the
+    lexicon they started with. A rejected file leaves the current lexicon
+    in place.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: float = DEFAULT_RELOAD_SECONDS) -> None:
+        self.path = path
+        self.interval = interval
+        self.service: Any = None
+        self.last_error: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, service: Any) -> None:
+        """Reads CRISIS_LEXICON_PATH and CRISIS_LEXICON_RELOAD_SECONDS (0 disables polling)."""
+        self.service = service
+        self.path = os.getenv("CRISIS_LEXICON_PATH") or None
+        self.interval = float(os.getenv("CRISIS_LEXICON_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS))
+        self._mtime = self._current_mtime()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime if self.path else None
+        except OSError:
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active": self.service.lexicon.summary() if self.service else None,
+            "path": self.path,
+            "reload_interval_seconds": self.interval,
+            "last_error": self.last_error,
+        }
+
+    async def reload(self) -> str:
+        """Loads the file now; returns the outcome (applied, unchanged or rejected)."""
+        if not self.path or self.service is None:
+            raise LexiconError("No crisis lexicon file is configured (set CRISIS_LEXICON_PATH)")
+        async with self._lock:
+            self._mtime = self._current_mtime()
+            try:
+                lexicon = await asyncio.to_thread(load_lexicon_file, self.path)
+                current = self.service.lexicon
+                if lexicon.version == current.version:
+                    if lexicon.keywords != current.keywords:
+                        raise LexiconError(f"Keywords changed but version is still '{lexicon.version}'")
+                    outcome = "unchanged"
+                else:
+                    self.service.swap_lexicon(lexicon)
+                    outcome = "applied"
+                self.last_error = None
+            except LexiconError as exc:
+                self.last_error = str(exc)
+                LEXICON_RELOADS.inc(outcome="rejected")
+                logger.warning(
+                    "Crisis lexicon reload rejected: %s",
+                    exc,
+                    extra={"event": "crisis_lexicon_rejected", "path": self.path},
+                )
+                return "rejected"
+
+        LEXICON_RELOADS.inc(outcome=outcome)
+        if outcome == "applied":
+            logger.info(
+                "Crisis lexicon '%s' applied (was '%s')",
+                lexicon.version,
+                current.version,
+                extra={"event": "crisis_lexicon_applied", "version": lexicon.version, "previous_version": current.version},
+            )
+        return outcome
+
+    async def check(self) -> Optional[str]:
+        """Reloads if the file changed since it was last read."""
+        if self.path and self._current_mtime() != self._mtime:
+            return await self.reload()
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception:
+                logger.exception("Crisis lexicon watcher failed")
+
+    def start(self) -> None:
+        if self._task is None and self.path and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+lexicon_reloader = LexiconReloader()
@@ -1,35 +1,50 @@
+import asyncio
+import hmac
 import logging
 import os
 import time
 import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 
 import httpx
-from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi import BackgroundTasks, Depends, FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 
 try:
     import sentry_sdk
 except ImportError:
     sentry_sdk = None
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 
-from .ai import query_local_ai
-from .crisis import CrisisSafetyService
+from .ai import FALLBACK_REASONINGS, generate_reasoning, get_warm_models, query_local_ai
+from .inference import OllamaBackend, get_backend, get_ollama_model, get_ollama_url
+from .audit_log import audit_replicator, crisis_audit_log
+from .crisis import CRISIS_SCREEN_ALERTS, CRISIS_SCREEN_SESSIONS, CrisisSafetyService, CrisisScreenSession
 from .db import BehavioralStateManager, create_db_manager
-from .interventions import INTERVENTIONS
+from .catalog import lookup as catalog_lookup
+from .lexicon import LexiconError, lexicon_reloader
+from .metrics import metrics
+from .model_swap import SwapInProgressError, model_swap
+from .residency import model_residency
+from .semantic_cache import semantic_cache
+from .serialization import trusted_response
+from .shadow import shadow_evaluator
 from .models import (
     AnalysisRequest,
     AnalysisResponse,
+    CrisisBatchScreenRequest,
     CrisisHotline,
     CrisisResourcesResponse,
+    CrisisReviewRequest,
     FeedbackRequest,
     InsightResponse,
     InterventionStats,
     JournalEntryResponse,
     JournalOutcomeRequest,
+    JournalReasoningResponse,
+    ModelSwapRequest,
     PersonalLoopContext,
     ThoughtRecordRequest,
     ThoughtRecordResponse,
@@ -42,28 +57,59 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     app.state.db = create_db_manager()
     app.state.crisis_service = CrisisSafetyService()
+    # Pick up edits to the crisis lexicon file without a restart
+    lexicon_reloader.configure(app.state.crisis_service)
+    lexicon_reloader.start()
+    # Log which crisis keywords fired, and detection latency, periodically
+    app.state.crisis_service.telemetry.configure()
+    app.state.crisis_service.telemetry.start()
+
+    # Replay crisis audit records that did not reach Neo4j before a restart
+    crisis_audit_log.configure()
+    audit_replicator.configure(app.state.db)
+    audit_replicator.start()
 
     # Initialize Sentry if DSN is provided and sentry_sdk is installed
     sentry_dsn = os.getenv("SENTRY_DSN", "")
     if sentry_dsn and sentry_sdk:
         sentry_sdk.init(dsn=sentry_dsn, traces_sample_rate=0.1)
 
-    try:
-        url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/api/tags")
-        models = [m["name"] for m in response.json().get("models", [])]
-
-        target = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
-        if any(target in m for m in models):
-            logger.info("AI Ready: Model '%s' is loaded.", target)
-        else:
-            logger.warning("AI: Model '%s' not found. Run 'ollama pull %s'", target, target)
-    except Exception:
-        logger.warning("AI: Ollama service not detected")
+    url = get_ollama_url()
+    backend = get_backend()
+    if isinstance(backend, OllamaBackend):
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"{url}/api/tags")
+            models = [m["name"] for m in response.json().get("models", [])]
+
+            target = get_ollama_model()
+            if any(target in m for m in models):
+                logger.info("AI: Model '%s' is available, warming up.", target)
+            else:
+                logger.warning("AI: Model '%s' not found. Run 'ollama pull %s'", target, target)
+        except Exception:
+            logger.warning("AI: Ollama service not detected")
+    else:
+        logger.info("AI: Using in-process '%s' backend with model '%s'.", backend.name, backend.default_model())
+
+    # Preload the model(s) and keep them resident while traffic is low
+    model_residency.configure(get_warm_models(), url, backend=backend)
+    model_residency.start()
+
+    semantic_cache.configure()
+
+    # Mirror a sample of /analyze traffic to a candidate model/prompt
+    shadow_evaluator.configure()
+    shadow_evaluator.start()
 
     yield
 
+    await shadow_evaluator.stop()
+    await lexicon_reloader.stop()
+    await audit_replicator.stop()
+    await app.state.crisis_service.telemetry.stop()
+    await model_residency.stop()
+    app.state.crisis_service.close()
     app.state.db.close()
 
 
@@ -82,6 +128,12 @@ FEATURE_MOVEMENT_PROTOCOLS = os.getenv("FEATURE_MOVEMENT_PROTOCOLS", "false").lo
 # Crisis Safety Feature
 FEATURE_CRISIS_SAFETY = os.getenv("FEATURE_CRISIS_SAFETY", "true").lower() == "true"
 
+# Classify with a label-only prompt and generate reasoning after responding
+FEATURE_DEFERRED_REASONING = os.getenv("FEATURE_DEFERRED_REASONING", "false").lower() == "true"
+
+# Journal entries whose reasoning is currently being generated
+_reasoning_in_flight: set = set()
+
 app = FastAPI(title="LoopBreaker AI Analysis Engine", lifespan=lifespan)
 
 app.add_middleware(
@@ -91,6 +143,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -129,6 +182,23 @@ def get_db(request: Request) -> BehavioralStateManager:
     return request.app.state.db
 
 
+def _not_modified(request: Request, response: Response, db: BehavioralStateManager) -> Optional[Response]:
+    """
+    Tags a dashboard read with the DB's data version. Returns a 304 to send
+    instead of querying Neo4j when the client's If-None-Match still matches.
+    """
+    version = getattr(db, "data_version", None)
+    if version is None or not db.is_available:
+        return None
+    etag = f'W/"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 def _build_crisis_response() -> AnalysisResponse:
     """Build crisis response with hotline resources."""
     return AnalysisResponse(
@@ -210,39 +280,138 @@ def compute_arc_position(node: str, sublabel: Optional[str]) -> tuple:
     return (base_pos, f"Node {base_pos} of 8 — {base_label.split(' — ')[1] if ' — ' in base_label else base_label}")
 
 
+async def attach_reasoning(
+    db: BehavioralStateManager, entry_id: str, text: str, node: str, sublabel: str, request_id: str = ""
+) -> Optional[str]:
+    """Generates reasoning for a saved journal entry and stores it. Returns the reasoning, or None on failure."""
+    _reasoning_in_flight.add(entry_id)
+    try:
+        reasoning = await generate_reasoning(text, node, sublabel, request_id=request_id)
+        if reasoning:
+            db.update_journal_reasoning(entry_id, reasoning)
+        return reasoning
+    except Exception:
+        logger.warning("Deferred reasoning failed", exc_info=True, extra={"request_id": request_id})
+        return None
+    finally:
+        _reasoning_in_flight.discard(entry_id)
+
+
+async def _log_crisis_durably(
+    crisis_event: dict, journal_entry: dict, db: BehavioralStateManager, background_tasks: BackgroundTasks
+) -> bool:
+    """
+    Appends the crisis audit and journal records to the fsync'd local log and
+    replicates them to Neo4j after the response is sent. Returns False if the
+    local log is not configured or could not be written.
+    """
+    if not crisis_audit_log.enabled:
+        return False
+    timestamp = datetime.utcnow().isoformat()
+    records = [
+        {"id": f"crisis_event:{crisis_event['event_id']}", "kind": "crisis_event", "payload": {**crisis_event, "timestamp": timestamp}},
+        {"id": f"journal_entry:{journal_entry['entry_id']}", "kind": "journal_entry", "payload": {**journal_entry, "timestamp": timestamp}},
+    ]
+    try:
+        await asyncio.to_thread(crisis_audit_log.append, records)
+    except OSError:
+        logger.error("Crisis audit log write failed; writing to Neo4j directly", exc_info=True)
+        return False
+    background_tasks.add_task(audit_replicator.replicate, db)
+    return True
+
+
+async def _fetch_personal_loop(db: BehavioralStateManager) -> Optional[PersonalLoopContext]:
+    """The user's loop pattern over the last 30 days, or None (non-critical)."""
+    try:
+        loop_data = await asyncio.to_thread(db.analyze_loop_path, days=30)
+    except Exception:
+        logger.warning("Failed to fetch loop pattern", exc_info=True)
+        return None
+    if not loop_data:
+        return None
+    return PersonalLoopContext(
+        most_common_entry=loop_data.get("most_common_entry"),
+        cycle_length_hours=loop_data.get("cycle_length_hours"),
+        where_in_cycle=loop_data.get("where_in_cycle")
+    )
+
+
+async def _fetch_effectiveness(
+    db: BehavioralStateManager, node: str, sublabel: str
+) -> Optional[Dict[str, InterventionStats]]:
+    """Per-intervention outcome stats for this state and sublabel, or None (non-critical)."""
+    try:
+        effectiveness_data = await asyncio.to_thread(db.get_intervention_effectiveness, state=node, sublabel=sublabel)
+    except Exception:
+        logger.warning("Failed to fetch intervention effectiveness", exc_info=True)
+        return None
+    if not effectiveness_data:
+        return None
+    return {key: InterventionStats(**value) for key, value in effectiveness_data.items()}
+
+
+async def _check_shame_alert(db: BehavioralStateManager, request_id: str) -> bool:
+    """Shame safety alert: 3+ Shame entries in 24h, counting the one just logged."""
+    try:
+        return await asyncio.to_thread(db.get_shame_count_24h) >= 3
+    except Exception:
+        logger.error("Shame count check failed", exc_info=True, extra={"request_id": request_id})
+        return False
+
+
+async def _increment_seen_count(db: BehavioralStateManager, title: str) -> None:
+    try:
+        await asyncio.to_thread(db.increment_intervention_seen_count, title)
+    except Exception:
+        pass  # Non-critical
+
+
 @app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_behavior(body: AnalysisRequest, request: Request, db: BehavioralStateManager = Depends(get_db)):
+async def analyze_behavior(
+    body: AnalysisRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: BehavioralStateManager = Depends(get_db),
+):
     request_id = getattr(request.state, "request_id", "")
 
     # ===== NEW: Crisis Detection =====
     if FEATURE_CRISIS_SAFETY:
-        is_crisis, keywords = app.state.crisis_service.detect_crisis(body.user_text)
+        is_crisis, keywords, lexicon_version = app.state.crisis_service.detect_crisis_versioned(body.user_text)
 
         if is_crisis:
             # Log to audit table
             user_id = None  # TODO: Extract from auth if available
             ip_address = request.client.host if request.client else "unknown"
-            crisis_audit_id = db.log_crisis_event(
-                user_id=user_id,
-                keywords=keywords,
-                detected_state=None,  # Not yet classified
-                ip_address=ip_address,
-            )
-
-            # Save to journal with crisis flag
+            crisis_audit_id = str(uuid.uuid4())
             entry_id = str(uuid.uuid4())
-            db.save_journal_entry(
-                entry_id=entry_id,
-                raw_text=body.user_text,
-                detected_state="Crisis",
-                sublabel="",
-                confidence=1.0,
-                reasoning="Crisis keywords detected",
-                risk_level="high",
-                intervention_title="Crisis Resources",
-                intervention_type="crisis",
-                crisis_audit_id=crisis_audit_id,
-            )
+            crisis_event = {
+                "user_id": user_id,
+                "keywords": keywords,
+                "detected_state": None,  # Not yet classified
+                "ip_address": ip_address,
+                "lexicon_version": lexicon_version,
+                "event_id": crisis_audit_id,
+            }
+            # Save to journal with crisis flag
+            journal_entry = {
+                "entry_id": entry_id,
+                "raw_text": body.user_text,
+                "detected_state": "Crisis",
+                "sublabel": "",
+                "confidence": 1.0,
+                "reasoning": "Crisis keywords detected",
+                "risk_level": "high",
+                "intervention_title": "Crisis Resources",
+                "intervention_type": "crisis",
+                "crisis_audit_id": crisis_audit_id,
+            }
+
+            if not await _log_crisis_durably(crisis_event, journal_entry, db, background_tasks):
+                # No local audit log: write to Neo4j before responding
+                crisis_audit_id = db.log_crisis_event(**crisis_event)
+                db.save_journal_entry(**{**journal_entry, "crisis_audit_id": crisis_audit_id})
 
             # Log to Sentry
             logger.warning(
@@ -252,6 +421,7 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
                     "keywords": keywords,
                     "crisis_audit_id": crisis_audit_id,
                     "entry_id": entry_id,
+                    "lexicon_version": lexicon_version,
                 },
             )
 
@@ -259,12 +429,41 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
             response = _build_crisis_response()
             response.detected_keywords = keywords
             response.journal_entry_id = entry_id
-            return response
+            return trusted_response(response, AnalysisResponse, endpoint="analyze")
 
     # ===== Continue with normal flow (existing code) =====
+    # The rest of /analyze is a dependency graph. Stages on one row run
+    # concurrently; blocking DB calls run in worker threads:
+    #
+    #   classify (LLM)       loop path                       <- needs no label
+    #         |
+    #   log_and_analyze      effectiveness                   <- need the label
+    #         |
+    #   save journal entry   shame count      seen count     <- need the logged entry
+    #
+    # Latency is the LLM call plus two DB round trips: the journal entry
+    # stores the risk level log_and_analyze computes.
+    loop_stage = asyncio.create_task(_fetch_personal_loop(db))
+
     # 1. Get Intelligence from ai.py
     # Returns: {"detected_node": "...", "confidence": 0.0, "reasoning": "..."}
-    prediction = await query_local_ai(body.user_text, request_id=request_id)
+    ai_started = time.perf_counter()
+    try:
+        with shadow_evaluator.live_call():
+            if FEATURE_DEFERRED_REASONING:
+                # Label only: the intervention does not depend on the reasoning text
+                prediction = await query_local_ai(body.user_text, request_id=request_id, include_reasoning=False)
+            else:
+                prediction = await query_local_ai(body.user_text, request_id=request_id)
+    except BaseException:
+        loop_stage.cancel()
+        raise
+    ai_latency = time.perf_counter() - ai_started
+    # Semantic cache hits come back without reasoning; generate it like deferred reasoning
+    reasoning_pending = (
+        (FEATURE_DEFERRED_REASONING or not prediction["reasoning"])
+        and prediction["reasoning"] not in FALLBACK_REASONINGS
+    )
 
     # Ensure the node name matches our DB labels (Title Case)
     node = prediction["detected_node"].title()
@@ -274,119 +473,75 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
         or "General"
     )
 
-    # 2. Get the specific "Circuit Breaker" from interventions.py
-    # Supports both simple interventions and sublabel-variant interventions.
-    # Variants have a None key for default; simple interventions are just the dict.
-    intervention_options = INTERVENTIONS.get(node)
+    # 2. Get the specific "Circuit Breaker" from the compiled catalog
+    # Heuristic: first exposure = introduce, 2-4 = reinforce, 5+ = deepen
+    # (For MVP, we use a simple heuristic; later phases can fetch seen_count from DB)
+    education_depth = "introduce"
+    # The sublabel's variant, else the state's default, else a general check-in
+    breaker = catalog_lookup(node, sublabel, education_depth)
 
-    if intervention_options and None in intervention_options:
-        # State has sublabel variants—try to match sublabel first, then None default
-        breaker = intervention_options.get(sublabel) or intervention_options.get(None)
-    else:
-        # Regular intervention (no variants, or state not found)
-        breaker = intervention_options or {
-            "title": "General Check-in",
-            "task": "Take a moment to breathe and observe your surroundings.",
-            "education": "Checking in helps move from reactive patterns to conscious awareness."
-        }
-
-    # 3. Log to Neo4j via db.py and check for behavioral loops
+    # 3. Log to Neo4j via db.py and check for behavioral loops, while the
+    # reads that only need the label run alongside
+    effectiveness_stage = asyncio.create_task(_fetch_effectiveness(db, node, sublabel))
     # This stores the entry and links it to the Node and Intervention
     try:
-        risk, is_loop = db.log_and_analyze(
+        risk, is_loop = await asyncio.to_thread(
+            db.log_and_analyze,
             node,
             prediction["confidence"],
-            breaker["title"],
-            breaker["task"],
+            breaker.title,
+            breaker.task,
             sublabel=sublabel,
         )
     except Exception:
         logger.error("DB log failed in /analyze", exc_info=True, extra={"request_id": request_id})
         risk, is_loop = "Low", False
 
-    # 3b. Fetch personal context (non-blocking, non-critical)
-    personal_loop = None
-    intervention_effectiveness = None
-
-    try:
-        loop_data = db.analyze_loop_path(days=30)
-        if loop_data:
-            personal_loop = PersonalLoopContext(
-                most_common_entry=loop_data.get("most_common_entry"),
-                cycle_length_hours=loop_data.get("cycle_length_hours"),
-                where_in_cycle=loop_data.get("where_in_cycle")
-            )
-    except Exception:
-        logger.warning("Failed to fetch loop pattern", exc_info=True)
+    # 3b. Stages that need the logged entry: the seen count updates the
+    # Intervention node log_and_analyze created, the Shame alert counts the Entry
+    seen_stage = asyncio.create_task(_increment_seen_count(db, breaker.title))
+    shame_stage = None
+    if FEATURE_SHAME_PROTOCOL and node == "Shame":
+        shame_stage = asyncio.create_task(_check_shame_alert(db, request_id))
 
+    # 3c. Save journal entry for persistence and outcome tracking
+    entry_id = str(uuid.uuid4())
     try:
-        effectiveness_data = db.get_intervention_effectiveness(
-            state=node,
-            sublabel=sublabel
+        saved = await asyncio.to_thread(
+            db.save_journal_entry,
+            entry_id=entry_id,
+            raw_text=body.user_text,
+            detected_state=node,
+            sublabel=sublabel or "",
+            confidence=prediction["confidence"],
+            reasoning=prediction["reasoning"],
+            risk_level=risk,
+            intervention_title=breaker.title,
+            intervention_type=breaker.type or "",
+            prompt_version=prediction.get("prompt_version"),
         )
-        if effectiveness_data:
-            intervention_effectiveness = {
-                key: InterventionStats(**value)
-                for key, value in effectiveness_data.items()
-            }
     except Exception:
-        logger.warning("Failed to fetch intervention effectiveness", exc_info=True)
+        logger.error("Journal entry save failed", exc_info=True, extra={"request_id": request_id})
+        # Non-critical; do not propagate
+        saved = False
+
+    # 3d. Join the remaining stages (each one handles its own failures)
+    personal_loop = await loop_stage
+    intervention_effectiveness = await effectiveness_stage
+    shame_safety_alert = await shame_stage if shame_stage is not None else None
+    await seen_stage
 
     # 4. Compute arc position (8-node loop positioning)
     arc_pos, arc_label = compute_arc_position(node, sublabel)
 
-    # 5. Build list of available intervention variants for this state/sublabel
-    variants = None
-    intervention_options = INTERVENTIONS.get(node)
-    if intervention_options and None in intervention_options:
-        # This state has sublabel variants
-        variant_list = []
-        for key, variant in intervention_options.items():
-            if key is not None and isinstance(variant, dict) and "title" in variant:
-                # Convert education dict to string (use "introduce" depth as default for variants display)
-                variant_copy = dict(variant)
-                if isinstance(variant_copy.get("education"), dict):
-                    variant_copy["education"] = variant_copy["education"].get("introduce", "")
-                variant_list.append(variant_copy)
-        if len(variant_list) > 1:
-            variants = variant_list
+    # 5. Available intervention variants for this state (pre-rendered, shared)
+    variants = breaker.variants
 
     # 6. Populate MSC steps for Shame interventions
-    msc_steps = None
-    shame_safety_alert = None
-    if FEATURE_SHAME_PROTOCOL and node == "Shame":
-        raw_steps = INTERVENTIONS.get("Shame", {}).get("msc_steps")
-        if raw_steps:
-            # Convert education dicts to strings (use "introduce" depth for MSC display)
-            msc_steps = []
-            for step in raw_steps:
-                step_copy = dict(step)
-                if isinstance(step_copy.get("education"), dict):
-                    step_copy["education"] = step_copy["education"].get("introduce", "")
-                msc_steps.append(step_copy)
-
-        # Shame safety alert: check if 3+ times in 24h
-        try:
-            shame_count = db.get_shame_count_24h()
-            shame_safety_alert = shame_count >= 3
-        except Exception:
-            logger.error("Shame count check failed", exc_info=True, extra={"request_id": request_id})
-            shame_safety_alert = False
+    msc_steps = breaker.msc_steps if FEATURE_SHAME_PROTOCOL and node == "Shame" else None
 
-    # 6b. Determine education depth based on heuristic
-    # Heuristic: first exposure = introduce, 2-4 = reinforce, 5+ = deepen
-    # (For MVP, we use a simple heuristic; later phases can fetch seen_count from DB)
-    education_depth = "introduce"
-
-    # Select education text from depth-based dict
-    if isinstance(breaker.get("education"), dict):
-        education_text = breaker["education"].get(
-            education_depth,
-            breaker["education"].get("introduce", "")
-        )
-    else:
-        # Fallback for old-style single-string education
-        education_text = breaker.get("education", "")
+    # 6b. Education text at the chosen depth
+    education_text = breaker.education
 
     # 6c. Personalize education_info with user loop and effectiveness data
     if education_text:
@@ -399,10 +554,10 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
         elif education_depth == "reinforce" and personal_loop and personal_loop.most_common_entry:
             most_common = personal_loop.most_common_entry
             # Add effectiveness reference if available
-            if intervention_effectiveness and breaker.get("title") in intervention_effectiveness:
-                stats = intervention_effectiveness[breaker["title"]]
+            if intervention_effectiveness and breaker.title in intervention_effectiveness:
+                stats = intervention_effectiveness[breaker.title]
                 percentage = stats.percentage
-                education_text = f"{education_text}\n\nFor you, {breaker['title']} works {percentage}% of the time based on your history."
+                education_text = f"{education_text}\n\nFor you, {breaker.title} works {percentage}% of the time based on your history."
             else:
                 education_text = f"{education_text}\n\nThis is particularly important for your {most_common} pattern."
 
@@ -410,39 +565,22 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
             most_common = personal_loop.most_common_entry
             # Add both context and effectiveness for deeper dives
             context_text = f"In your {most_common} cycle, {education_text[0].lower()}{education_text[1:]}" if education_text else ""
-            if intervention_effectiveness and breaker.get("title") in intervention_effectiveness:
-                stats = intervention_effectiveness[breaker["title"]]
+            if intervention_effectiveness and breaker.title in intervention_effectiveness:
+                stats = intervention_effectiveness[breaker.title]
                 percentage = stats.percentage
                 context_text += f"\n\nYour track record shows this works {percentage}% of the time, making it a proven strategy for your pattern."
             education_text = context_text
 
-    # 6d. Extract movement protocol if feature flag enabled
-    movement_protocol = None
-    if FEATURE_MOVEMENT_PROTOCOLS:
-        state_catalog = INTERVENTIONS.get(node, {})
-        # Sublabel-variant states store interventions under sublabel keys
-        if isinstance(state_catalog.get(sublabel), dict) and "movement" in state_catalog.get(sublabel, {}):
-            movement_protocol = state_catalog[sublabel]["movement"]
-        elif "movement" in state_catalog:
-            movement_protocol = state_catalog["movement"]
-
-    # 7. Save journal entry for persistence and outcome tracking
-    entry_id = str(uuid.uuid4())
-    try:
-        db.save_journal_entry(
-            entry_id=entry_id,
-            raw_text=body.user_text,
-            detected_state=node,
-            sublabel=sublabel or "",
-            confidence=prediction["confidence"],
-            reasoning=prediction["reasoning"],
-            risk_level=risk,
-            intervention_title=breaker["title"],
-            intervention_type=breaker.get("type", ""),
-        )
-    except Exception:
-        logger.error("Journal entry save failed", exc_info=True, extra={"request_id": request_id})
-        # Non-critical; do not propagate
+    # 6d. Movement protocol if feature flag enabled
+    movement_protocol = breaker.movement if FEATURE_MOVEMENT_PROTOCOLS else None
+
+    # 7b. Generate the reasoning after the response has been sent
+    if reasoning_pending and saved:
+        background_tasks.add_task(attach_reasoning, db, entry_id, body.user_text, node, sublabel, request_id)
+
+    # 7c. Mirror a sample to the shadow candidate, also after the response
+    if shadow_evaluator.should_sample():
+        background_tasks.add_task(shadow_evaluator.submit, body.user_text, prediction, ai_latency, request_id)
 
     # 8. Return the full payload to Flutter
     response_data = {
@@ -451,13 +589,14 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
         "emotion_sublabel": sublabel,
         "confidence": prediction["confidence"],
         "reasoning": prediction["reasoning"],
+        "reasoning_pending": reasoning_pending and saved,
         "risk_level": risk,
         "loop_detected": is_loop,
-        "intervention_title": breaker["title"],
-        "intervention_task": breaker["task"],
+        "intervention_title": breaker.title,
+        "intervention_task": breaker.task,
         "education_info": education_text,
         "education_depth": education_depth,
-        "intervention_type": breaker.get("type"),
+        "intervention_type": breaker.type,
         "node_arc_position": arc_pos,
         "node_arc_label": arc_label,
         "intervention_variants": variants,
@@ -469,18 +608,277 @@ async def analyze_behavior(body: AnalysisRequest, request: Request, db: Behavior
         "intervention_effectiveness": intervention_effectiveness,
     }
 
-    # After return, increment seen_count (non-blocking)
+    # Built here from trusted values: skip re-validation against AnalysisResponse
+    return trusted_response(response_data, AnalysisResponse, endpoint="analyze")
+
+
+@app.websocket("/ws/crisis-screen")
+async def crisis_screen(websocket: WebSocket):
+    """
+    Screens an entry for crisis keywords while the user types.
+
+    Client messages: {"append": "text"}, {"delete": n} (backspace n characters)
+    and {"final": true}. The server pushes {"type": "crisis", ...} with the
+    crisis resources as soon as a keyword completes, and answers "final" with
+    every keyword seen before closing. Nothing is stored; the entry is logged
+    as usual when it is submitted to /analyze.
+    """
+    if not FEATURE_CRISIS_SAFETY:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    session = CrisisScreenSession(
+        websocket.app.state.crisis_service,
+        max_chars=int(os.getenv("CRISIS_SCREEN_MAX_CHARS", "20000")),
+    )
+    outcome = "disconnected"
     try:
-        db.increment_intervention_seen_count(breaker["title"])
-    except Exception:
-        pass  # Non-critical
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            try:
+                if isinstance(message.get("append"), str):
+                    found = session.append(message["append"])
+                elif isinstance(message.get("delete"), int):
+                    found = session.delete(message["delete"])
+                elif message.get("final") is True:
+                    found = session.finish()
+                else:
+                    await websocket.send_json({"type": "error", "detail": "Expected 'append', 'delete' or 'final'"})
+                    continue
+            except ValueError as exc:
+                outcome = "too_large"
+                await websocket.send_json({"type": "error", "detail": str(exc)})
+                await websocket.close(code=1009)
+                return
+
+            if found:
+                CRISIS_SCREEN_ALERTS.inc()
+                logger.warning(
+                    "Crisis keywords detected while composing",
+                    extra={"event": "crisis_screen_alert", "keywords": found, "lexicon_version": session.lexicon_version},
+                )
+                await websocket.send_json(
+                    {
+                        "type": "crisis",
+                        "keywords": found,
+                        "lexicon_version": session.lexicon_version,
+                        "crisis_resources": _build_crisis_response().crisis_resources.model_dump(),
+                    }
+                )
+            if message.get("final") is True:
+                outcome = "final"
+                await websocket.send_json(
+                    {"type": "final", "keywords": session.keywords, "lexicon_version": session.lexicon_version}
+                )
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        CRISIS_SCREEN_SESSIONS.inc(outcome=outcome)
+
+
+@app.get("/ready")
+async def readiness():
+    """Reports ready only once the configured model(s) are resident in Ollama."""
+    status = model_residency.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+def require_admin(x_admin_token: str = Header(None)) -> None:
+    """Admin endpoints are off unless ADMIN_TOKEN is set, and then need a matching X-Admin-Token header."""
+    expected = os.getenv("ADMIN_TOKEN", "")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not hmac.compare_digest(x_admin_token or "", expected):
+        raise HTTPException(status_code=401, detail="Missing or invalid X-Admin-Token header.")
+
+
+@app.get("/admin/model", dependencies=[Depends(require_admin)])
+async def get_model_status():
+    """Active model, the model a rollback would return to, and recent swap attempts."""
+    return model_swap.status()
+
+
+@app.post("/admin/model", status_code=202, dependencies=[Depends(require_admin)])
+async def swap_model(body: ModelSwapRequest):
+    """
+    Starts a zero-downtime swap to another model: pull, warm and smoke-test
+    it in the background, then switch. Poll GET /admin/model for progress.
+    """
+    try:
+        return model_swap.start_swap(body.model)
+    except SwapInProgressError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.post("/admin/model/rollback", dependencies=[Depends(require_admin)])
+async def rollback_model():
+    """Switches back to the model that was active before the last swap."""
+    try:
+        return model_swap.rollback()
+    except SwapInProgressError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get("/admin/crisis-lexicon", dependencies=[Depends(require_admin)])
+async def get_crisis_lexicon():
+    """Active crisis lexicon version and the watched lexicon file."""
+    return lexicon_reloader.status()
 
-    return response_data
+
+@app.post("/admin/crisis-lexicon/reload", dependencies=[Depends(require_admin)])
+async def reload_crisis_lexicon():
+    """Reloads the lexicon file now instead of waiting for the watcher."""
+    try:
+        outcome = await lexicon_reloader.reload()
+    except LexiconError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if outcome == "rejected":
+        raise HTTPException(status_code=422, detail=lexicon_reloader.last_error)
+    return {"outcome": outcome, **lexicon_reloader.status()}
+
+
+@app.get("/admin/crisis-telemetry", dependencies=[Depends(require_admin)])
+async def get_crisis_telemetry():
+    """Per-keyword hits, keyword co-occurrence and detection latency since the last periodic summary."""
+    return app.state.crisis_service.telemetry.summary()
+
+
+@app.post("/admin/crisis-screen-batch", dependencies=[Depends(require_admin)])
+async def screen_crisis_batch(
+    body: CrisisBatchScreenRequest,
+    background_tasks: BackgroundTasks,
+    db: BehavioralStateManager = Depends(get_db),
+):
+    """
+    Screens up to 10,000 texts for crisis keywords with the active lexicon,
+    e.g. before importing or backfilling journal entries. Only keyword
+    matching runs: there are no model calls, and nothing is written unless
+    log_events is set, in which case a CrisisEvent is recorded per hit.
+    """
+    report = await asyncio.to_thread(app.state.crisis_service.screen_batch, body.texts)
+    hits = [r for r in report["results"] if r["is_crisis"]]
+    if body.log_events and hits:
+        events = [
+            {
+                "user_id": None,
+                "keywords": r["keywords"],
+                "detected_state": None,
+                "ip_address": "batch",
+                "lexicon_version": report["lexicon_version"],
+                "event_id": str(uuid.uuid4()),
+            }
+            for r in hits
+        ]
+        background_tasks.add_task(_log_batch_crisis_events, events, db)
+    logger.info(
+        "Batch crisis screen: %d of %d texts flagged",
+        len(hits),
+        len(body.texts),
+        extra={
+            "event": "crisis_batch_screen",
+            "texts": len(body.texts),
+            "crisis_count": len(hits),
+            "mb_per_second": report["mb_per_second"],
+            "workers": report["workers"],
+        },
+    )
+    return report
+
+
+async def _log_batch_crisis_events(events: List[dict], db: BehavioralStateManager) -> None:
+    """Records batch hits through the durable audit log when configured, else straight to Neo4j."""
+    if crisis_audit_log.enabled:
+        timestamp = datetime.utcnow().isoformat()
+        records = [
+            {"id": f"crisis_event:{e['event_id']}", "kind": "crisis_event", "payload": {**e, "timestamp": timestamp}}
+            for e in events
+        ]
+        try:
+            await asyncio.to_thread(crisis_audit_log.append, records)
+            await audit_replicator.replicate(db)
+            return
+        except OSError:
+            logger.error("Crisis audit log write failed; writing to Neo4j directly", exc_info=True)
+    for event in events:
+        await asyncio.to_thread(db.log_crisis_event, **event)
+
+
+@app.get("/admin/crisis-events", dependencies=[Depends(require_admin)])
+async def get_crisis_review_queue(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: BehavioralStateManager = Depends(get_db),
+):
+    """
+    Unreviewed crisis events, oldest first, each with the journal text that
+    triggered it. Pass `next_cursor` back as `cursor` for the next page.
+    """
+    try:
+        page = await asyncio.to_thread(db.get_crisis_review_queue, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if page is None:
+        raise HTTPException(status_code=503, detail="Crisis review queue temporarily unavailable")
+    return page
+
+
+@app.post("/admin/crisis-events/{event_id}/review", dependencies=[Depends(require_admin)])
+async def review_crisis_event(
+    event_id: str, body: CrisisReviewRequest, db: BehavioralStateManager = Depends(get_db)
+):
+    """Marks a crisis event reviewed so it leaves the queue."""
+    found = await asyncio.to_thread(db.review_crisis_event, event_id, body.notes)
+    if found is None:
+        raise HTTPException(status_code=503, detail="Crisis review temporarily unavailable")
+    if not found:
+        raise HTTPException(status_code=404, detail="Crisis event not found")
+    return {"id": event_id, "reviewed": True}
+
+
+@app.get("/admin/crisis-stats", dependencies=[Depends(require_admin)])
+async def get_crisis_stats(
+    granularity: str = Query("hour", pattern="^(hour|day)$"),
+    days: int = Query(7, ge=1, le=366),
+    db: BehavioralStateManager = Depends(get_db),
+):
+    """Crisis event counts per hour or day over the last `days` days (hourly: up to 31)."""
+    if granularity == "hour" and days > 31:
+        raise HTTPException(status_code=400, detail="Hourly counts cover at most 31 days")
+    until = datetime.now(timezone.utc)
+    buckets = await asyncio.to_thread(db.get_crisis_counts, granularity, until - timedelta(days=days), until)
+    if buckets is None:
+        raise HTTPException(status_code=503, detail="Crisis stats temporarily unavailable")
+    return {"granularity": granularity, "buckets": buckets, "total": sum(b["count"] for b in buckets)}
+
+
+@app.get("/shadow/report", dependencies=[Depends(require_admin)])
+async def get_shadow_report():
+    """Agreement, latency and fallback rate of the shadow candidate versus production."""
+    return shadow_evaluator.report()
 
 
 @app.get("/insight", response_model=InsightResponse)
-async def get_insight(request: Request, db: BehavioralStateManager = Depends(get_db)):
+async def get_insight(request: Request, response: Response, db: BehavioralStateManager = Depends(get_db)):
     request_id = getattr(request.state, "request_id", "")
+    if not_modified := _not_modified(request, response, db):
+        return not_modified
     try:
         stats = db.get_ai_insight()
     except Exception:
@@ -488,7 +886,7 @@ async def get_insight(request: Request, db: BehavioralStateManager = Depends(get
         raise HTTPException(status_code=503, detail="Insight service temporarily unavailable")
 
     if not stats:
-        return {
+        return trusted_response({
             "message": "Welcome! Start journaling to track your resilience.",
             "success_rate": 0,
             "top_loop": "None",
@@ -496,10 +894,10 @@ async def get_insight(request: Request, db: BehavioralStateManager = Depends(get
             "streak": 0,
             "missing_need": None,
             "trigger_count": 0,
-        }
+        }, InsightResponse, endpoint="insight", response=response)
 
     loop_count = stats.get("count", 0)
-    return {
+    return trusted_response({
         "message": stats.get(
             "coaching_message",
             f"You've disrupted {loop_count} patterns in your top loop. Keep going!",
@@ -510,13 +908,15 @@ async def get_insight(request: Request, db: BehavioralStateManager = Depends(get
         "streak": int(stats.get("streak", 0)),
         "missing_need": stats.get("missing_need"),
         "trigger_count": int(stats.get("trigger_count", 0)),
-    }
+    }, InsightResponse, endpoint="insight", response=response)
 
 @app.get("/history")
-async def get_history(request: Request, db: BehavioralStateManager = Depends(get_db)):
+async def get_history(request: Request, response: Response, db: BehavioralStateManager = Depends(get_db)):
     request_id = getattr(request.state, "request_id", "")
+    if not_modified := _not_modified(request, response, db):
+        return not_modified
     try:
-        return db.get_history()
+        return trusted_response(db.get_history(), endpoint="history", response=response)
     except Exception:
         logger.error("History retrieval failed", exc_info=True, extra={"request_id": request_id})
         raise HTTPException(status_code=503, detail="History service temporarily unavailable")
@@ -536,6 +936,7 @@ async def receive_feedback(body: FeedbackRequest, request: Request, db: Behavior
 
 @app.get("/journal-entries", response_model=List[JournalEntryResponse])
 async def get_journal_entries(
+    response: Response,
     limit: int = Query(50, ge=1, le=500),
     request: Request = None,
     db: BehavioralStateManager = Depends(get_db),
@@ -546,14 +947,50 @@ async def get_journal_entries(
     Query params:
     - limit: Max entries to return (1-500, default 50)
 
-    Response: List of JournalEntry objects with raw text, analysis, and outcomes
+    Response: List of JournalEntry objects with raw text, analysis, and outcomes.
+    Answers If-None-Match with 304 while nothing has been written.
     """
     request_id = getattr(request.state, "request_id", "") if request else ""
+    if request and (not_modified := _not_modified(request, response, db)):
+        return not_modified
     try:
-        return db.get_journal_entries(limit=limit)
+        entries = db.get_journal_entries(limit=limit)
     except Exception:
         logger.error("Journal entries fetch failed", exc_info=True, extra={"request_id": request_id})
         raise HTTPException(status_code=503, detail="Journal unavailable")
+    return trusted_response(entries, List[JournalEntryResponse], endpoint="journal_entries", response=response)
+
+
+@app.get("/journal-entries/{entry_id}/reasoning", response_model=JournalReasoningResponse)
+async def get_journal_reasoning(
+    entry_id: str,
+    request: Request,
+    db: BehavioralStateManager = Depends(get_db),
+):
+    """
+    Returns the reasoning for a journal entry.
+
+    With FEATURE_DEFERRED_REASONING, /analyze returns before the reasoning is
+    written. If it is still being generated the response is 202 with status
+    "pending"; if it is missing (e.g. the background task failed) it is
+    generated now and stored on the entry.
+    """
+    request_id = getattr(request.state, "request_id", "")
+    entry = db.get_journal_entry(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Journal entry not found")
+
+    if entry.get("reasoning"):
+        return {"entry_id": entry_id, "status": "ready", "reasoning": entry["reasoning"]}
+    if entry_id in _reasoning_in_flight:
+        return JSONResponse(status_code=202, content={"entry_id": entry_id, "status": "pending", "reasoning": None})
+
+    reasoning = await attach_reasoning(
+        db, entry_id, entry["raw_text"], entry["detected_state"], entry.get("sublabel") or "", request_id
+    )
+    if not reasoning:
+        raise HTTPException(status_code=503, detail="Reasoning unavailable")
+    return {"entry_id": entry_id, "status": "ready", "reasoning": reasoning}
 
 
 @app.patch("/journal-entries/{entry_id}/outcome", status_code=200)
@@ -596,10 +1033,12 @@ async def record_journal_outcome(
 
 
 @app.get("/stats")
-async def get_stats(request: Request, db: BehavioralStateManager = Depends(get_db)):
+async def get_stats(request: Request, response: Response, db: BehavioralStateManager = Depends(get_db)):
     request_id = getattr(request.state, "request_id", "")
+    if not_modified := _not_modified(request, response, db):
+        return not_modified
     try:
-        return db.get_trend_stats()
+        return trusted_response(db.get_trend_stats(), endpoint="stats", response=response)
     except Exception:
         logger.error("Stats retrieval failed", exc_info=True, extra={"request_id": request_id})
         raise HTTPException(status_code=503, detail="Stats service temporarily unavailable")
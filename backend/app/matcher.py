@@ -0,0 +1,372 @@
+from array import array
+from collections import deque
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+def is_word_char(ch: str) -> bool:
+    """Same definition as `\\w` in Python's Unicode regexes."""
+    return ch.isalnum() or ch == "_"
+
+
+def is_boundary(text: Sequence[str], index: int) -> bool:
+    """True where `\\b` would match: between a word and a non-word character (or text edge)."""
+    before = index > 0 and is_word_char(text[index - 1])
+    after = index < len(text) and is_word_char(text[index])
+    return before != after
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher built on an Aho-Corasick automaton.
+
+    Finds the same keywords as `re.compile(r"\\b(k1|k2|...)\\b", re.IGNORECASE)`
+    with `findall` over lowercased text: at the leftmost position where any
+    keyword matches between word boundaries, the keyword listed first wins,
+    and scanning resumes after it. Unlike the alternation regex, matching is
+    a single pass over the text regardless of how many keywords there are,
+    with no backtracking.
+
+    Keywords are lowercased when the automaton is built and matched against
+    lowercased text, so casing never affects results. Empty keywords are
+    ignored (in the regex they matched at every word boundary).
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self.keywords: List[str] = [k.lower() for k in keywords if k]
+        # Node 0 is the root; goto, fail and output are indexed by node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Lowest index of a keyword ending exactly at the node, or -1
+        self._keyword_at: List[int] = [-1]
+        # Nearest node on the fail chain that ends a keyword (0 if none)
+        self._output_link: List[int] = [0]
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _build(self) -> None:
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for ch in keyword:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._keyword_at.append(-1)
+                    self._output_link.append(0)
+                    self._goto[node][ch] = child
+                node = child
+            if self._keyword_at[node] < 0:
+                self._keyword_at[node] = index
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                fallback = self._fail[child]
+                self._output_link[child] = fallback if self._keyword_at[fallback] >= 0 else self._output_link[fallback]
+                queue.append(child)
+
+    def step(self, node: int, ch: str) -> int:
+        """Advances the automaton by one character."""
+        while node and ch not in self._goto[node]:
+            node = self._fail[node]
+        return self._goto[node].get(ch, 0)
+
+    def endings(self, node: int) -> Iterator[int]:
+        """Indexes of keywords ending at `node`, longest first."""
+        if self._keyword_at[node] >= 0:
+            yield self._keyword_at[node]
+        node = self._output_link[node]
+        while node:
+            yield self._keyword_at[node]
+            node = self._output_link[node]
+
+    def candidates(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """(start, end, keyword index) for every keyword occurrence bounded by `\\b` on both sides."""
+        # The per-character loop is the hot path; keep lookups local
+        goto, fail, keyword_at, output_link = self._goto, self._fail, self._keyword_at, self._output_link
+        root = goto[0]
+        node = 0
+        for position, ch in enumerate(text):
+            if node:
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+            else:
+                node = root.get(ch, 0)
+            if not node or (keyword_at[node] < 0 and not output_link[node]):
+                continue
+            end = position + 1
+            if not is_boundary(text, end):
+                continue
+            for index in self.endings(node):
+                start = end - len(self.keywords[index])
+                if is_boundary(text, start):
+                    yield start, end, index
+
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """Non-overlapping (start, end, matched text) in order, as `finditer` would find them."""
+        text = text.lower()
+        matches = []
+        cursor = 0
+        for start, end, _ in sorted(self.candidates(text), key=lambda c: (c[0], c[2])):
+            if start >= cursor:
+                matches.append((start, end, text[start:end]))
+                cursor = end
+        return matches
+
+    def find_all(self, text: str) -> List[str]:
+        """Non-overlapping keyword matches in order, as `findall` would return them."""
+        return [match for _, _, match in self.find_spans(text)]
+
+
+
+class StreamingMatcher:
+    """
+    Incremental `KeywordMatcher` for text that arrives in pieces.
+
+    The automaton state after every character is kept, so appending text
+    only scans the new characters and deleting from the end only truncates;
+    the buffer is never rescanned. A keyword is reported once both of its
+    word boundaries are known, i.e. when the character after it arrives or
+    `finish` is called, and each keyword is reported at most once per stream.
+
+    Unlike `find_all`, overlapping occurrences are all reported: for live
+    screening an early alert matters more than reproducing `findall`.
+    """
+
+    def __init__(self, matcher: KeywordMatcher) -> None:
+        self.matcher = matcher
+        self._chars: List[str] = []
+        self._nodes = array("i")
+        self.reported: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._chars)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chars)
+
+    def _completed(self, end: int) -> List[str]:
+        """Keywords ending at `end` whose boundaries are now known, not reported before."""
+        if end == 0 or not is_boundary(self._chars, end):
+            return []
+        found = []
+        for index in self.matcher.endings(self._nodes[end - 1]):
+            keyword = self.matcher.keywords[index]
+            start = end - len(keyword)
+            if keyword not in self.reported and is_boundary(self._chars, start):
+                self.reported[keyword] = start
+                found.append(keyword)
+        return found
+
+    def append(self, text: str) -> List[str]:
+        """Scans only `text`; returns keywords completed by it."""
+        found = []
+        node = self._nodes[-1] if self._nodes else 0
+        for ch in text:
+            lowered = ch.lower()
+            # Keep one buffer slot per input character so deletes line up
+            ch = lowered if len(lowered) == 1 else ch
+            # The new character settles the boundary after the previous one
+            self._chars.append(ch)
+            found.extend(self._completed(len(self._chars) - 1))
+            node = self.matcher.step(node, ch)
+            self._nodes.append(node)
+        return found
+
+    def delete(self, count: int) -> None:
+        """Removes the last `count` characters (backspace)."""
+        if count > 0:
+            del self._chars[-count:]
+            del self._nodes[-count:]
+
+    def finish(self) -> List[str]:
+        """Reports keywords that end the text, once no more input is coming."""
+        return self._completed(len(self._chars))
+
+
+# Apostrophes inside a word are dropped so "can't", "cant" and "can’t" tokenize alike
+_APOSTROPHES = "'’"
+# Characters allowed between the words of a phrase ("self harm", "self-harm")
+_PHRASE_GAP = " -\t"
+# Real words one edit away from a default keyword; they only match exactly
+DEFAULT_FUZZY_EXCLUDE = ("overdone",)
+# Keyword words shorter than this are only matched exactly: short words sit
+# one edit away from too many ordinary ones ("gave up", "end my like")
+MIN_FUZZY_WORD = 6
+# Keyword words that are always matched exactly, because one edit flips
+# their meaning ("can go on" is one letter from "cant go on")
+EXACT_WORDS = frozenset({
+    "cant", "cannot", "dont", "wont", "isnt", "aint", "not", "no", "never", "nothing",
+    "couldnt", "shouldnt", "wouldnt", "didnt", "doesnt",
+})
+TOKEN_CACHE_SIZE = 4096
+
+
+def tokenize(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, word) for each run of word characters, apostrophes removed."""
+    tokens = []
+    start = None
+    for i, ch in enumerate(text):
+        if is_word_char(ch) or (ch in _APOSTROPHES and start is not None and i + 1 < len(text) and is_word_char(text[i + 1])):
+            if start is None:
+                start = i
+        elif start is not None:
+            tokens.append((start, i, _strip_apostrophes(text[start:i])))
+            start = None
+    if start is not None:
+        tokens.append((start, len(text), _strip_apostrophes(text[start:])))
+    return tokens
+
+
+def _strip_apostrophes(word: str) -> str:
+    for mark in _APOSTROPHES:
+        word = word.replace(mark, "")
+    return word
+
+
+def _deletes(word: str, distance: int) -> set:
+    """Every string reachable from `word` by deleting up to `distance` characters."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once); `limit + 1` if above `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyKeywordMatcher:
+    """
+    Finds keywords typed with small typos ("suicde", "kill myslef", "overdoes").
+
+    Keywords and text are split into words; a phrase matches when each of
+    its words matches the next word of the text. A keyword word matches a
+    text word exactly or, if it has at least MIN_FUZZY_WORD letters and is
+    not a negation (EXACT_WORDS), within `max_distance` edits, provided the
+    first letter is right (typos rarely hit it, and it keeps
+    "putting" from matching "cutting").
+
+    Candidate words are found with a symmetric-delete index: every keyword
+    word is stored under each string reachable by deleting up to
+    `max_distance` letters, so a text word only needs its own deletes looked
+    up, never a comparison with every keyword. Lookups are cached per word,
+    keeping the cost close to linear in the length of the text. Words in
+    `exclude` are ordinary words that happen to sit one edit away from a
+    keyword; they are only ever matched exactly.
+    """
+
+    def __init__(
+        self,
+        keywords: Sequence[str],
+        max_distance: int = 1,
+        exclude: Sequence[str] = DEFAULT_FUZZY_EXCLUDE,
+    ) -> None:
+        self.max_distance = max_distance
+        self.exclude = frozenset(w.lower() for w in exclude)
+        self.keywords: List[str] = [k.lower() for k in keywords if k]
+        self._phrases: List[Tuple[str, ...]] = []
+        # Edit budget per keyword word: 0 means exact only
+        self._budgets: List[Tuple[int, ...]] = []
+        self._by_first: Dict[str, List[int]] = {}
+        self._deletes: Dict[str, set] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+
+        for index, keyword in enumerate(self.keywords):
+            words = tuple(word for _, _, word in tokenize(keyword))
+            budgets = tuple(
+                max_distance if len(word) >= MIN_FUZZY_WORD and word not in EXACT_WORDS else 0 for word in words
+            )
+            self._phrases.append(words)
+            self._budgets.append(budgets)
+            if not words:
+                continue
+            self._by_first.setdefault(words[0], []).append(index)
+            for word, budget in zip(words, budgets):
+                for variant in _deletes(word, budget):
+                    self._deletes.setdefault(variant, set()).add(word)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def word_matches(self, word: str) -> Dict[str, int]:
+        """Keyword words within `max_distance` of `word`, with their distances."""
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+        found: Dict[str, int] = {}
+        limit = 0 if word in self.exclude else self.max_distance
+        for variant in _deletes(word, limit):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in found or candidate[0] != word[0]:
+                    continue
+                distance = 0 if candidate == word else edit_distance(word, candidate, limit)
+                if distance <= limit:
+                    found[candidate] = distance
+        if len(self._cache) >= TOKEN_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[word] = found
+        return found
+
+    def _phrase_end(self, text: str, tokens: List[Tuple[int, int, str]], first: int, index: int) -> int:
+        """End offset of keyword `index` matched from token `first`, or -1."""
+        phrase, budgets = self._phrases[index], self._budgets[index]
+        if first + len(phrase) > len(tokens):
+            return -1
+        for offset, (word, budget) in enumerate(zip(phrase, budgets)):
+            position = first + offset
+            if offset:
+                gap = text[tokens[position - 1][1]:tokens[position][0]]
+                if len(gap) > 2 or gap.strip(_PHRASE_GAP):
+                    return -1
+            distance = self.word_matches(tokens[position][2]).get(word)
+            if distance is None or distance > budget:
+                return -1
+        return tokens[first + len(phrase) - 1][1]
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Non-overlapping (start, end, keyword) matches, leftmost first, earlier-listed keyword winning ties."""
+        text = text.lower()
+        tokens = tokenize(text)
+        candidates = []
+        for first, (start, _, word) in enumerate(tokens):
+            for candidate in self.word_matches(word):
+                for index in self._by_first.get(candidate, ()):
+                    end = self._phrase_end(text, tokens, first, index)
+                    if end >= 0:
+                        candidates.append((start, index, end))
+        matches = []
+        cursor = 0
+        for start, index, end in sorted(candidates):
+            if start >= cursor:
+                matches.append((start, end, self.keywords[index]))
+                cursor = end
+        return matches
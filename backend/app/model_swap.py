@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .ai import FALLBACK_REASONINGS, query_local_ai
+from .inference import get_active_model, get_backend, set_active_model
+from .metrics import metrics
+from .residency import model_residency
+
+logger = logging.getLogger(__name__)
+
+MODEL_SWAPS = metrics.counter(
+    "ai_model_swaps_total",
+    "Runtime model swaps by outcome (switched, failed, rolled_back).",
+)
+
+# A short entry with an unambiguous label; the candidate must classify it
+# without falling back before it takes traffic.
+SMOKE_TEST_TEXT = "I keep putting off my work and can't make myself start."
+
+# Recent swap attempts kept for the status endpoint
+HISTORY_SIZE = 20
+
+
+class SwapInProgressError(RuntimeError):
+    pass
+
+
+class ModelSwapManager:
+    """
+    Swaps the serving model at runtime without a restart.
+
+    A swap pulls the new model, warms it, and runs a smoke classification
+    against it, all in a background task while the current model keeps
+    serving. Only then is the active model switched, which is a single
+    assignment: requests that already started keep the model they read.
+    Only the active and the previous model stay in the keep-alive list, so
+    `rollback` switches back to a model that is still resident and models
+    swapped out earlier are allowed to unload.
+    """
+
+    def __init__(self) -> None:
+        self.state = "idle"
+        self.target: Optional[str] = None
+        self.previous: Optional[str] = None
+        self.error: Optional[str] = None
+        self.history: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "active_model": get_active_model(),
+            "previous_model": self.previous,
+            "state": self.state,
+            "target": self.target,
+            "error": self.error,
+            "history": list(self.history),
+        }
+
+    def _record(self, action: str, model: str, outcome: str, started: float, error: Optional[str] = None) -> None:
+        self.history.append(
+            {
+                "action": action,
+                "model": model,
+                "outcome": outcome,
+                "seconds": round(time.perf_counter() - started, 3),
+                "error": error,
+            }
+        )
+        del self.history[:-HISTORY_SIZE]
+        MODEL_SWAPS.inc(outcome=outcome)
+
+    def start_swap(self, model: str) -> Dict[str, Any]:
+        """
+        Starts preparing `model` in the background. Raises SwapInProgressError
+        if a swap is running and ValueError if the backend cannot swap models.
+        """
+        if self.in_progress:
+            raise SwapInProgressError(f"Swap to '{self.target}' is still in progress")
+        backend = get_backend()
+        if not backend.supports_swap:
+            raise ValueError(f"The {backend.name} backend cannot switch models at runtime")
+        self.target = model
+        self.error = None
+        self.state = "pulling"
+        self._task = asyncio.create_task(self._swap(model))
+        return self.status()
+
+    async def _swap(self, model: str) -> bool:
+        started = time.perf_counter()
+        backend = get_backend()
+        try:
+            if model == get_active_model():
+                raise ValueError(f"'{model}' is already the active model")
+
+            await backend.pull(model)
+
+            self.state = "warming"
+            if not await model_residency.warm(model):
+                raise RuntimeError(f"'{model}' failed to load")
+
+            self.state = "smoke_test"
+            # Kept out of the production metrics, like shadow calls
+            prediction = await query_local_ai(
+                SMOKE_TEST_TEXT, request_id="model-swap", model=model, record_metrics=False
+            )
+            if prediction["reasoning"] in FALLBACK_REASONINGS:
+                raise RuntimeError(f"Smoke classification failed: {prediction['reasoning']}")
+        except Exception as exc:
+            self.state = "failed"
+            self.error = str(exc)
+            self._record("swap", model, "failed", started, self.error)
+            logger.warning(
+                "AI: model swap to '%s' failed",
+                model,
+                exc_info=True,
+                extra={"event": "ai_model_swap_failed", "model": model},
+            )
+            return False
+
+        self.previous = get_active_model()
+        set_active_model(model)
+        model_residency.set_models([model, self.previous])
+        self.state = "switched"
+        self._record("swap", model, "switched", started)
+        logger.info(
+            "AI: switched active model from '%s' to '%s'",
+            self.previous,
+            model,
+            extra={"event": "ai_model_swapped", "model": model, "previous_model": self.previous},
+        )
+        return True
+
+    def rollback(self) -> Dict[str, Any]:
+        """Switches back to the model that was active before the last swap."""
+        if self.in_progress:
+            raise SwapInProgressError(f"Swap to '{self.target}' is still in progress")
+        if not self.previous:
+            raise ValueError("No previous model to roll back to")
+
+        started = time.perf_counter()
+        current = get_active_model()
+        set_active_model(self.previous)
+        model_residency.set_models([self.previous, current])
+        self.target, self.previous = self.previous, current
+        self.state = "rolled_back"
+        self.error = None
+        self._record("rollback", self.target, "rolled_back", started)
+        logger.info(
+            "AI: rolled back active model to '%s'",
+            self.target,
+            extra={"event": "ai_model_rollback", "model": self.target, "previous_model": current},
+        )
+        return self.status()
+
+    async def wait(self) -> None:
+        """Waits for a running swap to finish (used by tests and shutdown)."""
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+model_swap = ModelSwapManager()
@@ -64,6 +64,22 @@ class CrisisResourcesResponse(BaseModel):
     emergency: str
 
 
+class PersonalLoopContext(BaseModel):
+    """User's personal behavioral loop pattern."""
+    most_common_entry: Optional[str] = None  # e.g., "Stress"
+    cycle_length_hours: Optional[float] = None  # e.g., 4.5
+    where_in_cycle: Optional[str] = None  # e.g., "procrastination_phase"
+
+
+class InterventionStats(BaseModel):
+    """Effectiveness stats for a single intervention."""
+    helped: int
+    neutral: int
+    didn_help: int
+    total: int
+    percentage: int  # 0-100
+
+
 class AnalysisResponse(BaseModel):
     """The structured output sent back to the Flutter app."""
     detected_node: str
@@ -71,6 +87,7 @@ class AnalysisResponse(BaseModel):
     emotion_sublabel: Optional[str] = None
     confidence: float
     reasoning: str
+    reasoning_pending: Optional[bool] = None  # True while reasoning is generated after the response
     risk_level: str
     loop_detected: bool
     intervention_title: str
@@ -102,22 +119,6 @@ class InsightResponse(BaseModel):
     trigger_count: Optional[int] = None
 
 
-class PersonalLoopContext(BaseModel):
-    """User's personal behavioral loop pattern."""
-    most_common_entry: Optional[str] = None  # e.g., "Stress"
-    cycle_length_hours: Optional[float] = None  # e.g., 4.5
-    where_in_cycle: Optional[str] = None  # e.g., "procrastination_phase"
-
-
-class InterventionStats(BaseModel):
-    """Effectiveness stats for a single intervention."""
-    helped: int
-    neutral: int
-    didn_help: int
-    total: int
-    percentage: int  # 0-100
-
-
 class JournalEntryResponse(BaseModel):
     """Persisted journal entry with analysis and user outcome."""
     id: str
@@ -132,6 +133,30 @@ class JournalEntryResponse(BaseModel):
     intervention_type: Optional[str] = None
     user_outcome: Optional[str] = None  # "helped" | "didn't help" | "neutral"
     user_notes: Optional[str] = None
+    prompt_version: Optional[str] = None  # Classification prompt version, None for crisis or fallback entries
+
+
+class ModelSwapRequest(BaseModel):
+    """Admin request to switch the serving model at runtime."""
+    model: str
+
+
+class CrisisBatchScreenRequest(BaseModel):
+    """Texts to screen for crisis keywords in one call (imports, backfills)."""
+    texts: List[str] = Field(..., min_length=1, max_length=10000)
+    log_events: bool = False  # Record a CrisisEvent for each hit
+
+
+class CrisisReviewRequest(BaseModel):
+    """Marks a crisis event as reviewed by a clinician."""
+    notes: Optional[str] = Field(None, max_length=2000)
+
+
+class JournalReasoningResponse(BaseModel):
+    """Reasoning for a journal entry, generated after /analyze returned."""
+    entry_id: str
+    status: str  # "ready" | "pending"
+    reasoning: Optional[str] = None
 
 
 class JournalOutcomeRequest(BaseModel):
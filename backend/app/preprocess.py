@@ -0,0 +1,150 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Rough chars-per-token ratio for Llama-family tokenizers on English prose.
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 512
+
+# Word stems that carry emotional signal for the 7 classifier states. Matched as
+# word prefixes, so "worr" covers worry/worried/worrying.
+SALIENT_STEMS = [
+    # Procrastination
+    "avoid", "procrastinat", "delay", "put off", "putting off", "perfect", "fail",
+    # Anxiety
+    "anx", "worr", "panic", "dread", "fear", "scared", "afraid", "nervous", "threat", "on edge",
+    # Stress
+    "stress", "overload", "pressure", "tense", "tension", "deadline", "burn", "exhaust", "urgent",
+    # Shame
+    "shame", "ashamed", "guilt", "embarrass", "blame", "worthless", "stupid", "hate myself", "failure",
+    # Overwhelm
+    "overwhelm", "too much", "too many", "paralyz", "scatter", "can't think", "frozen",
+    # Numbness
+    "numb", "empty", "nothing", "disconnect", "apath", "don't feel", "flat", "tired",
+    # Isolation
+    "alone", "lonely", "loneli", "isolat", "withdraw", "nobody", "no one", "don't want to see",
+]
+
+_SALIENT_RE = re.compile(r"\b(?:" + "|".join(re.escape(s) for s in SALIENT_STEMS) + r")", re.IGNORECASE)
+_FIRST_PERSON_RE = re.compile(r"\b(?:i|i'm|i've|me|my|myself)\b", re.IGNORECASE)
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n+|$)")
+
+
+@dataclass(frozen=True)
+class TrimResult:
+    text: str
+    original_chars: int
+    trimmed_chars: int
+    original_tokens: int
+    trimmed_tokens: int
+
+    @property
+    def was_trimmed(self) -> bool:
+        return self.trimmed_chars < self.original_chars
+
+
+def get_token_budget() -> int:
+    return int(os.getenv("AI_INPUT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough to bound prompt size without loading a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+
+
+def score_sentence(sentence: str) -> float:
+    """
+    Salience score: emotional keyword hits dominate, first-person statements
+    add a little, and the score is normalized by length so one long rambling
+    sentence does not crowd out several short, pointed ones.
+    """
+    hits = len(_SALIENT_RE.findall(sentence))
+    first_person = min(len(_FIRST_PERSON_RE.findall(sentence)), 3)
+    length_norm = max(estimate_tokens(sentence), 1) ** 0.5
+    return (3.0 * hits + 0.5 * first_person) / length_norm
+
+
+def _truncate_to_tokens(sentence: str, budget: int) -> str:
+    max_chars = budget * CHARS_PER_TOKEN
+    if len(sentence) <= max_chars:
+        return sentence
+    cut = sentence[:max_chars]
+    # Avoid ending mid-word
+    return cut.rsplit(" ", 1)[0] if " " in cut else cut
+
+
+def trim_to_budget(text: str, budget: Optional[int] = None) -> TrimResult:
+    """
+    Reduces text to its most emotionally salient sentences when it exceeds the
+    token budget. Selected sentences keep their original order; the last
+    sentence gets a bonus because entries usually end on how the writer feels.
+    Text within budget is returned unchanged.
+    """
+    budget = budget if budget is not None else get_token_budget()
+    original_tokens = estimate_tokens(text)
+    if budget <= 0 or original_tokens <= budget:
+        return TrimResult(text, len(text), len(text), original_tokens, original_tokens)
+
+    sentences = split_sentences(text)
+    scored: List[Tuple[float, int]] = []
+    for index, sentence in enumerate(sentences):
+        score = score_sentence(sentence)
+        if index == len(sentences) - 1:
+            score += 1.0
+        scored.append((score, index))
+
+    # Highest score first; earlier sentences win ties
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen: List[int] = []
+    used = 0
+    for _, index in scored:
+        cost = estimate_tokens(sentences[index]) + 1
+        if used + cost > budget:
+            continue
+        chosen.append(index)
+        used += cost
+
+    if chosen:
+        trimmed = " ".join(sentences[i] for i in sorted(chosen))
+    else:
+        # Every sentence alone exceeds the budget: keep the most salient, cut to fit
+        trimmed = _truncate_to_tokens(sentences[scored[0][1]] if sentences else text, budget)
+
+    return TrimResult(trimmed, len(text), len(trimmed), original_tokens, estimate_tokens(trimmed))
+
+
+def split_into_chunks(text: str, target_tokens: int, max_chunks: int) -> List[str]:
+    """
+    Packs whole sentences into chunks of roughly `target_tokens` each. The
+    target grows when needed so the entry never produces more than
+    `max_chunks` chunks. A single sentence larger than the target becomes its
+    own chunk rather than being cut mid-sentence.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return [text] if text else []
+
+    target = max(target_tokens, math.ceil(estimate_tokens(text) / max(max_chunks, 1)))
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+    for sentence in sentences:
+        cost = estimate_tokens(sentence) + 1
+        if current and used + cost > target:
+            chunks.append(" ".join(current))
+            current, used = [], 0
+        current.append(sentence)
+        used += cost
+    if current:
+        chunks.append(" ".join(current))
+    if max_chunks > 0 and len(chunks) > max_chunks:
+        # Sentence boundaries can overflow the count by one; fold the overflow into the last chunk
+        chunks[max_chunks - 1 :] = [" ".join(chunks[max_chunks - 1 :])]
+    return chunks
@@ -0,0 +1,272 @@
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .preprocess import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_VERSION = "v1-full"
+DEFAULT_MEASUREMENTS_PATH = os.path.join(os.path.dirname(__file__), "prompt_measurements.json")
+
+# Model tiers by parameter count parsed from the tag (e.g. "llama3.2:3b" -> 3.0)
+TIER_LIMITS = (("small", 2.0), ("medium", 8.0))
+DEFAULT_TIER = "medium"
+
+_PARAMS_RE = re.compile(r"(\d+(?:\.\d+)?)b\b", re.IGNORECASE)
+_REASONING_FIELD_RE = re.compile(r', "reasoning": "[^"]*"')
+
+V1_FULL = """
+You are a Behavioral Science Specialist in LoopBreaker.
+
+THE 8-NODE REWIRE FEEDBACK LOOP (context for understanding):
+1. STRESS — Physiological spikes and overwhelm
+2. COPING STRUGGLE — Decreased executive function, difficulty regulating
+3. PROCRASTINATION — Avoidance and task delay behaviors
+4. NEGLECT NEEDS — Ignoring sleep, food, movement, social connection
+5. HYPERVIGILANCE — Heightened sensitivity, anxiety, defensive scanning
+6. NEGATIVE BELIEFS — Distorted self-talk, rumination, catastrophizing
+7. LOW SELF-ESTEEM — Degraded self-worth, internalized criticism
+8. SHAME — Isolation, worthlessness, loop restart condition
+
+YOUR TASK:
+Classify the user's journal entry into ONE of these 7 emotional states:
+- Procrastination (avoidance, distraction, fear of failure)
+- Anxiety (worry, panic, dread, hypervigilance)
+- Stress (overload, tension, urgency, burnout)
+- Shame (guilt, embarrassment, self-blame, isolation)
+- Overwhelm (paralysis, cognitive overload, scattered)
+- Numbness (disconnected, apathy, exhaustion, freeze)
+- Isolation (loneliness, withdrawal, avoidance of others)
+
+Also extract a specific emotion sublabel and confidence.
+
+Return ONLY this JSON format:
+{"node": "StateName", "sublabel": "SubLabel", "confidence": 0.8, "reasoning": "brief explanation"}
+
+SUBLABELS BY STATE:
+- Procrastination: Avoidance, Perfectionism, Fear of Failure
+- Anxiety: Worry, Panic, Dread, Hypervigilance
+- Stress: Overload, Tension, Urgency, Burnout
+- Shame: Guilt, Embarrassment, Self-Blame, Isolation
+- Overwhelm: Paralysis, Cognitive Overload, Scattered
+- Numbness: Disconnected, Apathy, Exhaustion, Freeze
+- Isolation: Loneliness, Withdrawal, Avoidance of Others
+
+EXAMPLES:
+"I can't start my work" → {"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "avoiding task initiation"}
+"Everything feels threatening" → {"node": "Anxiety", "sublabel": "Dread", "confidence": 0.85, "reasoning": "pervasive anticipatory fear"}
+"I'm behind on deadlines" → {"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "time pressure and workload"}
+"I feel terrible about myself" → {"node": "Shame", "sublabel": "Self-Blame", "confidence": 0.85, "reasoning": "self-directed criticism"}
+"Too many things at once" → {"node": "Overwhelm", "sublabel": "Cognitive Overload", "confidence": 0.9, "reasoning": "mental capacity exceeded"}
+"I don't feel anything" → {"node": "Numbness", "sublabel": "Disconnected", "confidence": 0.85, "reasoning": "emotional blunting present"}
+"I don't want to see anyone" → {"node": "Isolation", "sublabel": "Isolation", "confidence": 0.9, "reasoning": "social avoidance pattern"}
+"""
+
+V2_COMPACT = """
+You classify journal entries for LoopBreaker.
+
+Pick ONE state and a sublabel from its list:
+- Procrastination: Avoidance, Perfectionism, Fear of Failure
+- Anxiety: Worry, Panic, Dread, Hypervigilance
+- Stress: Overload, Tension, Urgency, Burnout
+- Shame: Guilt, Embarrassment, Self-Blame, Isolation
+- Overwhelm: Paralysis, Cognitive Overload, Scattered
+- Numbness: Disconnected, Apathy, Exhaustion, Freeze
+- Isolation: Loneliness, Withdrawal, Avoidance of Others
+
+Return ONLY this JSON format:
+{"node": "StateName", "sublabel": "SubLabel", "confidence": 0.8, "reasoning": "brief explanation"}
+
+EXAMPLES:
+"I can't start my work" → {"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "avoiding task initiation"}
+"I feel terrible about myself" → {"node": "Shame", "sublabel": "Self-Blame", "confidence": 0.85, "reasoning": "self-directed criticism"}
+"I don't feel anything" → {"node": "Numbness", "sublabel": "Disconnected", "confidence": 0.85, "reasoning": "emotional blunting present"}
+"""
+
+V3_MINIMAL = """
+Classify the journal entry. States and sublabels:
+Procrastination: Avoidance, Perfectionism, Fear of Failure
+Anxiety: Worry, Panic, Dread, Hypervigilance
+Stress: Overload, Tension, Urgency, Burnout
+Shame: Guilt, Embarrassment, Self-Blame, Isolation
+Overwhelm: Paralysis, Cognitive Overload, Scattered
+Numbness: Disconnected, Apathy, Exhaustion, Freeze
+Isolation: Loneliness, Withdrawal, Avoidance of Others
+
+Return ONLY JSON: {"node": "StateName", "sublabel": "SubLabel", "confidence": 0.8, "reasoning": "brief explanation"}
+"""
+
+
+def strip_reasoning(system: str) -> str:
+    """Removes the free-text reasoning field from a template's format line and examples."""
+    return _REASONING_FIELD_RE.sub("", system)
+
+
+@dataclass(frozen=True)
+class PromptVariant:
+    """
+    A versioned classification prompt. `prompt_tokens` is estimated from the
+    template; latency and accuracy are benchmark measurements per model tier
+    (see `benchmarks.classifier_bench --prompt-variant`), absent until measured.
+    """
+
+    version: str
+    description: str
+    system: str
+    latency_ms: Optional[Dict[str, float]] = None
+    accuracy: Optional[Dict[str, float]] = None
+
+    @property
+    def prompt_tokens(self) -> int:
+        return estimate_tokens(self.system)
+
+    def render(self, text: str, include_reasoning: bool = True) -> str:
+        system = self.system if include_reasoning else strip_reasoning(self.system)
+        return f"{system}\n\nJournal entry: \"{text}\"\n\nJSON response:"
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            "description": self.description,
+            "prompt_tokens": self.prompt_tokens,
+            "latency_ms": self.latency_ms or {},
+            "accuracy": self.accuracy or {},
+        }
+
+
+class PromptRegistry:
+    """
+    Versioned prompt templates and the rule for choosing one per model tier.
+
+    Selection, in order:
+    1. AI_PROMPT_VARIANT forces one version for every model (used by the benchmark).
+    2. AI_PROMPT_VARIANTS maps tiers to versions, e.g. "small=auto,medium=v2-compact".
+       Unlisted tiers use the default version.
+    3. "auto" picks, among variants measured for the tier, the one with the
+       lowest p50 latency whose accuracy is within AI_PROMPT_MAX_ACCURACY_DROP
+       (default 0.02) of the most accurate; with no measurements it falls back
+       to the default version.
+
+    An unknown version in either setting is logged (once) and served with the
+    default version, so a typo degrades the prompt rather than failing
+    every classification.
+
+    A model's tier comes from AI_MODEL_TIERS ("llama3.2:1b=small,...") or else
+    its parameter count: up to 2B is small, up to 8B medium, larger is large.
+    """
+
+    def __init__(self, variants: List[PromptVariant], default_version: str = DEFAULT_PROMPT_VERSION) -> None:
+        self._variants: Dict[str, PromptVariant] = {v.version: v for v in variants}
+        if default_version not in self._variants:
+            raise ValueError(f"Default prompt version '{default_version}' is not registered")
+        self.default_version = default_version
+        self._warned: set = set()
+
+    def get(self, version: str) -> PromptVariant:
+        try:
+            return self._variants[version]
+        except KeyError:
+            raise ValueError(
+                f"Unknown prompt version '{version}'. Choose one of: {', '.join(self._variants)}"
+            ) from None
+
+    def versions(self) -> List[str]:
+        return list(self._variants)
+
+    def variants(self) -> List[PromptVariant]:
+        return list(self._variants.values())
+
+    def load_measurements(self, path: str = DEFAULT_MEASUREMENTS_PATH) -> None:
+        """Attaches measured latency/accuracy from a JSON file written by the benchmark."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Could not read prompt measurements from %s", path, exc_info=True)
+            return
+        for version, measured in data.items():
+            if version in self._variants:
+                variant = self._variants[version]
+                self._variants[version] = PromptVariant(
+                    variant.version,
+                    variant.description,
+                    variant.system,
+                    latency_ms=measured.get("latency_ms"),
+                    accuracy=measured.get("accuracy"),
+                )
+
+    def _auto(self, tier: str) -> PromptVariant:
+        measured = [
+            v for v in self._variants.values()
+            if v.accuracy and tier in v.accuracy and v.latency_ms and tier in v.latency_ms
+        ]
+        if not measured:
+            return self._variants[self.default_version]
+        max_drop = float(os.getenv("AI_PROMPT_MAX_ACCURACY_DROP", "0.02"))
+        best_accuracy = max(v.accuracy[tier] for v in measured)
+        eligible = [v for v in measured if v.accuracy[tier] >= best_accuracy - max_drop]
+        return min(eligible, key=lambda v: (v.latency_ms[tier], v.prompt_tokens))
+
+    def select(self, model: str) -> PromptVariant:
+        forced = os.getenv("AI_PROMPT_VARIANT")
+        if forced:
+            return self._configured(forced, "AI_PROMPT_VARIANT")
+        tier = model_tier(model)
+        choice = _parse_mapping(os.getenv("AI_PROMPT_VARIANTS", "")).get(tier, self.default_version)
+        if choice == "auto":
+            return self._auto(tier)
+        return self._configured(choice, "AI_PROMPT_VARIANTS")
+
+    def _configured(self, version: str, setting: str) -> PromptVariant:
+        variant = self._variants.get(version)
+        if variant is not None:
+            return variant
+        if (setting, version) not in self._warned:
+            self._warned.add((setting, version))
+            logger.warning(
+                "Unknown prompt version %r in %s; using %s. Choose one of: %s",
+                version,
+                setting,
+                self.default_version,
+                ", ".join(self._variants),
+            )
+        return self._variants[self.default_version]
+
+
+def _parse_mapping(raw: str) -> Dict[str, str]:
+    pairs = (item.split("=", 1) for item in raw.split(",") if "=" in item)
+    return {key.strip(): value.strip() for key, value in pairs}
+
+
+def model_tier(model: str) -> str:
+    explicit = _parse_mapping(os.getenv("AI_MODEL_TIERS", ""))
+    if model in explicit:
+        return explicit[model]
+    match = _PARAMS_RE.search(model.split(":", 1)[-1]) or _PARAMS_RE.search(model)
+    if not match:
+        return DEFAULT_TIER
+    params = float(match.group(1))
+    for tier, limit in TIER_LIMITS:
+        if params <= limit:
+            return tier
+    return "large"
+
+
+PROMPT_REGISTRY = PromptRegistry(
+    [
+        PromptVariant("v1-full", "Loop context, state descriptions, sublabels and seven examples.", V1_FULL),
+        PromptVariant("v2-compact", "Sublabels per state and three examples.", V2_COMPACT),
+        PromptVariant("v3-minimal", "States and sublabels only, no examples.", V3_MINIMAL),
+    ]
+)
+PROMPT_REGISTRY.load_measurements(os.getenv("AI_PROMPT_MEASUREMENTS", DEFAULT_MEASUREMENTS_PATH))
+
+
+def select_prompt_variant(model: str) -> PromptVariant:
+    return PROMPT_REGISTRY.select(model)
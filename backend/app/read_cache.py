@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, NamedTuple
+
+from .metrics import metrics
+
+READ_CACHE_LOOKUPS = metrics.counter(
+    "db_read_cache_lookups_total",
+    "Cached analytics reads by method and result (hit, stale, miss, wait).",
+)
+
+
+class _Entry(NamedTuple):
+    value: Any
+    version: str
+    stored_at: float
+
+
+class ReadCache:
+    """
+    Read-through cache for analytics queries, keyed by method and arguments.
+
+    An entry is fresh while the data version it was computed under is still
+    current and it is younger than `ttl`. Writes change the data version
+    (and call `invalidate`), so the next read recomputes; concurrent readers
+    of the same key wait for that one query instead of each hitting Neo4j.
+    Once an entry only outlives its TTL (nothing was written, but the query
+    may depend on the clock), one reader recomputes it while the others are
+    served the stale value: stale-while-revalidate.
+
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._in_flight: Dict[Hashable, threading.Event] = {}
+
+    def get(self, key: Hashable, version: Callable[[], str], compute: Callable[[], Any], name: str = "") -> Any:
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                current = version()
+                if entry is not None and entry.version == current and self._clock() - entry.stored_at < self.ttl:
+                    READ_CACHE_LOOKUPS.inc(method=name, result="hit")
+                    return entry.value
+                flight = self._in_flight.get(key)
+                if flight is None:
+                    flight = self._in_flight[key] = threading.Event()
+                    break
+                if entry is not None and entry.version == current:
+                    READ_CACHE_LOOKUPS.inc(method=name, result="stale")
+                    return entry.value
+            READ_CACHE_LOOKUPS.inc(method=name, result="wait")
+            flight.wait()
+
+        READ_CACHE_LOOKUPS.inc(method=name, result="miss")
+        try:
+            # Stored under the version read before querying: a write that
+            # lands meanwhile leaves the entry already out of date
+            value = compute()
+            with self._lock:
+                self._entries[key] = _Entry(value, current, self._clock())
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
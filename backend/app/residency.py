@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from .inference import InferenceBackend, OllamaBackend
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+AI_REQUEST_LATENCY = metrics.histogram(
+    "ai_request_latency_seconds",
+    "Latency of classification calls to the model server, split by cold/warm residency.",
+)
+
+# Ollama reports load_duration in nanoseconds; anything above this means the
+# weights were (re)loaded for the request and it should count as cold.
+COLD_LOAD_THRESHOLD_SECONDS = 0.5
+
+
+class ModelResidencyManager:
+    """
+    Keeps the configured model(s) loaded in memory.
+
+    - On startup, each model is preloaded with a tiny generate call.
+    - While traffic is low, a background loop sends keep-alive pings so the
+      model is not evicted between requests.
+    - Readiness is reported only once every model is resident.
+    - Live request latency is recorded separately for cold and warm calls.
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[str]] = None,
+        ollama_url: str = "http://localhost:11434",
+        keep_alive: str = "30m",
+        ping_interval: float = 240.0,
+        warm_timeout: float = 120.0,
+        backend: Optional[InferenceBackend] = None,
+    ) -> None:
+        self.models: List[str] = list(models or [])
+        self.ollama_url = ollama_url
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.warm_timeout = warm_timeout
+        self.backend = backend
+        self._resident: Dict[str, bool] = {}
+        self._last_used: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, models: List[str], ollama_url: str, backend: Optional[InferenceBackend] = None) -> None:
+        """Sets the model list, server URL and inference backend from the environment-derived config."""
+        self.models = [m for m in dict.fromkeys(models) if m]
+        self.ollama_url = ollama_url
+        self.backend = backend
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", self.keep_alive)
+        self.ping_interval = float(os.getenv("OLLAMA_KEEPALIVE_INTERVAL_SECONDS", self.ping_interval))
+
+    def set_models(self, models: List[str]) -> None:
+        """Replaces the kept-warm model list, e.g. after a runtime model swap."""
+        self.models = [m for m in dict.fromkeys(models) if m]
+
+    # ----- residency state -----
+
+    def is_resident(self, model: str) -> bool:
+        return self._resident.get(model, False)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.models) and all(self.is_resident(m) for m in self.models)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "ready": self.ready,
+            "models": {m: ("resident" if self.is_resident(m) else "loading") for m in self.models},
+            "latency": AI_REQUEST_LATENCY.snapshot(),
+        }
+
+    def mark_unloaded(self, model: str) -> None:
+        self._resident[model] = False
+
+    def record_request(
+        self,
+        model: str,
+        latency_seconds: float,
+        was_resident: bool,
+        load_duration_seconds: Optional[float] = None,
+        success: bool = True,
+    ) -> str:
+        """
+        Records a live classification call and returns its residency label.
+
+        A call counts as cold if the model was not known to be resident when
+        it started, or if the server reports it had to load the weights.
+        """
+        cold = not was_resident or (
+            load_duration_seconds is not None and load_duration_seconds > COLD_LOAD_THRESHOLD_SECONDS
+        )
+        residency = "cold" if cold else "warm"
+        AI_REQUEST_LATENCY.observe(latency_seconds, model=model, residency=residency)
+        self._last_used[model] = time.monotonic()
+        if success:
+            self._resident[model] = True
+        return residency
+
+    # ----- warm-up / keep-alive -----
+
+    async def warm(self, model: str) -> bool:
+        """Loads a model through the backend (a one-token generate for Ollama). Returns True once resident."""
+        started = time.perf_counter()
+        backend = self.backend or OllamaBackend(self.ollama_url)
+        try:
+            await backend.warm(model, self.keep_alive, timeout=self.warm_timeout)
+        except Exception:
+            self._resident[model] = False
+            logger.warning(
+                "AI: warm-up failed for model '%s'",
+                model,
+                exc_info=True,
+                extra={"event": "ai_warmup_failed", "model": model},
+            )
+            return False
+
+        self._resident[model] = True
+        self._last_used[model] = time.monotonic()
+        logger.info(
+            "AI Ready: Model '%s' is resident.",
+            model,
+            extra={
+                "event": "ai_warmup_complete",
+                "model": model,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            },
+        )
+        return True
+
+    async def warm_all(self) -> bool:
+        results = await asyncio.gather(*(self.warm(m) for m in self.models))
+        return all(results)
+
+    def _needs_ping(self, model: str, now: float) -> bool:
+        if not self.is_resident(model):
+            return True
+        return now - self._last_used.get(model, 0.0) >= self.ping_interval
+
+    async def ping_idle_models(self) -> None:
+        """Re-warms any model that is not resident or has been idle for a full ping interval."""
+        now = time.monotonic()
+        for model in self.models:
+            if self._needs_ping(model, now):
+                await self.warm(model)
+
+    async def _run(self) -> None:
+        await self.warm_all()
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await self.ping_idle_models()
+
+    def start(self) -> None:
+        """Starts warm-up and the keep-alive loop in the background."""
+        if self._task is None and self.models:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+model_residency = ModelResidencyManager()
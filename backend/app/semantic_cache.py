@@ -0,0 +1,202 @@
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1024
+# Without numpy every lookup scans capacity x dim floats in Python (~47 ms at 1024 x 768)
+DEFAULT_CAPACITY_PURE_PYTHON = 256
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+SEMANTIC_CACHE_LOOKUPS = metrics.counter(
+    "semantic_cache_lookups_total",
+    "Semantic cache lookups by result (hit, miss, error).",
+)
+SEMANTIC_CACHE_EVICTIONS = metrics.counter(
+    "semantic_cache_evictions_total",
+    "Entries evicted from the semantic cache, by reason (capacity, expired).",
+)
+SEMANTIC_CACHE_SIMILARITY = metrics.histogram(
+    "semantic_cache_best_similarity",
+    "Cosine similarity of the closest cached entry per lookup, for tuning the threshold.",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 1.0),
+)
+
+
+def semantic_cache_enabled() -> bool:
+    return os.getenv("AI_SEMANTIC_CACHE", "false").lower() == "true"
+
+
+def _normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class SemanticCache:
+    """
+    Reuses classifications of recent entries whose embeddings are close to
+    a new entry's embedding.
+
+    Vectors are L2-normalized on insert so cosine similarity is a dot
+    product; with numpy installed the whole cache is searched with one
+    matrix-vector product over a preallocated `capacity x dim` float32
+    matrix, otherwise a pure-Python scan is used. Only the embedding and the
+    prediction are kept, never the journal text, so memory is bounded by
+    `capacity x dim x 4` bytes plus the small prediction dicts.
+
+    Lookups and inserts are synchronous and hold a lock for the whole scan;
+    async callers should run them in a worker thread.
+
+    Entries are scoped by a namespace (model and prompt variant) so a
+    cached label is only reused for the configuration that produced it.
+    When full, the least recently used entry is evicted; entries older than
+    `ttl_seconds` are never returned and are evicted first.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        self.use_numpy = (np is not None) if use_numpy is None else (use_numpy and np is not None)
+        self.capacity = self.default_capacity() if capacity is None else capacity
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.clear()
+
+    def default_capacity(self) -> int:
+        return DEFAULT_CAPACITY if self.use_numpy else DEFAULT_CAPACITY_PURE_PYTHON
+
+    def configure(self) -> None:
+        """Reads AI_SEMANTIC_CACHE_* settings; existing entries are dropped."""
+        self.capacity = int(os.getenv("AI_SEMANTIC_CACHE_SIZE", self.default_capacity()))
+        self.threshold = float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+        self.ttl_seconds = float(os.getenv("AI_SEMANTIC_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.dim: Optional[int] = None
+            self._namespace_ids: Dict[str, int] = {}
+            self._allocate(0)
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _allocate(self, dim: int) -> None:
+        self._predictions: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self._last_used = [0.0] * self.capacity
+        self._size = 0
+        if self.use_numpy:
+            self._vectors: Any = np.zeros((self.capacity, dim), dtype=np.float32)
+            self._namespaces: Any = np.full(self.capacity, -1, dtype=np.int32)
+            self._created: Any = np.zeros(self.capacity, dtype=np.float64)
+        else:
+            self._vectors = [None] * self.capacity
+            self._namespaces = [-1] * self.capacity
+            self._created = [0.0] * self.capacity
+
+    def _ensure_storage(self, dim: int) -> None:
+        if self.dim != dim:
+            # A different embedding size means a different embedding model; start over
+            self.dim = dim
+            self._allocate(dim)
+
+    def _best_match(self, query: List[float], namespace_id: int, now: float) -> Tuple[int, float]:
+        """Slot and similarity of the closest live entry in the namespace, or (-1, -1.0)."""
+        if self.use_numpy:
+            similarities = self._vectors @ np.asarray(query, dtype=np.float32)
+            live = (self._namespaces == namespace_id) & (now - self._created <= self.ttl_seconds)
+            if not live.any():
+                return -1, -1.0
+            slot = int(np.argmax(np.where(live, similarities, -np.inf)))
+            return slot, float(similarities[slot])
+
+        best_slot, best = -1, -1.0
+        for slot in range(self._size):
+            if self._namespaces[slot] != namespace_id or now - self._created[slot] > self.ttl_seconds:
+                continue
+            similarity = sum(a * b for a, b in zip(self._vectors[slot], query))
+            if similarity > best:
+                best_slot, best = slot, similarity
+        return best_slot, best
+
+    def lookup(self, embedding: Sequence[float], namespace: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Returns (prediction, similarity) for the closest live entry above the threshold, else None."""
+        with self._lock:
+            if self._size == 0 or self.dim != len(embedding):
+                self.misses += 1
+                SEMANTIC_CACHE_LOOKUPS.inc(result="miss")
+                return None
+
+            now = time.monotonic()
+            best_slot, best = self._best_match(_normalize(embedding), self._namespace_ids.get(namespace, -2), now)
+
+            if best_slot >= 0:
+                SEMANTIC_CACHE_SIMILARITY.observe(best)
+            if best_slot < 0 or best < self.threshold:
+                self.misses += 1
+                SEMANTIC_CACHE_LOOKUPS.inc(result="miss")
+                return None
+
+            self._last_used[best_slot] = now
+            self.hits += 1
+            SEMANTIC_CACHE_LOOKUPS.inc(result="hit")
+            return dict(self._predictions[best_slot]), best
+
+    def _free_slot(self, now: float) -> int:
+        if self._size < self.capacity:
+            return self._size
+        for slot in range(self.capacity):
+            if now - self._created[slot] > self.ttl_seconds:
+                SEMANTIC_CACHE_EVICTIONS.inc(reason="expired")
+                return slot
+        SEMANTIC_CACHE_EVICTIONS.inc(reason="capacity")
+        return min(range(self.capacity), key=self._last_used.__getitem__)
+
+    def add(self, embedding: Sequence[float], namespace: str, prediction: Dict[str, Any]) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._ensure_storage(len(embedding))
+            now = time.monotonic()
+            slot = self._free_slot(now)
+            self._vectors[slot] = _normalize(embedding)
+            self._namespaces[slot] = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            self._predictions[slot] = dict(prediction)
+            self._created[slot] = now
+            self._last_used[slot] = now
+            if slot == self._size:
+                self._size += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "vectorized": self.use_numpy,
+        }
+
+
+semantic_cache = SemanticCache()
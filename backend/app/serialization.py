@@ -0,0 +1,122 @@
+import json
+import time
+import types
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .metrics import metrics
+
+RESPONSE_SERIALIZATION = metrics.histogram(
+    "response_serialization_seconds",
+    "Time to shape and encode a response body, by endpoint.",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+Shaper = Callable[[Any], Any]
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON; orjson when installed, else the stdlib."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def shaper(annotation: Any) -> Optional[Shaper]:
+    """
+    A function that projects trusted data onto a response annotation, or
+    None if values of that type pass through unchanged.
+
+    The projection is what response_model would output, without checking
+    types: each model keeps only its declared fields, missing optional
+    fields take their defaults, and nested models, lists and dicts of
+    models are projected the same way. It is compiled once per annotation.
+    """
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        shapes = [shaper(arg) for arg in get_args(annotation) if arg is not type(None)]
+        return shapes[0] if len(shapes) == 1 else None
+    if origin in (list, List):
+        inner = shaper(get_args(annotation)[0])
+        return (lambda value: None if value is None else [inner(item) for item in value]) if inner else None
+    if origin in (dict, Dict):
+        inner = shaper(get_args(annotation)[1])
+        return (lambda value: None if value is None else {k: inner(v) for k, v in value.items()}) if inner else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _model_shaper(annotation)
+    return None
+
+
+def _model_shaper(model: type) -> Shaper:
+    fields = []
+    for name, field in model.model_fields.items():
+        required = field.is_required()
+        default = None if required else field.get_default(call_default_factory=True)
+        fields.append((name, required, default, shaper(field.annotation)))
+    names = frozenset(model.model_fields)
+    flat = all(inner is None for *_, inner in fields)
+
+    def shape(value: Any) -> Any:
+        if value is None:
+            return None
+        if isinstance(value, BaseModel):
+            value = value.__dict__
+        if flat and value.keys() == names:
+            # Already exactly the model's fields (e.g. rows straight from a query)
+            return value
+        out = {}
+        for name, required, default, inner in fields:
+            item = value[name] if required else value.get(name, default)
+            out[name] = inner(item) if inner is not None and item is not None else item
+        return out
+
+    return shape
+
+
+class TrustedJSONResponse(Response):
+    """
+    JSON response for data the handler built itself: projected onto the
+    response annotation without re-validation and encoded with `dumps`.
+    Shaping and encoding time is recorded per endpoint.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        annotation: Any = None,
+        endpoint: str = "",
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        started = time.perf_counter()
+        shape = shaper(annotation) if annotation is not None else None
+        body = dumps(shape(content) if shape is not None else content)
+        RESPONSE_SERIALIZATION.observe(time.perf_counter() - started, endpoint=endpoint)
+        super().__init__(body, status_code=status_code, headers=headers, media_type=self.media_type)
+
+
+def trusted_response(
+    content: Any, annotation: Any = None, endpoint: str = "", response: Optional[Response] = None
+) -> TrustedJSONResponse:
+    """TrustedJSONResponse carrying any headers already set on FastAPI's injected `response`."""
+    result = TrustedJSONResponse(content, annotation, endpoint)
+    if response is not None:
+        result.headers.raw.extend((key, value) for key, value in response.headers.raw if key != b"content-length")
+    return result
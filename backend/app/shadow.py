@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from .ai import FALLBACK_REASONINGS, query_local_ai
+from .metrics import metrics, percentile
+
+logger = logging.getLogger(__name__)
+
+SHADOW_COMPARISONS = metrics.counter(
+    "shadow_comparisons_total",
+    "Shadow classifications compared with production, by candidate and node agreement.",
+)
+SHADOW_LATENCY = metrics.histogram(
+    "shadow_latency_seconds",
+    "Classification latency of mirrored requests, for production and the shadow candidate.",
+)
+SHADOW_FALLBACKS = metrics.counter(
+    "shadow_fallbacks_total",
+    "Mirrored requests that ended in a fallback prediction, for production and the shadow candidate.",
+)
+SHADOW_DROPPED = metrics.counter(
+    "shadow_dropped_total",
+    "Mirrored requests dropped because the shadow queue was full.",
+)
+
+# Recent latencies kept per variant for the percentile report
+LATENCY_WINDOW = 1000
+
+PROMPT_VARIANTS = ("full", "classify_only")
+
+Classifier = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class ShadowEvaluator:
+    """
+    Mirrors a sample of /analyze texts to a candidate model/prompt and
+    compares the result with what production returned.
+
+    Production never waits on the shadow: /analyze only enqueues the text
+    after its response is sent. A single worker drains the queue and only
+    starts a shadow call while no live classification is in flight, so the
+    candidate competes with live traffic for at most one slot. When the
+    queue is full new samples are dropped rather than delaying anything.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        candidate_model: Optional[str] = None,
+        candidate_prompt: str = "full",
+        max_queue: int = 100,
+        classify: Optional[Classifier] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.candidate_model = candidate_model
+        self.candidate_prompt = candidate_prompt
+        self.max_queue = max_queue
+        # Shadow calls stay out of the production latency, token and residency metrics
+        self.classify = classify or partial(query_local_ai, record_metrics=False)
+        self._rng = rng or random.Random()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._live = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self.samples = 0
+        self.node_agreements = 0
+        self.sublabel_agreements = 0
+        self.fallbacks = {"production": 0, "candidate": 0}
+        self.dropped = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            "production": deque(maxlen=LATENCY_WINDOW),
+            "candidate": deque(maxlen=LATENCY_WINDOW),
+        }
+
+    def configure(self) -> None:
+        """Reads SHADOW_* settings from the environment."""
+        self.sample_rate = max(0.0, min(1.0, float(os.getenv("SHADOW_SAMPLE_RATE", "0"))))
+        self.candidate_model = os.getenv("SHADOW_MODEL") or None
+        prompt = os.getenv("SHADOW_PROMPT", "full")
+        if prompt not in PROMPT_VARIANTS:
+            raise ValueError(f"SHADOW_PROMPT must be one of: {', '.join(PROMPT_VARIANTS)}")
+        self.candidate_prompt = prompt
+        self.max_queue = int(os.getenv("SHADOW_MAX_QUEUE", str(self.max_queue)))
+        self._queue = None
+        self._reset_stats()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    @property
+    def candidate(self) -> str:
+        return f"{self.candidate_model or 'default'}/{self.candidate_prompt}"
+
+    # ----- live traffic tracking -----
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    @contextmanager
+    def live_call(self):
+        """Marks a live classification in flight; shadow calls wait until none are."""
+        idle = self._idle_event()
+        self._live += 1
+        idle.clear()
+        try:
+            yield
+        finally:
+            self._live -= 1
+            if self._live == 0:
+                idle.set()
+
+    # ----- sampling -----
+
+    def should_sample(self) -> bool:
+        return self.enabled and self._rng.random() < self.sample_rate
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        return self._queue
+
+    async def submit(
+        self, text: str, production: Dict[str, Any], production_latency: float, request_id: str = ""
+    ) -> bool:
+        """
+        Queues a text for shadow classification. Returns False if it was dropped.
+
+        A coroutine so that background tasks run it on the event loop: the
+        queue is not thread-safe.
+        """
+        try:
+            self._get_queue().put_nowait((text, production, production_latency, request_id))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            SHADOW_DROPPED.inc(candidate=self.candidate)
+            return False
+        return True
+
+    # ----- evaluation -----
+
+    async def evaluate(
+        self, text: str, production: Dict[str, Any], production_latency: float, request_id: str = ""
+    ) -> Dict[str, Any]:
+        """Runs the candidate on one text and records how it compares with production."""
+        await self._idle_event().wait()
+        started = time.perf_counter()
+        candidate = await self.classify(
+            text,
+            request_id=f"shadow:{request_id}" if request_id else "shadow",
+            include_reasoning=self.candidate_prompt == "full",
+            model=self.candidate_model,
+        )
+        candidate_latency = time.perf_counter() - started
+        self.record(production, production_latency, candidate, candidate_latency)
+        return candidate
+
+    def record(
+        self,
+        production: Dict[str, Any],
+        production_latency: float,
+        candidate: Dict[str, Any],
+        candidate_latency: float,
+    ) -> None:
+        node_agrees = production["detected_node"] == candidate["detected_node"]
+        sublabel_agrees = node_agrees and production.get("emotion_sublabel") == candidate.get("emotion_sublabel")
+
+        self.samples += 1
+        self.node_agreements += node_agrees
+        self.sublabel_agreements += sublabel_agrees
+        SHADOW_COMPARISONS.inc(candidate=self.candidate, node_agreement=str(node_agrees).lower())
+
+        for variant, prediction, latency in (
+            ("production", production, production_latency),
+            ("candidate", candidate, candidate_latency),
+        ):
+            self._latencies[variant].append(latency)
+            SHADOW_LATENCY.observe(latency, candidate=self.candidate, variant=variant)
+            if prediction.get("reasoning") in FALLBACK_REASONINGS:
+                self.fallbacks[variant] += 1
+                SHADOW_FALLBACKS.inc(candidate=self.candidate, variant=variant)
+
+        logger.info(
+            "Shadow comparison",
+            extra={
+                "event": "shadow_comparison",
+                "candidate": self.candidate,
+                "node_agreement": node_agrees,
+                "production_node": production["detected_node"],
+                "candidate_node": candidate["detected_node"],
+                "production_latency_ms": round(production_latency * 1000, 2),
+                "candidate_latency_ms": round(candidate_latency * 1000, 2),
+            },
+        )
+
+    def report(self) -> Dict[str, Any]:
+        def rate(count: int) -> Optional[float]:
+            return round(count / self.samples, 4) if self.samples else None
+
+        latency = {
+            variant: {
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+            }
+            for variant, values in self._latencies.items()
+        }
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "candidate": self.candidate,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "node_agreement_rate": rate(self.node_agreements),
+            "sublabel_agreement_rate": rate(self.sublabel_agreements),
+            "fallback_rate": {variant: rate(count) for variant, count in self.fallbacks.items()},
+            "latency": latency,
+        }
+
+    # ----- worker -----
+
+    async def _run(self) -> None:
+        queue = self._get_queue()
+        while True:
+            text, production, production_latency, request_id = await queue.get()
+            try:
+                await self.evaluate(text, production, production_latency, request_id)
+            except Exception:
+                logger.warning("Shadow evaluation failed", exc_info=True, extra={"event": "shadow_failed"})
+            finally:
+                queue.task_done()
+
+    def start(self) -> None:
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+shadow_evaluator = ShadowEvaluator()
@@ -0,0 +1,367 @@
+"""
+Classifier latency and accuracy benchmark.
+
+Replays a labelled corpus of journal texts through `query_local_ai` (and so
+`clean_ai_response`) against either a real Ollama or the bundled stub server,
+then reports latency percentiles, throughput per concurrency level, per-node
+confusion matrices and the fallback rate. With several `--backend` values the
+same corpus is replayed through each inference backend and the runs are
+compared side by side. `--prompt-variant` does the same for registered
+prompt versions and `--save-prompt-measurements` records their latency and
+accuracy for the model's tier, which the prompt registry uses for "auto"
+selection.
+
+Usage (from backend/):
+    python -m benchmarks.classifier_bench --stub --concurrency 1,4 --output results/stub.json
+    python -m benchmarks.classifier_bench --ollama-url http://localhost:11434 --repeat 3
+    LLAMA_CPP_MODEL_PATH=models/llama-3.2-3b-q4_k_m.gguf \
+        python -m benchmarks.classifier_bench --backend ollama,llamacpp --concurrency 1,4
+    python -m benchmarks.classifier_bench --prompt-variant v1-full,v2-compact,v3-minimal --save-prompt-measurements
+    python -m benchmarks.classifier_bench --compare results/before.json results/after.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.ai import FALLBACK_REASONINGS, query_local_ai
+from app.inference import BACKENDS, get_ollama_model, get_ollama_url
+from app.metrics import percentile
+from app.prompts import DEFAULT_MEASUREMENTS_PATH, PROMPT_REGISTRY, model_tier
+
+from .stub_ollama import StubOllamaServer, StubTiming
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+
+Classifier = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+def load_corpus(path: str = DEFAULT_CORPUS) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def confusion_matrix(pairs: Sequence[tuple]) -> Dict[str, Dict[str, int]]:
+    """Maps actual node -> predicted node -> count."""
+    matrix: Dict[str, Dict[str, int]] = {}
+    for actual, predicted in pairs:
+        row = matrix.setdefault(actual, {})
+        row[predicted] = row.get(predicted, 0) + 1
+    return matrix
+
+
+def per_node_stats(pairs: Sequence[tuple]) -> Dict[str, Dict[str, Any]]:
+    """One-vs-rest confusion counts with precision/recall for each node."""
+    nodes = sorted({a for a, _ in pairs} | {p for _, p in pairs})
+    stats = {}
+    for node in nodes:
+        tp = sum(1 for a, p in pairs if a == node and p == node)
+        fp = sum(1 for a, p in pairs if a != node and p == node)
+        fn = sum(1 for a, p in pairs if a == node and p != node)
+        tn = len(pairs) - tp - fp - fn
+        stats[node] = {
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+            "tn": tn,
+            "precision": round(tp / (tp + fp), 4) if tp + fp else None,
+            "recall": round(tp / (tp + fn), 4) if tp + fn else None,
+            "support": tp + fn,
+        }
+    return stats
+
+
+async def run_benchmark(
+    corpus: List[Dict[str, Any]],
+    concurrency: int = 1,
+    repeat: int = 1,
+    classify: Classifier = query_local_ai,
+) -> Dict[str, Any]:
+    """Classifies every corpus item `repeat` times with at most `concurrency` calls in flight."""
+    items = [item for _ in range(repeat) for item in corpus]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    outcomes: List[Dict[str, Any]] = []
+
+    async def one(item: Dict[str, Any]) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            prediction = await classify(item["text"])
+            latencies.append(time.perf_counter() - started)
+        outcomes.append({"item": item, "prediction": prediction})
+
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(one(item) for item in items))
+    wall = time.perf_counter() - wall_started
+
+    pairs = [(o["item"]["node"], o["prediction"]["detected_node"]) for o in outcomes]
+    correct_nodes = sum(1 for a, p in pairs if a == p)
+    correct_sublabels = sum(
+        1
+        for o in outcomes
+        if o["item"]["node"] == o["prediction"]["detected_node"]
+        and o["item"].get("sublabel") == o["prediction"].get("emotion_sublabel")
+    )
+    fallbacks = sum(1 for o in outcomes if o["prediction"].get("reasoning") in FALLBACK_REASONINGS)
+    latencies_ms = [l * 1000 for l in latencies]
+    total = len(outcomes)
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(total / wall, 3) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p95": round(percentile(latencies_ms, 95), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "mean": round(sum(latencies_ms) / total, 2) if total else 0.0,
+            "max": round(max(latencies_ms), 2) if latencies_ms else 0.0,
+        },
+        "accuracy": round(correct_nodes / total, 4) if total else None,
+        "sublabel_accuracy": round(correct_sublabels / total, 4) if total else None,
+        "fallback_rate": round(fallbacks / total, 4) if total else None,
+        "confusion_matrix": confusion_matrix(pairs),
+        "per_node": per_node_stats(pairs),
+    }
+
+
+async def run_suite(
+    corpus: List[Dict[str, Any]],
+    concurrency_levels: Sequence[int],
+    repeat: int = 1,
+    classify: Classifier = query_local_ai,
+) -> List[Dict[str, Any]]:
+    return [await run_benchmark(corpus, c, repeat, classify) for c in concurrency_levels]
+
+
+def _run_key(run: Dict[str, Any]) -> Tuple[str, Optional[str], int]:
+    # Results saved before backends were selectable were all Ollama runs
+    return run.get("backend", "ollama"), run.get("prompt_version"), run["concurrency"]
+
+
+def _label(backend: str, prompt_version: Optional[str]) -> str:
+    return f"{backend}/{prompt_version}" if prompt_version else backend
+
+
+def _delta_lines(base: Dict[str, Any], run: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key in ("p50", "p95", "p99"):
+        old, new = base["latency_ms"][key], run["latency_ms"][key]
+        lines.append(f"  {key:<16} {old:>10.2f} -> {new:>10.2f} ms ({new - old:+.2f})")
+    for key in ("throughput_rps", "accuracy", "sublabel_accuracy", "fallback_rate"):
+        old, new = base.get(key), run.get(key)
+        if old is None or new is None:
+            continue
+        lines.append(f"  {key:<16} {old:>10.4f} -> {new:>10.4f} ({new - old:+.4f})")
+    return lines
+
+
+def compare_results(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    """Human-readable deltas between two saved benchmark runs, matched by backend, prompt and concurrency."""
+    lines = []
+    before_runs = {_run_key(r): r for r in before.get("runs", [])}
+    for run in after.get("runs", []):
+        backend, prompt_version, concurrency = _run_key(run)
+        base = before_runs.get((backend, prompt_version, concurrency))
+        if not base:
+            continue
+        lines.append(f"backend={_label(backend, prompt_version)} concurrency={concurrency}")
+        lines.extend(_delta_lines(base, run))
+    return lines
+
+
+def compare_backends(result: Dict[str, Any]) -> List[str]:
+    """
+    Deltas from the first backend (and prompt version) in a run to each of
+    the others, matched by concurrency.
+    """
+    runs = result.get("runs", [])
+    configs = list(dict.fromkeys(_run_key(r)[:2] for r in runs))
+    if len(configs) < 2:
+        return []
+    reference = {r["concurrency"]: r for r in runs if _run_key(r)[:2] == configs[0]}
+    lines = []
+    for run in runs:
+        backend, prompt_version, concurrency = _run_key(run)
+        base = reference.get(concurrency)
+        if (backend, prompt_version) == configs[0] or not base:
+            continue
+        lines.append(f"{_label(*configs[0])} -> {_label(backend, prompt_version)} concurrency={concurrency}")
+        lines.extend(_delta_lines(base, run))
+    return lines
+
+
+def prompt_measurements(runs: List[Dict[str, Any]], tier: str, existing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Folds per-prompt runs into the registry's measurement format:
+    {version: {"latency_ms": {tier: p50}, "accuracy": {tier: accuracy}}}.
+    Latency comes from the lowest-concurrency run so queueing does not skew it.
+    """
+    measurements = {k: {f: dict(v.get(f, {})) for f in ("latency_ms", "accuracy")} for k, v in (existing or {}).items()}
+    best: Dict[str, Dict[str, Any]] = {}
+    for run in runs:
+        version = run.get("prompt_version")
+        if version and (version not in best or run["concurrency"] < best[version]["concurrency"]):
+            best[version] = run
+    for version, run in best.items():
+        entry = measurements.setdefault(version, {"latency_ms": {}, "accuracy": {}})
+        entry["latency_ms"][tier] = run["latency_ms"]["p50"]
+        entry["accuracy"][tier] = run["accuracy"]
+    return measurements
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file with text/node/sublabel rows")
+    parser.add_argument("--ollama-url", default=None, help="Real Ollama URL (defaults to OLLAMA_URL)")
+    parser.add_argument("--stub", action="store_true", help="Serve recorded responses from the bundled stub")
+    parser.add_argument("--stub-time-scale", type=float, default=1.0, help="Multiply stub sleeps by this factor")
+    parser.add_argument("--stub-parallel", type=int, default=1, help="Concurrent generations in the stub")
+    parser.add_argument(
+        "--stub-tail-tokens", type=int, default=0, help="Whitespace tokens the stub emits after the JSON object"
+    )
+    parser.add_argument(
+        "--backend",
+        default=None,
+        help=f"Comma-separated inference backends to compare ({', '.join(BACKENDS)}); defaults to INFERENCE_BACKEND",
+    )
+    parser.add_argument(
+        "--prompt-variant",
+        default=None,
+        help=f"Comma-separated prompt versions to compare ({', '.join(PROMPT_REGISTRY.versions())})",
+    )
+    parser.add_argument(
+        "--save-prompt-measurements",
+        nargs="?",
+        const=DEFAULT_MEASUREMENTS_PATH,
+        default=None,
+        metavar="PATH",
+        help="Merge per-prompt latency/accuracy for the model's tier into the registry's measurements file",
+    )
+    parser.add_argument("--concurrency", default="1", help="Comma-separated concurrency levels, e.g. 1,4,8")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the corpus this many times per level")
+    parser.add_argument("--output", default=None, help="Write results JSON to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two saved results")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.compare:
+        with open(args.compare[0]) as f_before, open(args.compare[1]) as f_after:
+            print("\n".join(compare_results(json.load(f_before), json.load(f_after))))
+        return 0
+
+    # query_local_ai logs every call at INFO; keep the benchmark output readable
+    logging.basicConfig(level=logging.WARNING)
+    corpus = load_corpus(args.corpus)
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    backends = [b.strip() for b in (args.backend or os.getenv("INFERENCE_BACKEND", "ollama")).split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        print(f"Unknown backend(s): {', '.join(unknown)}. Choose from: {', '.join(BACKENDS)}", file=sys.stderr)
+        return 2
+    variants = [v.strip() for v in (args.prompt_variant or "").split(",") if v.strip()]
+    unknown = [v for v in variants if v not in PROMPT_REGISTRY.versions()]
+    if unknown:
+        print(f"Unknown prompt version(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    stub = None
+    previous_url = os.environ.get("OLLAMA_URL")
+    previous_backend = os.environ.get("INFERENCE_BACKEND")
+    previous_variant = os.environ.get("AI_PROMPT_VARIANT")
+    if args.stub:
+        recordings = {item["text"]: item["recorded_response"] for item in corpus if "recorded_response" in item}
+        stub = StubOllamaServer(
+            recordings,
+            StubTiming(
+                time_scale=args.stub_time_scale,
+                parallel=args.stub_parallel,
+                tail_tokens=args.stub_tail_tokens,
+            ),
+            model=get_ollama_model(),
+        )
+        os.environ["OLLAMA_URL"] = stub.start()
+    elif args.ollama_url:
+        os.environ["OLLAMA_URL"] = args.ollama_url
+
+    target_url = get_ollama_url()
+    runs: List[Dict[str, Any]] = []
+    try:
+        for backend in backends:
+            os.environ["INFERENCE_BACKEND"] = backend
+            for variant in variants or [None]:
+                if variant:
+                    os.environ["AI_PROMPT_VARIANT"] = variant
+                tag = {"backend": backend, **({"prompt_version": variant} if variant else {})}
+                for run in asyncio.run(run_suite(corpus, levels, args.repeat)):
+                    runs.append({**tag, **run})
+    finally:
+        if stub:
+            stub.stop()
+        for key, previous in (
+            ("OLLAMA_URL", previous_url),
+            ("INFERENCE_BACKEND", previous_backend),
+            ("AI_PROMPT_VARIANT", previous_variant),
+        ):
+            if previous is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = previous
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "model": get_ollama_model(),
+            "backends": backends,
+            "prompt_versions": variants,
+            "ollama_url": "stub" if stub else target_url,
+            "corpus": os.path.basename(args.corpus),
+            "corpus_size": len(corpus),
+            "repeat": args.repeat,
+        },
+        "runs": runs,
+    }
+    if stub:
+        result["stub"] = {
+            "requests_served": stub.requests_served,
+            "tokens_generated": stub.tokens_generated,
+            "streams_aborted": stub.streams_aborted,
+        }
+    for run in runs:
+        lat = run["latency_ms"]
+        print(
+            f"backend={_label(run['backend'], run.get('prompt_version')):<20} concurrency={run['concurrency']:<3} p50={lat['p50']:.1f}ms p95={lat['p95']:.1f}ms "
+            f"p99={lat['p99']:.1f}ms rps={run['throughput_rps']} accuracy={run['accuracy']} "
+            f"fallback_rate={run['fallback_rate']}"
+        )
+    if args.save_prompt_measurements and variants:
+        path = args.save_prompt_measurements
+        existing = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                existing = json.load(f)
+        with open(path, "w") as f:
+            json.dump(prompt_measurements(runs, model_tier(get_ollama_model()), existing), f, indent=2, sort_keys=True)
+        print(f"Prompt measurements written to {path}")
+
+    comparison = compare_backends(result)
+    if comparison:
+        print("\n".join(comparison))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
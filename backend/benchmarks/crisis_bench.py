@@ -0,0 +1,274 @@
+"""
+Crisis keyword matcher benchmark.
+
+Times `KeywordMatcher` (the Aho-Corasick automaton behind
+`CrisisSafetyService.detect_crisis`) against the single `\\b(a|b|...)\\b`
+alternation regex it replaced, across keyword-list sizes and text lengths,
+and checks both return the same matches. Keyword lists beyond the defaults
+are padded with synthetic multilingual phrases; texts are built from the
+classifier corpus, with an "adversarial" variant made of near-miss prefixes
+that make the regex try every alternative at every word.
+
+`--fuzzy` times typo-tolerant matching (`FuzzyKeywordMatcher`, a
+symmetric-delete index) on the same texts with typos injected, against the
+brute-force approach of comparing every word with every keyword word.
+
+`--batch` reports `CrisisSafetyService.screen_batch` throughput in MB/s
+for a batch of corpus entries at each worker count in `--workers`.
+
+Usage (from backend/):
+    python -m benchmarks.crisis_bench
+    python -m benchmarks.crisis_bench --keywords 30,300,3000 --lengths 500,5000,50000 --output results/crisis.json
+    python -m benchmarks.crisis_bench --fuzzy --lengths 5000
+    python -m benchmarks.crisis_bench --batch --texts 5000 --workers 1,2,4
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.crisis import CrisisSafetyService
+from app.matcher import FuzzyKeywordMatcher, KeywordMatcher, edit_distance, tokenize
+
+from .classifier_bench import load_corpus, percentile
+
+# Letters from several scripts so synthetic keywords exercise non-ASCII matching
+_ALPHABET = "abcdefghijklmnopqrstuvwxyzáéíóúñçßäöüøåłżźśęąйцукенгшщзхъфывапролджэячсмитьбю"
+
+
+def regex_matcher(keywords: Sequence[str]) -> Callable[[str], List[str]]:
+    """The previous implementation: one alternation regex, findall over lowercased text."""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords if k) + r")\b", re.IGNORECASE)
+    return lambda text: pattern.findall(text.lower())
+
+
+def build_keywords(count: int, seed: int = 0) -> List[str]:
+    """The default keywords padded with deterministic synthetic phrases up to `count`."""
+    rng = random.Random(seed)
+    keywords = list(CrisisSafetyService.DEFAULT_KEYWORDS)
+    seen = set(keywords)
+    while len(keywords) < count:
+        words = ["".join(rng.choice(_ALPHABET) for _ in range(rng.randint(3, 9))) for _ in range(rng.randint(1, 4))]
+        phrase = " ".join(words)
+        if phrase not in seen:
+            seen.add(phrase)
+            keywords.append(phrase)
+    return keywords[:count] if count >= len(CrisisSafetyService.DEFAULT_KEYWORDS) else keywords
+
+
+def build_text(length: int, keywords: Sequence[str], adversarial: bool = False, seed: int = 0) -> str:
+    """Corpus sentences (or keyword near-misses) repeated to `length` characters."""
+    rng = random.Random(seed)
+    if adversarial:
+        # Each word is a keyword's first word with its last letter changed, so
+        # many alternatives get partway through before failing
+        pieces = [k.split(" ")[0][:-1] + "q" for k in keywords if len(k) > 2]
+    else:
+        pieces = [item["text"] for item in load_corpus()]
+    parts: List[str] = []
+    total = 0
+    while total < length:
+        piece = rng.choice(pieces)
+        parts.append(piece)
+        total += len(piece) + 1
+    return " ".join(parts)[:length]
+
+
+def add_typos(text: str, rate: float = 0.05, seed: int = 0) -> str:
+    """Swaps two adjacent letters in roughly `rate` of the words."""
+    rng = random.Random(seed)
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        if len(word) > 4 and rng.random() < rate:
+            j = rng.randint(1, len(word) - 3)
+            words[i] = word[:j] + word[j + 1] + word[j] + word[j + 2:]
+    return " ".join(words)
+
+
+def with_misspelled_keywords(text: str, every: int = 400, seed: int = 0) -> str:
+    """Inserts a misspelled default keyword roughly every `every` characters."""
+    rng = random.Random(seed)
+    long_keywords = [k for k in CrisisSafetyService.DEFAULT_KEYWORDS if len(k) >= 6]
+    pieces = []
+    for start in range(0, len(text), every):
+        pieces.append(text[start:start + every])
+        pieces.append(add_typos(rng.choice(long_keywords), rate=1.0, seed=start))
+    return " ".join(pieces)[:len(text)]
+
+
+def brute_force_fuzzy(keywords: Sequence[str], max_distance: int = 1) -> Callable[[str], List[str]]:
+    """Baseline: edit distance from every text word to every keyword word."""
+    vocabulary = sorted({word for k in keywords for _, _, word in tokenize(k.lower())})
+
+    def match(text: str) -> List[str]:
+        return [
+            candidate
+            for _, _, word in tokenize(text.lower())
+            for candidate in vocabulary
+            if edit_distance(word, candidate, max_distance) <= max_distance
+        ]
+
+    return match
+
+
+def time_matcher(match: Callable[[str], List[str]], text: str, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        match(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    p50 = percentile(timings, 50)
+    return {
+        "p50_ms": round(p50, 4),
+        "p95_ms": round(percentile(timings, 95), 4),
+        "chars_per_second": round(len(text) / (p50 / 1000)) if p50 else None,
+    }
+
+
+def run_case(keyword_count: int, length: int, adversarial: bool = False, repeat: int = 20) -> Dict[str, Any]:
+    keywords = build_keywords(keyword_count)
+    text = build_text(length, keywords, adversarial=adversarial)
+
+    started = time.perf_counter()
+    regex = regex_matcher(keywords)
+    regex_build = time.perf_counter() - started
+    started = time.perf_counter()
+    automaton = KeywordMatcher(keywords)
+    automaton_build = time.perf_counter() - started
+
+    regex_timing = time_matcher(regex, text, repeat)
+    automaton_timing = time_matcher(automaton.find_all, text, repeat)
+    return {
+        "keywords": keyword_count,
+        "text_chars": len(text),
+        "adversarial": adversarial,
+        "matches": len(automaton.find_all(text)),
+        "agree": regex(text) == automaton.find_all(text),
+        "regex": {**regex_timing, "build_ms": round(regex_build * 1000, 3)},
+        "automaton": {**automaton_timing, "build_ms": round(automaton_build * 1000, 3)},
+        "speedup": round(regex_timing["p50_ms"] / automaton_timing["p50_ms"], 2) if automaton_timing["p50_ms"] else None,
+    }
+
+
+def run_fuzzy_case(keyword_count: int, length: int, max_distance: int = 1, repeat: int = 20) -> Dict[str, Any]:
+    keywords = build_keywords(keyword_count)
+    text = with_misspelled_keywords(add_typos(build_text(length, keywords)))
+
+    exact = KeywordMatcher(keywords)
+    started = time.perf_counter()
+    fuzzy = FuzzyKeywordMatcher(keywords, max_distance)
+    fuzzy_build = time.perf_counter() - started
+    # The first call fills the per-word cache; time it separately
+    cold = time_matcher(FuzzyKeywordMatcher(keywords, max_distance).find_all, text, 1)
+    brute_force = time_matcher(brute_force_fuzzy(keywords, max_distance), text, max(1, repeat // 10))
+
+    return {
+        "mode": "fuzzy",
+        "keywords": keyword_count,
+        "text_chars": len(text),
+        "max_distance": max_distance,
+        "exact_matches": len(exact.find_all(text)),
+        "fuzzy_matches": len(fuzzy.find_all(text)),
+        "exact": time_matcher(exact.find_all, text, repeat),
+        "fuzzy": {**time_matcher(fuzzy.find_all, text, repeat), "cold_ms": cold["p50_ms"], "build_ms": round(fuzzy_build * 1000, 3)},
+        "brute_force": brute_force,
+    }
+
+
+def run_batch_case(text_count: int, workers: int, repeat: int = 3) -> Dict[str, Any]:
+    rng = random.Random(0)
+    corpus = [item["text"] for item in load_corpus()]
+    texts = [rng.choice(corpus) for _ in range(text_count)]
+    service = CrisisSafetyService(batch_workers=workers)
+    try:
+        # The first call starts the worker processes; keep it out of the timings
+        service.screen_batch(texts, workers=workers)
+        reports = [service.screen_batch(texts, workers=workers) for _ in range(repeat)]
+    finally:
+        service.close()
+    best = max(reports, key=lambda r: r["mb_per_second"] or 0)
+    return {
+        "mode": "batch",
+        "texts": text_count,
+        "workers": best["workers"],
+        "bytes": best["bytes"],
+        "crisis_count": best["crisis_count"],
+        "seconds": best["seconds"],
+        "mb_per_second": best["mb_per_second"],
+    }
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", default="30,300,3000", help="Comma-separated keyword-list sizes")
+    parser.add_argument("--lengths", default="500,5000,50000", help="Comma-separated text lengths in characters")
+    parser.add_argument("--fuzzy", action="store_true", help="Benchmark typo-tolerant matching instead")
+    parser.add_argument("--max-distance", type=int, default=1, help="Edit distance for --fuzzy")
+    parser.add_argument("--batch", action="store_true", help="Benchmark batch screening throughput instead")
+    parser.add_argument("--texts", type=int, default=5000, help="Texts per batch for --batch")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts for --batch")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    counts = [int(c) for c in args.keywords.split(",") if c.strip()]
+    lengths = [int(n) for n in args.lengths.split(",") if n.strip()]
+
+    cases = []
+    if args.batch:
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            case = run_batch_case(args.texts, workers, repeat=max(1, args.repeat // 5))
+            cases.append(case)
+            print(
+                f"texts={case['texts']:<6} workers={case['workers']:<3} bytes={case['bytes']:<9} "
+                f"seconds={case['seconds']:.3f} throughput={case['mb_per_second']}MB/s flagged={case['crisis_count']}"
+            )
+    elif args.fuzzy:
+        for count in counts:
+            for length in lengths:
+                case = run_fuzzy_case(count, length, args.max_distance, repeat=args.repeat)
+                cases.append(case)
+                print(
+                    f"keywords={case['keywords']:<6} chars={case['text_chars']:<7} "
+                    f"exact={case['exact']['p50_ms']:.3f}ms fuzzy={case['fuzzy']['p50_ms']:.3f}ms "
+                    f"(cold {case['fuzzy']['cold_ms']:.3f}ms) brute_force={case['brute_force']['p50_ms']:.3f}ms "
+                    f"matches={case['exact_matches']}->{case['fuzzy_matches']}"
+                )
+    for count in counts if not (args.fuzzy or args.batch) else []:
+        for length in lengths:
+            for adversarial in (False, True):
+                case = run_case(count, length, adversarial=adversarial, repeat=args.repeat)
+                cases.append(case)
+                print(
+                    f"keywords={case['keywords']:<6} chars={case['text_chars']:<7} "
+                    f"{'adversarial' if adversarial else 'corpus':<12} "
+                    f"regex={case['regex']['p50_ms']:.3f}ms automaton={case['automaton']['p50_ms']:.3f}ms "
+                    f"speedup={case['speedup']}x agree={case['agree']}"
+                )
+
+    if args.output:
+        result = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "config": {"keywords": counts, "lengths": lengths, "repeat": args.repeat, "fuzzy": args.fuzzy, "batch": args.batch},
+            "cases": cases,
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not all(case.get("agree", True) for case in cases):
+        print("Matchers disagree; see cases with agree=False", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
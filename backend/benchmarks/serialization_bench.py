@@ -0,0 +1,170 @@
+"""
+Response serialization benchmark.
+
+Times how long it takes to turn a handler's return value into response
+bytes for `/analyze` and `/journal-entries`:
+
+- "validated": what FastAPI does with a `response_model` (validate the
+  return value against the model, dump it to JSON-compatible Python, then
+  `json.dumps` it in `JSONResponse`);
+- "trusted": `app.serialization.TrustedJSONResponse` (project onto the
+  model's fields without validation, then orjson, or the stdlib when orjson
+  is not installed).
+
+Both must produce the same JSON; the run fails if they do not.
+
+Usage (from backend/):
+    python -m benchmarks.serialization_bench
+    python -m benchmarks.serialization_bench --rows 50,500 --repeat 200 --output results/serialization.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import TypeAdapter
+
+from app import serialization
+from app.interventions import INTERVENTIONS
+from app.models import AnalysisResponse, InterventionStats, JournalEntryResponse, PersonalLoopContext
+
+from .classifier_bench import percentile
+
+
+def journal_rows(count: int) -> List[Dict[str, Any]]:
+    """Rows shaped like `BehavioralStateManager.get_journal_entries` output."""
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "timestamp": "2026-10-01T12:00:00.000000000+00:00",
+            "raw_text": "I keep putting off the report and then feel worse about myself for not starting. " * 3,
+            "detected_state": "Procrastination",
+            "sublabel": "Avoidance",
+            "confidence": 0.87,
+            "reasoning": "Mentions delaying a task and the guilt that follows, a typical avoidance cycle.",
+            "risk_level": "Low",
+            "intervention_title": "Two-Minute Start",
+            "intervention_type": "behavioral",
+            "user_outcome": "helped" if i % 3 == 0 else None,
+            "user_notes": None,
+            "prompt_version": "v1-full",
+        }
+        for i in range(count)
+    ]
+
+
+def analysis_payload() -> Dict[str, Any]:
+    """A `response_data` dict as `analyze_behavior` builds it, with variants and nested models."""
+    variants = [
+        {**variant, "education": variant["education"]["introduce"] if isinstance(variant.get("education"), dict) else variant.get("education", "")}
+        for key, variant in INTERVENTIONS["Stress"].items()
+        if key is not None and isinstance(variant, dict) and "title" in variant
+    ]
+    return {
+        "detected_node": "Stress",
+        "sublabel": "Overload",
+        "emotion_sublabel": "Overload",
+        "confidence": 0.91,
+        "reasoning": "Deadlines and too many tasks at once.",
+        "reasoning_pending": False,
+        "risk_level": "High",
+        "loop_detected": True,
+        "intervention_title": "Physiological Sigh",
+        "intervention_task": "Two short inhales through the nose, one long exhale.",
+        "education_info": "Extending the exhale slows the heart rate.",
+        "education_depth": "introduce",
+        "intervention_type": "somatic",
+        "node_arc_position": 2,
+        "node_arc_label": "Node 2 of 8 — Stress",
+        "intervention_variants": variants,
+        "msc_steps": None,
+        "shame_safety_alert": None,
+        "movement_protocol": None,
+        "journal_entry_id": "00000000-0000-0000-0000-000000000001",
+        "personal_loop": PersonalLoopContext(most_common_entry="Stress", cycle_length_hours=4.5, where_in_cycle="stress_phase"),
+        "intervention_effectiveness": {
+            "Physiological Sigh": InterventionStats(helped=5, neutral=2, didn_help=1, total=8, percentage=62),
+        },
+    }
+
+
+def validated(annotation: Any) -> Callable[[Any], bytes]:
+    adapter = TypeAdapter(annotation)
+
+    def encode(content: Any) -> bytes:
+        value = adapter.dump_python(adapter.validate_python(content, from_attributes=True), mode="json")
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    return encode
+
+
+def trusted(annotation: Any) -> Callable[[Any], bytes]:
+    return lambda content: serialization.TrustedJSONResponse(content, annotation).body
+
+
+def time_encoder(encode: Callable[[Any], bytes], content: Any, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode(content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(percentile(timings, 50), 4), "p95_ms": round(percentile(timings, 95), 4)}
+
+
+def run_case(name: str, annotation: Any, content: Any, repeat: int) -> Dict[str, Any]:
+    before, after = validated(annotation), trusted(annotation)
+    body = after(content)
+    before_timing = time_encoder(before, content, repeat)
+    after_timing = time_encoder(after, content, repeat)
+    return {
+        "endpoint": name,
+        "bytes": len(body),
+        "agree": json.loads(before(content)) == json.loads(body),
+        "encoder": "orjson" if serialization.orjson is not None else "json",
+        "validated": before_timing,
+        "trusted": after_timing,
+        "speedup": round(before_timing["p50_ms"] / after_timing["p50_ms"], 2) if after_timing["p50_ms"] else None,
+    }
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="50,500", help="Comma-separated /journal-entries page sizes")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed runs per case")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    cases = [run_case("/analyze", AnalysisResponse, analysis_payload(), args.repeat)]
+    for rows in [int(n) for n in args.rows.split(",") if n.strip()]:
+        cases.append(run_case(f"/journal-entries?limit={rows}", List[JournalEntryResponse], journal_rows(rows), args.repeat))
+
+    for case in cases:
+        print(
+            f"{case['endpoint']:<28} bytes={case['bytes']:<7} validated={case['validated']['p50_ms']:.3f}ms "
+            f"trusted={case['trusted']['p50_ms']:.3f}ms ({case['encoder']}) speedup={case['speedup']}x agree={case['agree']}"
+        )
+
+    if args.output:
+        result = {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "config": {"rows": args.rows, "repeat": args.repeat},
+            "cases": cases,
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not all(case["agree"] for case in cases):
+        print("Serializers disagree; see cases with agree=False", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
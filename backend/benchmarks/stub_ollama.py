@@ -0,0 +1,230 @@
+"""
+Local stand-in for the Ollama HTTP API used by the benchmarks.
+
+Replays recorded model responses keyed by journal text, with timing derived
+from prompt and output length (prompt-eval and generation rates), a one-off
+model load delay, and a cap on how many generations run at once. Responses
+carry the same timing fields Ollama returns (durations in nanoseconds).
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_RESPONSE = json.dumps(
+    {"node": "Stress", "sublabel": "Overload", "confidence": 0.5, "reasoning": "no recording for this text"}
+)
+
+_ENTRY_RE = re.compile(r'Journal entry: "(.*)"\s*JSON response:', re.DOTALL)
+
+
+@dataclass
+class StubTiming:
+    prompt_tokens_per_second: float = 400.0
+    eval_tokens_per_second: float = 25.0
+    load_seconds: float = 2.0
+    jitter: float = 0.1  # +/- fraction applied to every duration
+    parallel: int = 1  # concurrent generations, like OLLAMA_NUM_PARALLEL
+    tail_tokens: int = 0  # whitespace tokens generated after the JSON object closes
+    time_scale: float = 1.0  # shrink all sleeps (e.g. 0.01 in tests)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def extract_entry_text(prompt: str) -> Optional[str]:
+    match = _ENTRY_RE.search(prompt)
+    return match.group(1) if match else None
+
+
+class StubOllamaServer:
+    """Threaded HTTP server implementing /api/generate and /api/tags."""
+
+    def __init__(
+        self,
+        recordings: Dict[str, str],
+        timing: Optional[StubTiming] = None,
+        model: str = "llama3.2:3b",
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.recordings = recordings
+        self.timing = timing or StubTiming()
+        self.model = model
+        self.requests_served = 0
+        self.tokens_generated = 0
+        self.streams_aborted = 0
+        self._loaded_models = set()
+        self._slots = threading.BoundedSemaphore(max(1, self.timing.parallel))
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubOllamaServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    # ----- simulated model -----
+
+    def _duration(self, seconds: float) -> float:
+        jitter = self.timing.jitter
+        return max(0.0, seconds * random.uniform(1 - jitter, 1 + jitter))
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds * self.timing.time_scale)
+
+    def response_for(self, body: Dict) -> str:
+        if body.get("options", {}).get("num_predict") == 1:
+            return "ok"
+        entry = extract_entry_text(body.get("prompt", ""))
+        # Models running with format=json often pad the object with whitespace
+        return self.recordings.get(entry, DEFAULT_RESPONSE) + "\n" * self.timing.tail_tokens
+
+    def _count(self, tokens: int, aborted: bool = False) -> None:
+        with self._lock:
+            self.requests_served += 1
+            self.tokens_generated += tokens
+            self.streams_aborted += int(aborted)
+
+    def _load_duration(self, model: str) -> float:
+        with self._lock:
+            if model in self._loaded_models:
+                return 0.0
+            self._loaded_models.add(model)
+        return self._duration(self.timing.load_seconds)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args) -> None:  # silence per-request stderr logging
+                pass
+
+            def _send_json(self, payload: Dict, status: int = 200) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                if self.path == "/api/tags":
+                    self._send_json({"models": [{"name": stub.model}]})
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    self._generate(body)
+                else:
+                    self._send_json({"error": "not found"}, status=404)
+
+            def _write_chunk(self, payload: Dict) -> None:
+                data = json.dumps(payload).encode() + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _generate(self, body: Dict) -> None:
+                model = body.get("model", stub.model)
+                response_text = stub.response_for(body)
+                prompt_tokens = estimate_tokens(body.get("prompt", ""))
+                # Ollama streams by default
+                if body.get("stream", True):
+                    self._generate_stream(model, response_text, prompt_tokens)
+                    return
+
+                eval_tokens = estimate_tokens(response_text)
+                with stub._slots:
+                    load = stub._load_duration(model)
+                    prompt_eval = stub._duration(prompt_tokens / stub.timing.prompt_tokens_per_second)
+                    eval_time = stub._duration(eval_tokens / stub.timing.eval_tokens_per_second)
+                    stub._sleep(load + prompt_eval + eval_time)
+                stub._count(eval_tokens)
+
+                self._send_json(
+                    {
+                        "model": model,
+                        "response": response_text,
+                        "done": True,
+                        "total_duration": int((load + prompt_eval + eval_time) * 1e9),
+                        "load_duration": int(load * 1e9),
+                        "prompt_eval_count": prompt_tokens,
+                        "prompt_eval_duration": int(prompt_eval * 1e9),
+                        "eval_count": eval_tokens,
+                        "eval_duration": int(eval_time * 1e9),
+                    }
+                )
+
+            def _generate_stream(self, model: str, response_text: str, prompt_tokens: int) -> None:
+                """Streams ~4-character tokens as NDJSON; stops generating if the client disconnects."""
+                tokens = [response_text[i : i + 4] for i in range(0, len(response_text), 4)] or [""]
+                generated = 0
+                with stub._slots:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+
+                    load = stub._load_duration(model)
+                    prompt_eval = stub._duration(prompt_tokens / stub.timing.prompt_tokens_per_second)
+                    stub._sleep(load + prompt_eval)
+                    eval_time = 0.0
+                    try:
+                        for token in tokens:
+                            step = stub._duration(1 / stub.timing.eval_tokens_per_second)
+                            stub._sleep(step)
+                            eval_time += step
+                            self._write_chunk({"model": model, "response": token, "done": False})
+                            generated += 1
+                        self._write_chunk(
+                            {
+                                "model": model,
+                                "response": "",
+                                "done": True,
+                                "total_duration": int((load + prompt_eval + eval_time) * 1e9),
+                                "load_duration": int(load * 1e9),
+                                "prompt_eval_count": prompt_tokens,
+                                "prompt_eval_duration": int(prompt_eval * 1e9),
+                                "eval_count": generated,
+                                "eval_duration": int(eval_time * 1e9),
+                            }
+                        )
+                        self.wfile.write(b"0\r\n\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        self.close_connection = True
+                        stub._count(generated, aborted=True)
+                        return
+                stub._count(generated)
+
+        return Handler
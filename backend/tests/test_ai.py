@@ -262,3 +262,60 @@ def test_query_local_ai_uses_custom_ollama_url():
             assert custom_url in str(call_args)
 
     assert result["detected_node"] == "Anxiety"
+
+
+def test_extract_timing_converts_nanoseconds_and_rates():
+    from app.ai import extract_timing
+
+    timing = extract_timing(
+        {
+            "prompt_eval_count": 400,
+            "prompt_eval_duration": 1_000_000_000,
+            "eval_count": 30,
+            "eval_duration": 1_500_000_000,
+            "load_duration": 2_500_000_000,
+        }
+    )
+
+    assert timing == {
+        "prompt_tokens": 400,
+        "prompt_tokens_per_second": 400.0,
+        "prompt_eval_seconds": 1.0,
+        "generated_tokens": 30,
+        "tokens_per_second": 20.0,
+        "eval_seconds": 1.5,
+        "load_seconds": 2.5,
+    }
+    # Early-stopped streams carry no timing fields
+    assert extract_timing({"response": "{}", "early_stop": True}) == {}
+
+
+def test_query_local_ai_exports_timing_histograms_and_log_context(monkeypatch, caplog):
+    from app.ai import AI_MODEL_LOAD_SECONDS, AI_PROMPT_TOKENS, AI_TOKENS_PER_SECOND
+
+    monkeypatch.setenv("OLLAMA_MODEL", "timing-test:1b")
+    fake_response = FakeResponse(
+        {
+            "response": '{"node": "Anxiety", "sublabel": "Dread", "confidence": 0.9, "reasoning": "sample"}',
+            "prompt_eval_count": 600,
+            "prompt_eval_duration": 2_000_000_000,
+            "eval_count": 25,
+            "eval_duration": 1_000_000_000,
+            "load_duration": 3_000_000_000,
+        }
+    )
+
+    with caplog.at_level("INFO", logger="app.ai"):
+        with patch("app.ai.httpx.AsyncClient", return_value=FakeClient(fake_response)):
+            asyncio.run(query_local_ai("Anxious test", request_id="req-1"))
+
+    assert AI_PROMPT_TOKENS.count(model="timing-test:1b") == 1
+    assert AI_TOKENS_PER_SECOND.count(model="timing-test:1b", phase="generation") == 1
+    assert AI_TOKENS_PER_SECOND.count(model="timing-test:1b", phase="prompt") == 1
+    assert AI_MODEL_LOAD_SECONDS.count(model="timing-test:1b") == 1
+
+    record = next(r for r in caplog.records if getattr(r, "event", None) == "ai_response")
+    assert record.request_id == "req-1"
+    assert record.tokens_per_second == 25.0
+    assert record.prompt_tokens == 600
+    assert record.load_seconds == 3.0
@@ -0,0 +1,137 @@
+"""Tests for the concurrent stages of /analyze."""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+
+
+class _FakeDB:
+    """Records call order; `delay` stands in for a Neo4j round trip."""
+
+    is_available = True
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls = []
+        self.loop_path_started = threading.Event()
+        self.effectiveness_started = threading.Event()
+        self.overlapped = {}
+
+    def _call(self, name: str) -> None:
+        self.calls.append(name)
+        time.sleep(self.delay)
+
+    def analyze_loop_path(self, days: int = 30) -> Dict[str, Any]:
+        self.loop_path_started.set()
+        self._call("analyze_loop_path")
+        return {"most_common_entry": "Shame", "cycle_length_hours": 5.0}
+
+    def log_and_analyze(self, node_name, confidence, title, task, sublabel="unspecified"):
+        self.overlapped["log_and_analyze"] = self.effectiveness_started.wait(5)
+        self._call("log_and_analyze")
+        return "High", True
+
+    def get_intervention_effectiveness(self, state, sublabel=None):
+        self.effectiveness_started.set()
+        self._call("get_intervention_effectiveness")
+        return {}
+
+    def increment_intervention_seen_count(self, title: str) -> None:
+        self._call("increment_intervention_seen_count")
+
+    def get_shame_count_24h(self) -> int:
+        self._call("get_shame_count_24h")
+        return 3 if "log_and_analyze" in self.calls else 0
+
+    def save_journal_entry(self, risk_level: str, **kwargs) -> bool:
+        self._call("save_journal_entry")
+        self.saved_risk = risk_level
+        return True
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = _FakeDB()
+    monkeypatch.setattr(app_main, "FEATURE_CRISIS_SAFETY", False)
+    monkeypatch.setattr(app_main, "FEATURE_SHAME_PROTOCOL", True)
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    yield db
+    app_main.app.dependency_overrides.clear()
+
+
+def _classify_as(monkeypatch, node: str, before=None, seconds: float = 0.0) -> None:
+    async def fake_query_local_ai(text: str, request_id: str = "") -> Dict[str, Any]:
+        if before is not None:
+            await before()
+        await asyncio.sleep(seconds)
+        return {"detected_node": node, "emotion_sublabel": "General", "confidence": 0.9, "reasoning": "test"}
+
+    monkeypatch.setattr(app_main, "query_local_ai", fake_query_local_ai)
+
+
+def test_loop_path_runs_while_the_llm_classifies(fake_db, monkeypatch):
+    seen_during_llm = []
+
+    async def wait_for_loop_path():
+        seen_during_llm.append(await asyncio.to_thread(fake_db.loop_path_started.wait, 5))
+
+    _classify_as(monkeypatch, "Shame", before=wait_for_loop_path)
+
+    body = TestClient(app_main.app).post("/analyze", json={"user_text": "I feel ashamed"}).json()
+
+    assert seen_during_llm == [True]
+    assert body["personal_loop"]["most_common_entry"] == "Shame"
+
+
+def test_dependent_stages_wait_for_log_and_analyze(fake_db, monkeypatch):
+    _classify_as(monkeypatch, "Shame")
+
+    body = TestClient(app_main.app).post("/analyze", json={"user_text": "I feel ashamed"}).json()
+
+    # Effectiveness was read while log_and_analyze ran
+    assert fake_db.overlapped["log_and_analyze"] is True
+    logged = fake_db.calls.index("log_and_analyze")
+    assert fake_db.calls.index("save_journal_entry") > logged
+    assert fake_db.calls.index("get_shame_count_24h") > logged
+    # The Intervention node the seen count updates is created by log_and_analyze
+    assert fake_db.calls.index("increment_intervention_seen_count") > logged
+    assert fake_db.saved_risk == "High"
+    assert body["shame_safety_alert"] is True
+    assert body["risk_level"] == "High"
+
+
+def test_latency_is_llm_plus_two_round_trips(fake_db, monkeypatch):
+    fake_db.delay = 0.1
+    fake_db.effectiveness_started.set()
+    _classify_as(monkeypatch, "Shame", seconds=0.2)
+
+    started = time.perf_counter()
+    response = TestClient(app_main.app).post("/analyze", json={"user_text": "I feel ashamed"})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert len(fake_db.calls) == 6
+    # Sequentially: 0.2s LLM + 6 x 0.1s DB calls = 0.8s
+    assert elapsed < 0.6
+
+
+def test_failed_stage_degrades_without_failing_the_request(fake_db, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("neo4j down")
+
+    fake_db.effectiveness_started.set()
+    monkeypatch.setattr(fake_db, "analyze_loop_path", broken)
+    monkeypatch.setattr(fake_db, "get_shame_count_24h", broken)
+    _classify_as(monkeypatch, "Shame")
+
+    response = TestClient(app_main.app).post("/analyze", json={"user_text": "I feel ashamed"})
+
+    assert response.status_code == 200
+    assert response.json()["personal_loop"] is None
+    assert response.json()["shame_safety_alert"] is False
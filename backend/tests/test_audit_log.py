@@ -0,0 +1,192 @@
+import asyncio
+import os
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import audit_log as audit_module
+from app import main as app_main
+from app.audit_log import AuditReplicator, DurableAuditLog
+from app.crisis import CrisisSafetyService
+
+
+def _record(n, kind="crisis_event"):
+    if kind == "crisis_event":
+        payload = {"user_id": None, "keywords": ["suicide"], "event_id": f"e{n}"}
+    else:
+        payload = {"entry_id": f"j{n}", "raw_text": "text", "crisis_audit_id": f"e{n}"}
+    return {"id": f"{kind}:{n}", "kind": kind, "payload": payload}
+
+
+class _FlakyDB:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.crisis_events = {}
+        self.journal_entries = {}
+        self.calls = []
+
+    def log_crisis_event(self, user_id=None, keywords=None, detected_state=None, ip_address=None,
+                         lexicon_version=None, event_id=None, timestamp=None):
+        self.calls.append(("crisis_event", event_id))
+        if self.failures:
+            self.failures -= 1
+            return None
+        # MERGE semantics: replaying an event keeps the first copy
+        self.crisis_events.setdefault(event_id, {"keywords": keywords, "timestamp": timestamp})
+        return event_id
+
+    def save_journal_entry(self, entry_id, raw_text, crisis_audit_id=None, timestamp=None, **fields):
+        self.calls.append(("journal_entry", entry_id))
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.journal_entries.setdefault(entry_id, {"crisis_audit_id": crisis_audit_id, "timestamp": timestamp})
+        return True
+
+
+def test_append_fsyncs_and_survives_restart(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(audit_module.os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    path = str(tmp_path / "audit" / "crisis.log")
+
+    log = DurableAuditLog(path)
+    log.append([_record(1), _record(1, "journal_entry")])
+    assert len(synced) == 1
+
+    # A crash mid-write leaves a partial line behind
+    with open(path, "a") as f:
+        f.write('{"id": "crisis_event:2", "ki')
+
+    reopened = DurableAuditLog(path)
+    assert [r["id"] for r in reopened.pending()] == ["crisis_event:1", "journal_entry:1"]
+
+
+def test_lines_without_an_id_are_skipped(tmp_path):
+    path = str(tmp_path / "crisis.log")
+    DurableAuditLog(path).append([_record(1)])
+    with open(path, "a") as f:
+        f.write('{"kind": "crisis_event"}\n[1, 2]\n')
+
+    assert [r["id"] for r in DurableAuditLog(path).pending()] == ["crisis_event:1"]
+
+
+def test_replication_marks_records_off_the_event_loop(tmp_path, monkeypatch):
+    log = DurableAuditLog(str(tmp_path / "crisis.log"))
+    log.append([_record(1)])
+    loop_thread = []
+    marked_on = []
+    real_mark = log.mark_replicated
+
+    def mark(record_id):
+        marked_on.append(threading.get_ident())
+        real_mark(record_id)
+
+    monkeypatch.setattr(log, "mark_replicated", mark)
+
+    async def replicate():
+        loop_thread.append(threading.get_ident())
+        return await AuditReplicator(log).replicate(_FlakyDB())
+
+    assert asyncio.run(replicate()) is True
+    assert marked_on and marked_on[0] != loop_thread[0]
+
+
+def test_replicated_records_are_not_replayed_after_restart(tmp_path):
+    path = str(tmp_path / "crisis.log")
+    log = DurableAuditLog(path)
+    log.append([_record(1), _record(2)])
+    log.mark_replicated("crisis_event:1")
+
+    assert [r["id"] for r in DurableAuditLog(path).pending()] == ["crisis_event:2"]
+
+    log.mark_replicated("crisis_event:2")
+    # Fully replicated logs are truncated
+    assert os.path.getsize(path) == 0
+    assert DurableAuditLog(path).pending() == []
+
+
+def test_replication_retries_in_order_until_neo4j_recovers(tmp_path):
+    log = DurableAuditLog(str(tmp_path / "crisis.log"))
+    log.append([_record(1), _record(1, "journal_entry")])
+    db = _FlakyDB(failures=2)
+    replicator = AuditReplicator(log)
+
+    assert asyncio.run(replicator.replicate(db)) is False
+    assert asyncio.run(replicator.replicate(db)) is False
+    assert asyncio.run(replicator.replicate(db)) is True
+
+    # The journal entry was never attempted before its crisis event landed
+    assert db.calls == [("crisis_event", "e1"), ("crisis_event", "e1"), ("crisis_event", "e1"), ("journal_entry", "j1")]
+    assert log.pending() == []
+
+
+def test_background_loop_backs_off_then_drains(tmp_path):
+    log = DurableAuditLog(str(tmp_path / "crisis.log"))
+    log.append([_record(1)])
+    db = _FlakyDB(failures=3)
+    replicator = AuditReplicator(log, base_delay=0.001, max_delay=0.004)
+    replicator.db = db
+
+    async def run():
+        replicator.start()
+        for _ in range(200):
+            if not log.pending():
+                break
+            await asyncio.sleep(0.005)
+        await replicator.stop()
+
+    asyncio.run(run())
+
+    assert log.pending() == []
+    assert db.crisis_events == {"e1": {"keywords": ["suicide"], "timestamp": None}}
+    assert replicator.delay == 0.001
+
+
+def test_crisis_response_does_not_wait_for_neo4j(tmp_path, monkeypatch):
+    log = DurableAuditLog(str(tmp_path / "crisis.log"))
+    monkeypatch.setattr(app_main, "crisis_audit_log", log)
+    monkeypatch.setattr(app_main, "audit_replicator", AuditReplicator(log))
+    monkeypatch.setattr(app_main, "FEATURE_CRISIS_SAFETY", True)
+    app_main.app.state.crisis_service = CrisisSafetyService()
+    down = _FlakyDB(failures=100)
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: down
+    try:
+        response = TestClient(app_main.app).post("/analyze", json={"user_text": "I'm thinking about suicide"})
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["crisis_detected"] is True
+    # Neo4j was down: the records wait in the local log instead of being lost
+    pending = log.pending()
+    assert [r["kind"] for r in pending] == ["crisis_event", "journal_entry"]
+    event_id = pending[0]["payload"]["event_id"]
+    assert pending[1]["payload"]["crisis_audit_id"] == event_id
+    assert pending[1]["payload"]["entry_id"] == body["journal_entry_id"]
+
+    up = _FlakyDB()
+    assert asyncio.run(AuditReplicator(log).replicate(up)) is True
+    assert up.journal_entries[body["journal_entry_id"]]["crisis_audit_id"] == event_id
+    assert up.crisis_events[event_id]["timestamp"] == pending[0]["payload"]["timestamp"]
+
+
+def test_unwritable_log_falls_back_to_direct_writes(tmp_path, monkeypatch):
+    log = DurableAuditLog(str(tmp_path / "crisis.log"))
+
+    def broken_append(records):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(log, "append", broken_append)
+    monkeypatch.setattr(app_main, "crisis_audit_log", log)
+    monkeypatch.setattr(app_main, "FEATURE_CRISIS_SAFETY", True)
+    app_main.app.state.crisis_service = CrisisSafetyService()
+    db = _FlakyDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    try:
+        body = TestClient(app_main.app).post("/analyze", json={"user_text": "I'm thinking about suicide"}).json()
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    assert db.journal_entries[body["journal_entry_id"]]["crisis_audit_id"] in db.crisis_events
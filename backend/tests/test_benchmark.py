@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from benchmarks.classifier_bench import (
+    compare_results,
+    confusion_matrix,
+    load_corpus,
+    main,
+    per_node_stats,
+    percentile,
+    run_benchmark,
+)
+from benchmarks.stub_ollama import StubOllamaServer, StubTiming
+
+
+def test_percentile_interpolates():
+    values = [10, 20, 30, 40, 50]
+    assert percentile(values, 50) == 30
+    assert percentile(values, 0) == 10
+    assert percentile(values, 100) == 50
+    assert percentile(values, 95) == pytest.approx(48.0)
+    assert percentile([], 50) == 0.0
+
+
+def test_confusion_matrix_and_per_node_stats():
+    pairs = [("Stress", "Stress"), ("Stress", "Anxiety"), ("Anxiety", "Anxiety")]
+
+    assert confusion_matrix(pairs) == {"Stress": {"Stress": 1, "Anxiety": 1}, "Anxiety": {"Anxiety": 1}}
+    stats = per_node_stats(pairs)
+    assert stats["Anxiety"] == {"tp": 1, "fp": 1, "fn": 0, "tn": 1, "precision": 0.5, "recall": 1.0, "support": 1}
+    assert stats["Stress"]["recall"] == 0.5
+
+
+def test_bundled_corpus_is_labelled():
+    corpus = load_corpus()
+    assert len(corpus) >= 20
+    assert all({"text", "node", "recorded_response"} <= set(item) for item in corpus)
+
+
+def test_stub_server_replays_recorded_response_with_timing_fields():
+    recordings = {"I feel stuck": '{"node": "Procrastination"}'}
+    with StubOllamaServer(recordings, StubTiming(time_scale=0.0)) as stub:
+        response = httpx.post(
+            f"{stub.url}/api/generate",
+            json={"model": "m", "prompt": 'Journal entry: "I feel stuck"\n\nJSON response:', "stream": False},
+        )
+        body = response.json()
+        second = httpx.post(f"{stub.url}/api/generate", json={"model": "m", "prompt": "x", "stream": False}).json()
+
+    assert body["response"] == '{"node": "Procrastination"}'
+    assert body["prompt_eval_count"] > 0
+    assert body["eval_count"] > 0
+    assert body["load_duration"] > 0  # first request loads the model
+    assert second["load_duration"] == 0
+
+
+def test_run_benchmark_against_stub(monkeypatch):
+    corpus = load_corpus()
+    recordings = {item["text"]: item["recorded_response"] for item in corpus}
+
+    with StubOllamaServer(recordings, StubTiming(time_scale=0.0, parallel=4)) as stub:
+        monkeypatch.setenv("OLLAMA_URL", stub.url)
+        result = asyncio.run(run_benchmark(corpus, concurrency=4))
+
+    assert result["requests"] == len(corpus)
+    assert 0 < result["accuracy"] < 1
+    assert result["fallback_rate"] == pytest.approx(1 / len(corpus), abs=1e-4)
+    assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+    assert sum(sum(row.values()) for row in result["confusion_matrix"].values()) == len(corpus)
+
+
+def test_cli_writes_json_and_compares(tmp_path, capsys):
+    output = tmp_path / "run.json"
+    assert main(["--stub", "--stub-time-scale", "0", "--concurrency", "1,2", "--output", str(output)]) == 0
+
+    saved = json.loads(output.read_text())
+    assert [r["concurrency"] for r in saved["runs"]] == [1, 2]
+    assert saved["config"]["ollama_url"] == "stub"
+
+    assert any("p95" in line for line in compare_results(saved, saved))
+
+
+def test_crisis_bench_matchers_agree(tmp_path):
+    from benchmarks.crisis_bench import main as crisis_main
+    from benchmarks.crisis_bench import run_case
+
+    case = run_case(200, 2000, adversarial=True, repeat=2)
+    assert case["agree"] is True
+    assert case["keywords"] == 200
+    assert case["text_chars"] == 2000
+
+    output = tmp_path / "crisis.json"
+    assert crisis_main(["--keywords", "30", "--lengths", "300", "--repeat", "1", "--output", str(output)]) == 0
+    assert len(json.loads(output.read_text())["cases"]) == 2
+
+
+def test_crisis_bench_fuzzy_case_finds_injected_typos():
+    from benchmarks.crisis_bench import run_fuzzy_case
+
+    case = run_fuzzy_case(30, 1000, repeat=1)
+
+    assert case["text_chars"] == 1000
+    assert case["fuzzy_matches"] > case["exact_matches"]
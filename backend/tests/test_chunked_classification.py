@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from app import ai, inference
+from app.ai import DEFAULT_SUBLABEL, UNAVAILABLE_REASONING, combine_chunk_predictions, query_local_ai
+from app.preprocess import split_into_chunks
+
+
+def prediction(node, sublabel, confidence, reasoning="r"):
+    return {"detected_node": node, "emotion_sublabel": sublabel, "confidence": confidence, "reasoning": reasoning}
+
+
+def test_split_into_chunks_is_sentence_aligned_and_bounded():
+    text = " ".join(f"Sentence number {i} is here." for i in range(40))
+    chunks = split_into_chunks(text, target_tokens=20, max_chunks=4)
+
+    assert len(chunks) <= 4
+    assert all(c.endswith(".") for c in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_split_into_chunks_uses_target_for_short_text():
+    text = "One. Two. Three."
+    assert split_into_chunks(text, target_tokens=200, max_chunks=4) == [text]
+
+
+def test_vote_weights_confidence_and_size():
+    result = combine_chunk_predictions(
+        [
+            prediction("Stress", "Overload", 0.9),
+            prediction("Anxiety", "Worry", 0.9),
+            prediction("Stress", "Overload", 0.8),
+        ],
+        [100, 100, 100],
+    )
+
+    assert result["detected_node"] == "Stress"
+    assert result["emotion_sublabel"] == "Overload"
+    # Mean winning confidence (0.85) scaled by (1 + agreement) / 2, agreement = 1.7 / 2.6
+    assert result["confidence"] == pytest.approx(0.85 * (1 + 1.7 / 2.6) / 2, abs=1e-4)
+    assert "2/3 sections agree" in result["reasoning"]
+
+
+def test_vote_ignores_fallback_chunks():
+    result = combine_chunk_predictions(
+        [prediction("Stress", DEFAULT_SUBLABEL, 0.5, UNAVAILABLE_REASONING), prediction("Shame", "Guilt", 0.9)],
+        [100, 100],
+    )
+
+    assert result["detected_node"] == "Shame"
+    assert result["emotion_sublabel"] == "Guilt"
+    assert result["confidence"] == pytest.approx(0.9)
+
+
+def test_vote_all_fallback_returns_fallback():
+    fallback = prediction("Stress", DEFAULT_SUBLABEL, 0.5, UNAVAILABLE_REASONING)
+    assert combine_chunk_predictions([fallback, dict(fallback)], [10, 10]) is fallback
+
+
+def test_split_vote_resets_sublabel_when_confidence_drops():
+    result = combine_chunk_predictions(
+        [prediction("Stress", "Overload", 0.7), prediction("Anxiety", "Worry", 0.68)],
+        [100, 100],
+    )
+
+    assert result["detected_node"] == "Stress"
+    assert result["confidence"] < 0.6
+    assert result["emotion_sublabel"] == DEFAULT_SUBLABEL
+
+
+def test_query_local_ai_classifies_chunks_concurrently(monkeypatch):
+    monkeypatch.setenv("AI_CHUNKED_CLASSIFICATION", "true")
+    monkeypatch.setenv("AI_CHUNK_MIN_CHARS", "100")
+    monkeypatch.setenv("AI_CHUNK_TARGET_TOKENS", "30")
+    monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "4")
+
+    in_flight = 0
+    peak = 0
+    seen = []
+    trimmed = []
+
+    async def fake_single(text, request_id="", include_reasoning=True, model=None, record_metrics=True, trim_input=True):
+        nonlocal in_flight, peak
+        trimmed.append(trim_input)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        seen.append(text)
+        return prediction("Overwhelm", "Scattered", 0.8)
+
+    monkeypatch.setattr(ai, "_query_single", fake_single)
+    text = " ".join(f"I have task {i} and too much to do today." for i in range(20))
+
+    result = asyncio.run(query_local_ai(text, request_id="req"))
+
+    assert len(seen) == 4
+    assert peak == 4
+    # Chunks are already sized by the chunker; trimming them would drop sentences
+    assert trimmed == [False] * 4
+    assert result["detected_node"] == "Overwhelm"
+    assert result["emotion_sublabel"] == "Scattered"
+
+
+def test_short_entries_skip_chunking(monkeypatch):
+    monkeypatch.setenv("AI_CHUNKED_CLASSIFICATION", "true")
+    calls = []
+
+    async def fake_single(text, request_id="", include_reasoning=True, model=None, record_metrics=True):
+        calls.append(text)
+        return prediction("Stress", "Overload", 0.9)
+
+    monkeypatch.setattr(ai, "_query_single", fake_single)
+    asyncio.run(query_local_ai("Short entry about deadlines."))
+
+    assert calls == ["Short entry about deadlines."]
+
+
+def test_chunks_are_classified_untrimmed(monkeypatch):
+    monkeypatch.setenv("AI_INPUT_TOKEN_BUDGET", "10")
+    prompts = []
+
+    class FakeBackend:
+        name = "fake"
+
+        def default_model(self):
+            return "fake:1b"
+
+        async def classify(self, prompt, model, **kwargs):
+            prompts.append(prompt)
+            return {"response": '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "r"}'}
+
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", FakeBackend())
+    chunk = "I have so many deadlines this week. My manager keeps adding more work. I cannot keep up."
+
+    asyncio.run(ai._query_single(chunk, trim_input=False))
+    asyncio.run(ai._query_single(chunk))
+
+    assert chunk in prompts[0]
+    assert chunk not in prompts[1]
@@ -0,0 +1,111 @@
+"""Tests for ETag / If-None-Match on the dashboard read endpoints."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.db import BehavioralStateManager
+
+
+class _CountingDB:
+    """Fake DB with a data version that counts how often each read reaches 'Neo4j'."""
+
+    is_available = True
+
+    def __init__(self) -> None:
+        self.data_version = "epoch-0"
+        self.reads = {}
+
+    def _read(self, name, value):
+        self.reads[name] = self.reads.get(name, 0) + 1
+        return value
+
+    def get_history(self):
+        return self._read("history", [{"state": "Stress"}])
+
+    def get_trend_stats(self):
+        return self._read("stats", {"Stress": 3})
+
+    def get_ai_insight(self):
+        return self._read("insight", None)
+
+    def get_journal_entries(self, limit=50):
+        return self._read("journal", [])
+
+
+@pytest.fixture
+def client_and_db():
+    db = _CountingDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    yield TestClient(app_main.app), db
+    app_main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "path,read",
+    [("/history", "history"), ("/stats", "stats"), ("/insight", "insight"), ("/journal-entries?limit=500", "journal")],
+)
+def test_unchanged_data_is_answered_with_304(client_and_db, path, read):
+    client, db = client_and_db
+
+    first = client.get(path)
+    etag = first.headers["etag"]
+    second = client.get(path, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert etag == 'W/"epoch-0"'
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert db.reads[read] == 1
+
+    db.data_version = "epoch-1"
+    third = client.get(path, headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["etag"] == 'W/"epoch-1"'
+    assert db.reads[read] == 2
+
+
+def test_no_etag_while_db_is_unavailable(client_and_db):
+    client, db = client_and_db
+    db.is_available = False
+
+    response = client.get("/stats", headers={"If-None-Match": 'W/"epoch-0"'})
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+@pytest.fixture
+def manager():
+    with patch("app.db.GraphDatabase.driver", return_value=MagicMock()):
+        yield BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+
+def test_writes_change_the_data_version(manager):
+    before = manager.data_version
+
+    manager.record_journal_outcome("e1", "helped")
+    after_write = manager.data_version
+    manager.get_trend_stats()
+
+    assert after_write != before
+    assert manager.data_version == after_write
+
+
+def test_failed_reads_change_the_data_version(manager):
+    manager.driver.session.side_effect = RuntimeError("neo4j down")
+    before = manager.data_version
+
+    assert manager.get_history() == []
+    assert manager.data_version != before
+
+
+def test_data_version_differs_across_restarts():
+    with patch("app.db.GraphDatabase.driver", return_value=MagicMock()):
+        first = BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+        second = BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+    assert first.data_version != second.data_version
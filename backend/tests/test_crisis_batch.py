@@ -0,0 +1,141 @@
+"""Tests for batch crisis screening (CrisisSafetyService.screen_batch and its admin endpoint)."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.audit_log import AuditReplicator, DurableAuditLog
+from app.crisis import BATCH_MIN_CHUNK, CrisisSafetyService, _screen_chunk_in_worker
+
+TEXTS = [
+    "I had a good day at work today",
+    "I want to end my life, nothing helps",
+    "short",
+    "Feeling hopeless and thinking about suicide again",
+]
+
+
+class _RecordingDB:
+    def __init__(self) -> None:
+        self.crisis_events = []
+
+    def log_crisis_event(self, **event):
+        self.crisis_events.append(event)
+        return event["event_id"]
+
+
+@pytest.fixture
+def service():
+    service = CrisisSafetyService(batch_workers=2)
+    yield service
+    service.close()
+
+
+def test_screen_batch_matches_detect_crisis(service):
+    report = service.screen_batch(TEXTS, workers=1)
+
+    assert report["results"] == [
+        {"index": i, "is_crisis": detected, "keywords": keywords}
+        for i, (detected, keywords) in enumerate(service.detect_crisis(t) for t in TEXTS)
+    ]
+    assert report["crisis_count"] == 2
+    assert report["lexicon_version"] == service.lexicon_version
+    assert report["bytes"] == sum(len(t.encode("utf-8")) for t in TEXTS)
+    assert report["mb_per_second"] is None or report["mb_per_second"] > 0
+
+
+def test_small_batches_stay_in_process(service):
+    report = service.screen_batch(TEXTS, workers=8)
+
+    assert report["workers"] == 1
+    assert service._pool is None
+
+
+def test_worker_pool_gives_the_same_results(service):
+    texts = TEXTS * BATCH_MIN_CHUNK
+
+    pooled = service.screen_batch(texts, workers=2)
+    inline = service.screen_batch(texts, workers=1)
+
+    assert pooled["workers"] == 2
+    assert pooled["results"] == inline["results"]
+    assert pooled["crisis_count"] == 2 * BATCH_MIN_CHUNK
+
+
+def test_worker_pool_is_rebuilt_after_a_lexicon_swap(service):
+    texts = TEXTS * BATCH_MIN_CHUNK
+    service.screen_batch(texts, workers=2)
+    first_pool = service._pool
+
+    service.swap_lexicon(CrisisSafetyService(keywords=["good day"]).lexicon)
+    report = service.screen_batch(texts, workers=2)
+
+    assert service._pool is not first_pool
+    assert report["results"][0]["keywords"] == ["good day"]
+    assert report["crisis_count"] == BATCH_MIN_CHUNK
+
+
+def test_batches_of_any_size_share_one_pool(service):
+    service.screen_batch(TEXTS * BATCH_MIN_CHUNK, workers=2)
+    pool = service._pool
+
+    assert service.screen_batch(TEXTS * (BATCH_MIN_CHUNK // 2), workers=2)["workers"] == 2
+    assert service.screen_batch(TEXTS * BATCH_MIN_CHUNK * 2)["workers"] == 2
+    assert service.screen_batch(TEXTS * BATCH_MIN_CHUNK, workers=8)["workers"] == 2
+    assert service._pool is pool
+
+
+def test_lexicon_swap_lets_a_running_batch_finish(service):
+    in_flight = service._batch_pool(service.lexicon).submit(_screen_chunk_in_worker, TEXTS)
+
+    service.swap_lexicon(CrisisSafetyService(keywords=["good day"]).lexicon)
+    service._batch_pool(service.lexicon)
+
+    assert [hit for hit, _ in in_flight.result(timeout=60)] == [False, True, False, True]
+
+
+def test_endpoint_requires_admin(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    response = TestClient(app_main.app).post("/admin/crisis-screen-batch", json={"texts": TEXTS})
+    assert response.status_code == 403
+
+
+def test_endpoint_screens_without_writing(monkeypatch, service):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    app_main.app.state.crisis_service = service
+    db = _RecordingDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    try:
+        client = TestClient(app_main.app)
+        response = client.post("/admin/crisis-screen-batch", json={"texts": TEXTS}, headers={"X-Admin-Token": "secret"})
+        empty = client.post("/admin/crisis-screen-batch", json={"texts": []}, headers={"X-Admin-Token": "secret"})
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [r["is_crisis"] for r in response.json()["results"]] == [False, True, False, True]
+    assert db.crisis_events == []
+    assert empty.status_code == 422
+
+
+def test_endpoint_logs_events_when_asked(monkeypatch, service, tmp_path):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    app_main.app.state.crisis_service = service
+    log = DurableAuditLog(str(tmp_path / "audit.jsonl"))
+    monkeypatch.setattr(app_main, "crisis_audit_log", log)
+    monkeypatch.setattr(app_main, "audit_replicator", AuditReplicator(log))
+    db = _RecordingDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    try:
+        response = TestClient(app_main.app).post(
+            "/admin/crisis-screen-batch",
+            json={"texts": TEXTS, "log_events": True},
+            headers={"X-Admin-Token": "secret"},
+        )
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert [e["keywords"] for e in db.crisis_events] == [r["keywords"] for r in response.json()["results"] if r["is_crisis"]]
+    assert all(e["ip_address"] == "batch" for e in db.crisis_events)
+    assert log.pending() == []
@@ -0,0 +1,246 @@
+"""Tests for the crisis review queue, crisis event schema and bucketed crisis counts."""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.db import CRISIS_MIGRATION_VERSION, CRISIS_SCHEMA, BehavioralStateManager, _decode_cursor, _encode_cursor
+
+
+class FakeRecord:
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def data(self):
+        return dict(self._data)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __iter__(self):
+        return iter(FakeRecord(row) for row in self._rows)
+
+    def single(self):
+        return FakeRecord(self._rows[0]) if self._rows else None
+
+    def consume(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def run(self, query, parameters=None, **params):
+        params = {**(parameters or {}), **params}
+        self.driver.queries.append((query, params))
+        return FakeResult(self.driver.rows.pop(0) if self.driver.rows else [])
+
+
+class FakeDriver:
+    def __init__(self):
+        self.queries = []
+        self.rows = []
+
+    def session(self):
+        return FakeSession(self)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db():
+    driver = FakeDriver()
+    with patch("app.db.GraphDatabase.driver", return_value=driver):
+        manager = BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+    driver.queries.clear()
+    return manager
+
+
+def _event(i):
+    return {
+        "id": f"e{i}",
+        "timestamp": f"2026-10-01T00:00:0{i}.000000000+00:00",
+        "keywords": ["suicide"],
+        "lexicon_version": "builtin",
+        "journal_entry_id": f"j{i}",
+        "raw_text": "I'm thinking about suicide",
+    }
+
+
+def test_bootstrap_creates_indexes_and_migrates_legacy_events():
+    driver = FakeDriver()
+    with patch("app.db.GraphDatabase.driver", return_value=driver):
+        BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+    queries = [query for query, _ in driver.queries]
+    assert all(statement in queries for statement in CRISIS_SCHEMA)
+    migration = next(q for q in queries if "c.timestamp = toString(c.timestamp)" in q)
+    assert "datetime(c.timestamp)" in migration and "CrisisBucket" in migration
+    assert any("MERGE (j)-[:HAS_CRISIS_EVENT]->(c)" in q for q in queries)
+
+
+def test_crisis_event_uses_temporal_timestamp_and_buckets(db):
+    db.log_crisis_event(user_id=None, keywords=["suicide"], event_id="e1", timestamp="2026-10-01T12:30:00")
+
+    query, params = db.driver.queries[-1]
+    assert "c.timestamp = datetime($timestamp)" in query
+    assert "c.reviewed = false" in query
+    assert "datetime.truncate(unit, c.timestamp)" in query
+    assert params["units"] == ["hour", "day"]
+
+
+def test_crisis_journal_entry_links_to_its_event(db):
+    db.save_journal_entry("j1", "text", "Crisis", "", 1.0, "", "Critical", "t", "crisis", crisis_audit_id="e1")
+
+    query, params = db.driver.queries[-1]
+    assert "MERGE (j)-[:HAS_CRISIS_EVENT]->(c)" in query
+    assert params["crisis_audit_id"] == "e1"
+
+
+def test_review_queue_pages_by_keyset(db):
+    db.driver.rows = [[_event(1), _event(2), _event(3)]]
+
+    page = db.get_crisis_review_queue(limit=2)
+
+    assert [e["id"] for e in page["events"]] == ["e1", "e2"]
+    assert _decode_cursor(page["next_cursor"]) == (_event(2)["timestamp"], "e2")
+    query, params = db.driver.queries[-1]
+    assert "$after_ts" not in query
+    assert params["limit"] == 3
+
+    db.driver.rows = [[_event(3)]]
+    page = db.get_crisis_review_queue(limit=2, cursor=page["next_cursor"])
+
+    assert [e["id"] for e in page["events"]] == ["e3"]
+    assert page["next_cursor"] is None
+    query, params = db.driver.queries[-1]
+    assert "c.timestamp >= datetime($after_ts)" in query
+    assert (params["after_ts"], params["after_id"]) == (_event(2)["timestamp"], "e2")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", _encode_cursor("x", "y")[:-4], "WzFd"])
+def test_malformed_cursor_is_rejected(db, cursor):
+    with pytest.raises(ValueError):
+        db.get_crisis_review_queue(cursor=cursor)
+
+
+def test_crisis_counts_fill_empty_buckets(db):
+    since = datetime(2026, 10, 1, 10, 15, tzinfo=timezone.utc)
+    until = datetime(2026, 10, 1, 13, 0, tzinfo=timezone.utc)
+    eleven = int(datetime(2026, 10, 1, 11, tzinfo=timezone.utc).timestamp())
+    db.driver.rows = [[{"epoch": eleven, "count": 4}]]
+
+    buckets = db.get_crisis_counts("hour", since, until)
+
+    assert buckets == [
+        {"start": "2026-10-01T10:00:00+00:00", "count": 0},
+        {"start": "2026-10-01T11:00:00+00:00", "count": 4},
+        {"start": "2026-10-01T12:00:00+00:00", "count": 0},
+    ]
+    assert "MATCH (b:CrisisBucket {granularity: $granularity})" in db.driver.queries[-1][0]
+    with pytest.raises(ValueError):
+        db.get_crisis_counts("minute", since, until)
+
+
+class _ReviewDB:
+    def __init__(self):
+        self.reviewed = {}
+
+    def get_crisis_review_queue(self, limit=50, cursor=None):
+        if cursor == "bad":
+            raise ValueError("Invalid cursor")
+        return {"events": [_event(1)], "next_cursor": None}
+
+    def review_crisis_event(self, event_id, notes=None):
+        if event_id != "e1":
+            return False
+        self.reviewed[event_id] = notes
+        return True
+
+    def get_crisis_counts(self, granularity, since, until):
+        return [{"start": since.isoformat(), "count": 2}, {"start": until.isoformat(), "count": 1}]
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    db = _ReviewDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    client = TestClient(app_main.app, headers={"X-Admin-Token": "secret"})
+    yield client, db
+    app_main.app.dependency_overrides.clear()
+
+
+def test_review_endpoints(admin_client):
+    client, db = admin_client
+
+    assert client.get("/admin/crisis-events").json()["events"][0]["raw_text"] == "I'm thinking about suicide"
+    assert client.get("/admin/crisis-events", params={"cursor": "bad"}).status_code == 400
+    assert client.post("/admin/crisis-events/e1/review", json={"notes": "called back"}).status_code == 200
+    assert db.reviewed == {"e1": "called back"}
+    assert client.post("/admin/crisis-events/missing/review", json={}).status_code == 404
+
+
+def test_crisis_stats_endpoint(admin_client):
+    client, _ = admin_client
+
+    body = client.get("/admin/crisis-stats", params={"granularity": "day", "days": 30}).json()
+    assert body["granularity"] == "day"
+    assert body["total"] == 3
+    assert client.get("/admin/crisis-stats", params={"granularity": "hour", "days": 60}).status_code == 400
+    assert client.get("/admin/crisis-stats", params={"granularity": "minute"}).status_code == 422
+
+
+def test_review_endpoints_require_admin(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert TestClient(app_main.app).get("/admin/crisis-events").status_code == 403
+
+
+def test_migration_is_skipped_once_recorded():
+    class MigratedSession(FakeSession):
+        def run(self, query, parameters=None, **params):
+            if "MATCH (m:SchemaMigration" in query:
+                self.driver.queries.append((query, params))
+                return FakeResult([{"version": CRISIS_MIGRATION_VERSION}])
+            return super().run(query, parameters, **params)
+
+    driver = FakeDriver()
+    driver.session = lambda: MigratedSession(driver)
+    with patch("app.db.GraphDatabase.driver", return_value=driver):
+        BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+    queries = [query for query, _ in driver.queries]
+    assert not any("toString(c.timestamp)" in q or "HAS_CRISIS_EVENT" in q for q in queries)
+
+
+def test_failed_migration_keeps_the_database_available():
+    class FailingSession(FakeSession):
+        def run(self, query, parameters=None, **params):
+            if "IN TRANSACTIONS" in query:
+                raise RuntimeError("CALL IN TRANSACTIONS is not supported")
+            return super().run(query, parameters, **params)
+
+    driver = FakeDriver()
+    driver.session = lambda: FailingSession(driver)
+    with patch("app.db.GraphDatabase.driver", return_value=driver):
+        manager = BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+    assert manager.is_available
+    # Not marked as done, so the next start retries
+    assert not any("MERGE (m:SchemaMigration" in q for q, _ in driver.queries)
@@ -61,14 +61,26 @@ class TestCrisisSafetyService:
         assert is_crisis is True
         assert "badword1" in keywords
 
-    def test_regex_pattern_compiled_once(self):
-        """Should compile regex pattern once at init, reuse for all detections."""
+    def test_matcher_compiled_once(self):
+        """Should build the keyword matcher once at init, reuse for all detections."""
         service = CrisisSafetyService()
+        matcher = service.matcher
         # Call detect_crisis multiple times
         for _ in range(5):
             service.detect_crisis("suicide test")
-        # If we get here without error, pattern is reused (performance test)
-        assert service.regex_pattern is not None
+        assert service.matcher is matcher
+        assert len(matcher) == len(service.keywords)
+
+    def test_word_boundaries_avoid_partial_matches(self, service):
+        """Should not match keywords inside longer words."""
+        is_crisis, keywords = service.detect_crisis("The period of good abusers... no, methodology")
+        assert is_crisis is False
+        assert keywords == []
+
+    def test_deduplicates_in_order(self, service):
+        """Should return each keyword once, in order of first appearance."""
+        _, keywords = service.detect_crisis("Hopeless. I want to give up, so hopeless, give up.")
+        assert keywords == ["hopeless", "give up"]
 
     def test_returns_all_matched_keywords(self, service):
         """Should return list of all keywords found, not just True/False."""
@@ -94,3 +106,52 @@ class TestCrisisSafetyService:
         is_crisis, keywords = service.detect_crisis(12345)
         assert is_crisis is False
         assert keywords == []
+
+
+class TestFuzzyCrisisSafetyService(TestCrisisSafetyService):
+    """Runs every exact-matching test again with typo tolerance on, to catch false positives."""
+
+    @pytest.fixture(autouse=True)
+    def fuzzy_matching(self, monkeypatch):
+        monkeypatch.setenv("CRISIS_FUZZY_MATCHING", "true")
+
+    @pytest.mark.parametrize(
+        "text, keyword",
+        [
+            ("I keep thinking about suicde", "suicide"),
+            ("i just want to kill myslef", "kill myself"),
+            ("I took an overdoes last year", "overdose"),
+            ("Everything feels hopless", "hopeless"),
+            ("I cant go on like this", "can't go on"),
+            ("nothing maters anymore", "nothing matters"),
+        ],
+    )
+    def test_detects_typos(self, service, text, keyword):
+        """Should detect misspelled keywords and report the lexicon spelling."""
+        is_crisis, keywords = service.detect_crisis(text)
+        assert is_crisis is True
+        assert keywords == [keyword]
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "I was putting off my work again",
+            "The steak was overdone at dinner",
+            "This video will amuse you a lot",
+            "Period. Methodology is odd",
+            "I'm hopeful about the new job",
+            "I gave up smoking last year",
+            "Luckily the kids gave up fighting",
+            "I know I can go on with my day",
+            "I want to end my like streak",
+            "what is the point, no pint left",
+        ],
+    )
+    def test_near_miss_words_are_not_crises(self, service, text):
+        """Ordinary words one edit away from a keyword should not trigger."""
+        assert service.detect_crisis(text) == (False, [])
+
+    def test_exact_matches_take_precedence(self, service):
+        """Exact matches are reported as typed and typos only fill gaps."""
+        _, keywords = service.detect_crisis("self-harm, then I felt hopless")
+        assert keywords == ["self-harm", "hopeless"]
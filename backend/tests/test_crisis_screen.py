@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.crisis import CrisisSafetyService, CrisisScreenSession
+from app.lexicon import Lexicon
+from app.matcher import KeywordMatcher, StreamingMatcher
+
+
+@pytest.fixture
+def matcher():
+    return KeywordMatcher(CrisisSafetyService.DEFAULT_KEYWORDS)
+
+
+def test_streaming_matches_keystroke_by_keystroke(matcher):
+    stream = StreamingMatcher(matcher)
+    text = "Honestly I want to END IT, maybe an od"
+    found = []
+    for ch in text:
+        found += stream.append(ch)
+
+    # "od" ends the text, so its trailing boundary is only known at finish
+    assert found == ["end it"]
+    assert stream.finish() == ["od"]
+    assert stream.text == text.lower()
+
+
+def test_keyword_waits_for_its_trailing_boundary(matcher):
+    stream = StreamingMatcher(matcher)
+
+    assert stream.append("that was od") == []
+    assert stream.append("d") == []  # "odd" is not a keyword
+    assert stream.append(" and hopeless.") == ["hopeless"]
+
+
+def test_delete_rewinds_without_rescanning(matcher):
+    stream = StreamingMatcher(matcher)
+    stream.append("I feel hopel")
+    stream.delete(6)
+    assert stream.text == "i feel"
+
+    assert stream.append(" pointless ") == ["pointless"]
+    # Each keyword is reported once per stream
+    assert stream.append("pointless ") == []
+
+
+def test_each_keystroke_only_scans_new_characters(matcher, monkeypatch):
+    stream = StreamingMatcher(matcher)
+    stream.append("word " * 2000)
+    steps = []
+    real_step = matcher.step
+    monkeypatch.setattr(matcher, "step", lambda node, ch: steps.append(ch) or real_step(node, ch))
+
+    stream.append("x")
+
+    assert steps == ["x"]
+
+
+def test_session_rescans_once_after_lexicon_swap():
+    service = CrisisSafetyService(keywords=["suicide"])
+    session = CrisisScreenSession(service)
+    assert session.append("I keep thinking about suicide and feel alone ") == ["suicide"]
+
+    service.swap_lexicon(Lexicon("v2", ["suicide", "feel alone"], fuzzy_distance=0))
+
+    assert session.append("x") == ["feel alone"]
+    assert session.lexicon_version == "v2"
+    assert session.keywords == ["suicide", "feel alone"]
+
+
+def test_session_limits_entry_size():
+    session = CrisisScreenSession(CrisisSafetyService(), max_chars=10)
+    session.append("0123456789")
+    with pytest.raises(ValueError):
+        session.append("x")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app_main, "FEATURE_CRISIS_SAFETY", True)
+    app_main.app.state.crisis_service = CrisisSafetyService()
+    return TestClient(app_main.app)
+
+
+def test_websocket_pushes_resources_when_keyword_completes(client):
+    with client.websocket_connect("/ws/crisis-screen") as ws:
+        for ch in "I want to kill myself":
+            ws.send_json({"append": ch})
+        ws.send_json({"append": " "})
+        alert = ws.receive_json()
+        assert alert["type"] == "crisis"
+        assert alert["keywords"] == ["kill myself"]
+        assert alert["lexicon_version"] == "builtin"
+        assert alert["crisis_resources"]["hotlines"][0]["phone"] == "988"
+
+        ws.send_json({"delete": 3})
+        ws.send_text("not json")
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"append": "I feel hopeless"})
+        ws.send_json({"final": True})
+        assert ws.receive_json()["keywords"] == ["hopeless"]
+        assert ws.receive_json() == {"type": "final", "keywords": ["kill myself", "hopeless"], "lexicon_version": "builtin"}
+
+
+def test_websocket_rejects_oversized_entries(client, monkeypatch):
+    monkeypatch.setenv("CRISIS_SCREEN_MAX_CHARS", "5")
+    with client.websocket_connect("/ws/crisis-screen") as ws:
+        ws.send_json({"append": "too long"})
+        assert ws.receive_json()["type"] == "error"
+        assert ws.receive()["code"] == 1009
@@ -0,0 +1,98 @@
+"""Tests for per-keyword crisis detection telemetry."""
+
+import asyncio
+import logging
+
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.crisis import CrisisSafetyService
+from app.crisis_telemetry import CRISIS_DETECT_LATENCY, CRISIS_KEYWORD_HITS, CRISIS_KEYWORD_PAIRS, CrisisTelemetry
+from app.lexicon import Lexicon
+from app.metrics import _format_labels, metrics
+
+
+def test_detection_records_keywords_pairs_and_latency():
+    service = CrisisSafetyService(keywords=["hopeless", "give up", "od"])
+    hits_before = CRISIS_KEYWORD_HITS.value(keyword="hopeless", lexicon_version="custom")
+    pairs_before = CRISIS_KEYWORD_PAIRS.value(keyword_a="give up", keyword_b="hopeless", lexicon_version="custom")
+    latency_before = CRISIS_DETECT_LATENCY.count(lexicon_version="custom")
+
+    service.detect_crisis("I feel hopeless and want to give up")
+    service.detect_crisis("Hopeless again, hopeless all day")
+    service.detect_crisis("I had a good day today")
+
+    summary = service.telemetry.summary()
+    assert summary["detections"] == 3
+    assert summary["crisis_detections"] == 2
+    assert summary["lexicon_versions"] == {"custom": {"detections": 3, "crisis_detections": 2}}
+    assert summary["keywords"][0] == {
+        "keyword": "hopeless",
+        "lexicon_version": "custom",
+        "hits": 2,
+        "share_of_crises": 1.0,
+        "alone": 1,
+    }
+    assert summary["co_occurrence"] == [{"keywords": ["give up", "hopeless"], "lexicon_version": "custom", "hits": 1}]
+    assert summary["latency_ms"]["p99"] >= summary["latency_ms"]["p50"] > 0
+
+    assert CRISIS_KEYWORD_HITS.value(keyword="hopeless", lexicon_version="custom") == hits_before + 2
+    assert CRISIS_KEYWORD_PAIRS.value(keyword_a="give up", keyword_b="hopeless", lexicon_version="custom") == pairs_before + 1
+    assert CRISIS_DETECT_LATENCY.count(lexicon_version="custom") == latency_before + 3
+    assert 'crisis_keyword_hits_total{keyword="hopeless",lexicon_version="custom"}' in metrics.render_prometheus()
+
+
+def test_lexicon_versions_are_counted_separately():
+    service = CrisisSafetyService(keywords=["od"])
+    service.detect_crisis("I think I might od tonight")
+    service.swap_lexicon(Lexicon("v2", ["overdose"]))
+    service.detect_crisis("thinking about an overdose")
+
+    keywords = {(k["keyword"], k["lexicon_version"]) for k in service.telemetry.summary()["keywords"]}
+    assert keywords == {("od", "custom"), ("overdose", "v2")}
+
+
+def test_keyword_labels_are_escaped_in_the_exposition():
+    service = CrisisSafetyService(keywords=['say "bye" now', "back\\slash"])
+    service.detect_crisis('I want to say "bye" now to everyone, back\\slash')
+
+    rendered = metrics.render_prometheus()
+    assert 'keyword="say \\"bye\\" now"' in rendered
+    assert 'keyword="back\\\\slash"' in rendered
+    assert _format_labels((("keyword", "line\nbreak"),)) == '{keyword="line\\nbreak"}'
+
+
+def test_log_summary_resets_the_window(caplog):
+    telemetry = CrisisTelemetry()
+    telemetry.record(["od"], "builtin", 0.0001)
+
+    with caplog.at_level(logging.INFO, logger="app.crisis_telemetry"):
+        summary = telemetry.log_summary()
+
+    assert summary["keywords"][0]["keyword"] == "od"
+    assert "top keywords od=1" in caplog.text
+    assert telemetry.summary()["detections"] == 0
+
+
+def test_periodic_summary_is_logged():
+    telemetry = CrisisTelemetry(interval=0.01)
+    telemetry.record(["od"], "builtin", 0.0001)
+
+    async def run():
+        telemetry.start()
+        await asyncio.sleep(0.05)
+        await telemetry.stop()
+
+    asyncio.run(run())
+    assert telemetry.summary()["detections"] == 0
+
+
+def test_admin_endpoint(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    app_main.app.state.crisis_service = CrisisSafetyService()
+    app_main.app.state.crisis_service.detect_crisis("I'm thinking about suicide")
+
+    response = TestClient(app_main.app).get("/admin/crisis-telemetry", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    assert response.json()["keywords"][0]["keyword"] == "suicide"
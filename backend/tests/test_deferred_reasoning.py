@@ -0,0 +1,203 @@
+"""Tests for label-only classification with reasoning generated after /analyze."""
+
+import asyncio
+from typing import Any, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import inference
+from app import main as app_main
+from app.ai import CLASSIFY_ONLY_PROMPT, SYSTEM_PROMPT, UNAVAILABLE_REASONING, generate_reasoning, query_local_ai
+
+
+class _FakeBackend:
+    name = "fake"
+
+    def __init__(self, response: str) -> None:
+        self.response = response
+        self.calls = []
+
+    def default_model(self) -> str:
+        return "fake:1b"
+
+    async def classify(self, prompt, model, required_fields=(), stream_early_stop=False, options=None, stop_at_fields=False):
+        self.calls.append({"prompt": prompt, "options": options, "stop_at_fields": stop_at_fields})
+        return {"response": self.response}
+
+
+class _FakeDBManager:
+    def __init__(self) -> None:
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def log_and_analyze(self, node_name, confidence, title, task, sublabel="unspecified"):
+        return "Low", False
+
+    def analyze_loop_path(self, days: int = 30):
+        return {}
+
+    def get_intervention_effectiveness(self, state: str, sublabel: str = None):
+        return {}
+
+    def increment_intervention_seen_count(self, title: str):
+        pass
+
+    def save_journal_entry(self, entry_id, raw_text, detected_state, sublabel, confidence, reasoning, risk_level,
+                           intervention_title, intervention_type, crisis_audit_id=None, prompt_version=None) -> bool:
+        self.entries[entry_id] = {
+            "id": entry_id,
+            "raw_text": raw_text,
+            "detected_state": detected_state,
+            "sublabel": sublabel,
+            "reasoning": reasoning,
+        }
+        return True
+
+    def get_journal_entry(self, entry_id):
+        return self.entries.get(entry_id)
+
+    def update_journal_reasoning(self, entry_id, reasoning) -> bool:
+        self.entries[entry_id]["reasoning"] = reasoning
+        return True
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    def install(response: str) -> _FakeBackend:
+        backend = _FakeBackend(response)
+        monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+        monkeypatch.setitem(inference._instances, "ollama", backend)
+        return backend
+
+    return install
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    async def fake_query_local_ai(text: str, request_id: str = "", include_reasoning: bool = True):
+        return {
+            "detected_node": "Stress",
+            "emotion_sublabel": "Overload",
+            "confidence": 0.9,
+            "reasoning": "full reasoning" if include_reasoning else "",
+        }
+
+    async def fake_generate_reasoning(text, node, sublabel, request_id=""):
+        return f"{node}/{sublabel} explained"
+
+    monkeypatch.setattr(app_main, "query_local_ai", fake_query_local_ai)
+    monkeypatch.setattr(app_main, "generate_reasoning", fake_generate_reasoning)
+    monkeypatch.setattr(app_main, "FEATURE_DEFERRED_REASONING", True)
+
+    from app.crisis import CrisisSafetyService
+    app_main.app.state.crisis_service = CrisisSafetyService()
+
+    db = _FakeDBManager()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    yield db
+    app_main.app.dependency_overrides.clear()
+
+
+def test_classify_only_prompt_drops_reasoning_field():
+    assert '"reasoning"' in SYSTEM_PROMPT
+    assert '"reasoning"' not in CLASSIFY_ONLY_PROMPT
+    assert len(CLASSIFY_ONLY_PROMPT) < len(SYSTEM_PROMPT)
+
+
+def test_label_only_query_uses_output_budget_and_survives_cutoff(fake_backend, monkeypatch):
+    monkeypatch.setenv("AI_CLASSIFY_MAX_TOKENS", "32")
+    # The budget cut the model off while it was adding a reasoning field anyway
+    backend = fake_backend('{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "becau')
+
+    result = asyncio.run(query_local_ai("I'm behind on deadlines", include_reasoning=False))
+
+    assert result == {
+        "detected_node": "Stress",
+        "emotion_sublabel": "Overload",
+        "confidence": 0.9,
+        "reasoning": "",
+        "prompt_version": "v1-full",
+    }
+    assert backend.calls[0]["options"] == {"num_predict": 32}
+    assert backend.calls[0]["stop_at_fields"] is True
+    assert CLASSIFY_ONLY_PROMPT in backend.calls[0]["prompt"]
+
+
+def test_generate_reasoning_parses_followup_call(fake_backend):
+    backend = fake_backend('{"reasoning": "mentions deadlines and pressure"}')
+
+    reasoning = asyncio.run(generate_reasoning("I'm behind on deadlines", "Stress", "Overload"))
+
+    assert reasoning == "mentions deadlines and pressure"
+    assert "classified as Stress (Overload)" in backend.calls[0]["prompt"]
+
+
+def test_generate_reasoning_returns_none_on_bad_output(fake_backend):
+    fake_backend("not json")
+    assert asyncio.run(generate_reasoning("text here", "Stress", "Overload")) is None
+
+
+def test_analyze_returns_before_reasoning_and_attaches_it(fake_db):
+    client = TestClient(app_main.app)
+
+    body = client.post("/analyze", json={"user_text": "I'm behind on deadlines"}).json()
+
+    assert body["reasoning"] == ""
+    assert body["reasoning_pending"] is True
+    # TestClient runs background tasks before returning
+    assert fake_db.entries[body["journal_entry_id"]]["reasoning"] == "Stress/Overload explained"
+
+    followup = client.get(f"/journal-entries/{body['journal_entry_id']}/reasoning")
+    assert followup.status_code == 200
+    assert followup.json() == {
+        "entry_id": body["journal_entry_id"],
+        "status": "ready",
+        "reasoning": "Stress/Overload explained",
+    }
+
+
+def test_reasoning_endpoint_generates_missing_reasoning(fake_db):
+    fake_db.save_journal_entry("e1", "I feel alone", "Isolation", "Loneliness", 0.9, "", "Low", "t", "")
+    client = TestClient(app_main.app)
+
+    response = client.get("/journal-entries/e1/reasoning")
+
+    assert response.json()["reasoning"] == "Isolation/Loneliness explained"
+    assert fake_db.entries["e1"]["reasoning"] == "Isolation/Loneliness explained"
+    assert client.get("/journal-entries/missing/reasoning").status_code == 404
+
+
+def test_reasoning_endpoint_reports_pending(fake_db):
+    fake_db.save_journal_entry("e2", "I feel alone", "Isolation", "Loneliness", 0.9, "", "Low", "t", "")
+    app_main._reasoning_in_flight.add("e2")
+    try:
+        response = TestClient(app_main.app).get("/journal-entries/e2/reasoning")
+    finally:
+        app_main._reasoning_in_flight.discard("e2")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+
+def test_fallback_prediction_is_not_deferred(fake_db, monkeypatch):
+    async def unavailable(text, request_id="", include_reasoning=True):
+        return {"detected_node": "Stress", "emotion_sublabel": "unspecified", "confidence": 0.5, "reasoning": UNAVAILABLE_REASONING}
+
+    monkeypatch.setattr(app_main, "query_local_ai", unavailable)
+    body = TestClient(app_main.app).post("/analyze", json={"user_text": "I'm behind on deadlines"}).json()
+
+    assert body["reasoning"] == UNAVAILABLE_REASONING
+    assert body["reasoning_pending"] is False
+
+
+def test_cache_hit_without_reasoning_is_generated_after_analyze(fake_db, monkeypatch):
+    async def cache_hit(text, request_id="", include_reasoning=True):
+        return {"detected_node": "Stress", "emotion_sublabel": "Overload", "confidence": 0.9, "reasoning": ""}
+
+    monkeypatch.setattr(app_main, "query_local_ai", cache_hit)
+    monkeypatch.setattr(app_main, "FEATURE_DEFERRED_REASONING", False)
+
+    body = TestClient(app_main.app).post("/analyze", json={"user_text": "I'm behind on deadlines"}).json()
+
+    assert body["reasoning_pending"] is True
+    assert fake_db.entries[body["journal_entry_id"]]["reasoning"] == "Stress/Overload explained"
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app import inference
+from app.ai import UNAVAILABLE_REASONING, query_local_ai
+from app.inference import LlamaCppBackend, OllamaBackend, get_backend
+from benchmarks.classifier_bench import compare_backends, compare_results
+from benchmarks.stub_ollama import StubOllamaServer, StubTiming
+
+
+class FakeLlama:
+    """Stands in for llama_cpp.Llama: streams a fixed completion token by token."""
+
+    instances = 0
+
+    def __init__(self, model_path, n_ctx, n_threads, embedding, verbose):
+        FakeLlama.instances += 1
+        self.model_path = model_path
+        self.threads_seen = set()
+
+    def create_completion(self, prompt, max_tokens, temperature, stream):
+        self.threads_seen.add(threading.current_thread().name)
+        text = '{"node": "Shame", "sublabel": "Guilt", "confidence": 0.8, "reasoning": "r"}' + " " * 50
+        for i in range(0, len(text), 4):
+            yield {"choices": [{"text": text[i : i + 4]}]}
+
+    def tokenize(self, data):
+        return data.split()
+
+    def embed(self, text):
+        return [0.1, 0.2, 0.3]
+
+
+class FakeLlamaModule:
+    Llama = FakeLlama
+
+
+def test_get_backend_defaults_to_ollama_and_rejects_unknown(monkeypatch):
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    assert isinstance(get_backend(), OllamaBackend)
+    assert get_backend() is get_backend("ollama")
+
+    with pytest.raises(ValueError):
+        get_backend("tensorrt")
+
+
+def test_ollama_backend_classify_against_stub(monkeypatch):
+    text = "I can't start my work"
+    recordings = {text: '{"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9}'}
+    with StubOllamaServer(recordings, StubTiming(time_scale=0.0)) as stub:
+        monkeypatch.setenv("OLLAMA_URL", stub.url)
+        raw = asyncio.run(OllamaBackend().classify(f'Journal entry: "{text}"\n\nJSON response:', "m"))
+
+    assert raw["response"] == recordings[text]
+    assert raw["eval_count"] > 0
+
+
+def test_llamacpp_backend_runs_on_worker_pool_and_stops_early(monkeypatch):
+    monkeypatch.setattr(inference, "llama_cpp", FakeLlamaModule)
+    FakeLlama.instances = 0
+    backend = LlamaCppBackend(model_path="/models/tiny.gguf", workers=2, threads=1)
+
+    async def run():
+        return await asyncio.gather(
+            *(backend.classify("prompt", backend.default_model(), ("node",), stream_early_stop=True) for _ in range(4))
+        )
+
+    results = asyncio.run(run())
+
+    assert backend.default_model() == "tiny.gguf"
+    assert FakeLlama.instances <= 2
+    assert all(r["response"].endswith("}") for r in results)
+    assert all(r["early_stop"] for r in results)
+    assert all(r["eval_count"] < 30 for r in results)  # trailing whitespace was never generated
+
+
+def test_llamacpp_backend_never_creates_more_than_workers_instances(monkeypatch):
+    class SlowCheckBackend(LlamaCppBackend):
+        """Pauses while the slot limit is read, widening the check-then-increment window."""
+
+        @property
+        def workers(self):
+            time.sleep(0.005)
+            return self._workers
+
+        @workers.setter
+        def workers(self, value):
+            self._workers = value
+
+    monkeypatch.setattr(inference, "llama_cpp", FakeLlamaModule)
+    FakeLlama.instances = 0
+    backend = SlowCheckBackend(model_path="/models/tiny.gguf", workers=2, threads=1)
+    start = threading.Barrier(8)
+
+    def use_instance():
+        start.wait()
+        backend._pool.put(backend._acquire())
+
+    threads = [threading.Thread(target=use_instance) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(backend.warm(backend.default_model(), keep_alive="5m"))
+    for thread in threads:
+        thread.join(5)
+
+    assert FakeLlama.instances == 2
+    assert backend._created == 2
+
+
+def test_llamacpp_backend_without_library_falls_back(monkeypatch):
+    monkeypatch.setattr(inference, "llama_cpp", None)
+    monkeypatch.setitem(inference._instances, "llamacpp", LlamaCppBackend(model_path="/models/tiny.gguf"))
+    monkeypatch.setenv("INFERENCE_BACKEND", "llamacpp")
+
+    result = asyncio.run(query_local_ai("I feel stuck and behind on everything"))
+
+    assert result["reasoning"] == UNAVAILABLE_REASONING
+
+
+def test_query_local_ai_uses_llamacpp_backend(monkeypatch):
+    monkeypatch.setattr(inference, "llama_cpp", FakeLlamaModule)
+    monkeypatch.setitem(inference._instances, "llamacpp", LlamaCppBackend(model_path="/models/tiny.gguf"))
+    monkeypatch.setenv("INFERENCE_BACKEND", "llamacpp")
+
+    result = asyncio.run(query_local_ai("I keep blaming myself for what happened"))
+
+    assert result["detected_node"] == "Shame"
+    assert result["emotion_sublabel"] == "Guilt"
+
+
+def test_benchmark_compares_backends_by_concurrency():
+    def run(backend, p50):
+        return {
+            "backend": backend,
+            "concurrency": 1,
+            "latency_ms": {"p50": p50, "p95": p50, "p99": p50},
+            "throughput_rps": 1.0,
+            "accuracy": 0.9,
+        }
+
+    result = {"runs": [run("ollama", 100.0), run("llamacpp", 80.0)]}
+    lines = compare_backends(result)
+
+    assert lines[0] == "ollama -> llamacpp concurrency=1"
+    assert "(-20.00)" in lines[1]
+    # Older results without a backend field still line up with Ollama runs
+    legacy = {"runs": [{k: v for k, v in run("ollama", 120.0).items() if k != "backend"}]}
+    assert compare_results(legacy, result)[0] == "backend=ollama concurrency=1"
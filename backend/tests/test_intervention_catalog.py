@@ -0,0 +1,92 @@
+"""Tests for the compiled intervention catalog served by /analyze."""
+
+import copy
+
+import pytest
+
+from app import catalog
+from app.catalog import EDUCATION_DEPTHS, CatalogError, compile_catalog, lookup
+from app.interventions import INTERVENTIONS
+
+
+def _route(node, sublabel):
+    """The nested-dict routing /analyze used before the catalog was compiled."""
+    options = INTERVENTIONS.get(node)
+    if options and None in options:
+        return options.get(sublabel) or options.get(None)
+    return options or catalog.FALLBACK_BREAKER
+
+
+@pytest.mark.parametrize("node", [*INTERVENTIONS, "UnknownNode"])
+@pytest.mark.parametrize("sublabel", ["Avoidance", "Panic", "Burnout", "Paralysis", "General", "", None])
+@pytest.mark.parametrize("depth", EDUCATION_DEPTHS)
+def test_lookup_matches_nested_routing(node, sublabel, depth):
+    raw = _route(node, sublabel)
+    breaker = lookup(node, sublabel, depth)
+
+    assert (breaker.title, breaker.task, breaker.type) == (raw["title"], raw["task"], raw.get("type"))
+    education = raw["education"]
+    assert breaker.education == (education[depth] if isinstance(education, dict) else education)
+
+
+def test_variants_are_rendered_once_and_shared():
+    first = lookup("Procrastination", "Avoidance")
+    second = lookup("Procrastination", "Perfectionism", "deepen")
+
+    assert first.variants is second.variants
+    assert [v["title"] for v in first.variants] == [
+        v["title"] for k, v in INTERVENTIONS["Procrastination"].items() if k is not None
+    ]
+    assert first.variants[0] == {
+        "title": "The 5-Minute Sprint",
+        "task": INTERVENTIONS["Procrastination"]["Avoidance"]["task"],
+        "education": INTERVENTIONS["Procrastination"]["Avoidance"]["education"]["introduce"],
+        "type": "cognitive",
+    }
+    # A single named variant is not offered as a choice
+    assert lookup("Stress", "Burnout").variants is None
+
+
+def test_msc_steps_are_rendered_at_introduce_depth():
+    steps = lookup("Shame", "Guilt").msc_steps
+
+    assert [step["step"] for step in steps] == [1, 2, 3]
+    assert steps[0]["education"] == INTERVENTIONS["Shame"]["msc_steps"][0]["education"]["introduce"]
+    assert set(steps[0]) == {"step", "name", "task", "education"}
+
+
+def test_unknown_depth_is_served_at_introduce():
+    assert lookup("Stress", None, "unknown") is lookup("Stress", None, "introduce")
+
+
+def test_movement_protocol_comes_from_the_matched_entry():
+    raw = copy.deepcopy(INTERVENTIONS)
+    raw["Stress"]["Burnout"]["movement"] = {"title": "Walk", "task": "Walk for ten minutes.", "type": "movement"}
+    compiled = compile_catalog(raw)
+
+    assert compiled[("Stress", "Burnout", "introduce")].movement["title"] == "Walk"
+    assert compiled[("Stress", None, "introduce")].movement is None
+
+
+@pytest.mark.parametrize(
+    "mutate, message",
+    [
+        (lambda c: c["Numbness"].pop("title"), "Numbness: 'title'"),
+        (lambda c: c["Anxiety"]["Panic"].update(task=" "), "Anxiety.Panic: 'task'"),
+        (lambda c: c["Isolation"].update(education={"deepen": "text"}), "Isolation: education"),
+        (lambda c: c["Isolation"]["education"].update(deeper="text"), "unknown education depths"),
+        (lambda c: c["Shame"]["msc_steps"][1].pop("step"), r"Shame\.msc_steps\[1\]"),
+        (lambda c: c["Stress"].update({3: c["Stress"]["Burnout"]}), "sublabel keys must be strings"),
+    ],
+)
+def test_invalid_catalog_is_rejected_at_load(mutate, message):
+    raw = copy.deepcopy(INTERVENTIONS)
+    mutate(raw)
+
+    with pytest.raises(CatalogError, match=message):
+        compile_catalog(raw)
+
+
+def test_catalog_table_is_read_only():
+    with pytest.raises(TypeError):
+        catalog.CATALOG[("Stress", None, "introduce")] = lookup("Anxiety", None)
@@ -25,6 +25,7 @@ class _FakeDBManager:
         risk_level: str,
         intervention_title: str,
         intervention_type: str,
+        prompt_version: Optional[str] = None,
     ) -> bool:
         """Mock: saves entry to in-memory list."""
         self.saved_entries.append({
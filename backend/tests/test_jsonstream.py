@@ -0,0 +1,93 @@
+import asyncio
+import json
+import time
+
+from app.ai import query_local_ai
+from app.jsonstream import JSONObjectStream
+from benchmarks.stub_ollama import StubOllamaServer, StubTiming
+
+REQUIRED = ("node", "sublabel", "confidence")
+
+
+def feed_tokens(stream: JSONObjectStream, text: str, size: int = 3) -> int:
+    """Feeds text in small pieces; returns how many pieces were consumed before stopping."""
+    for count, i in enumerate(range(0, len(text), size), start=1):
+        if stream.feed(text[i : i + size]):
+            return count
+    return -1
+
+
+def test_stops_when_object_closes_and_ignores_tail():
+    obj = '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "x"}'
+    stream = JSONObjectStream(REQUIRED)
+
+    consumed = feed_tokens(stream, obj + "\n\n\n     \n\n")
+
+    assert stream.complete is True
+    assert stream.text == obj
+    assert consumed == -(-len(obj) // 3)  # stopped on the piece that closed the object
+
+
+def test_braces_and_quotes_inside_strings_do_not_close_object():
+    obj = '{"node": "Shame", "sublabel": "Guilt", "confidence": 0.8, "reasoning": "said \\"}\\" then {left"}'
+    stream = JSONObjectStream(REQUIRED)
+
+    feed_tokens(stream, obj + "  ")
+
+    assert stream.complete is True
+    assert json.loads(stream.text)["reasoning"] == 'said "}" then {left'
+
+
+def test_object_missing_required_fields_is_final_but_not_complete():
+    stream = JSONObjectStream(REQUIRED)
+
+    assert stream.feed('{"node": "Stress"}   ') is True
+    assert stream.complete is False
+    assert stream.text == '{"node": "Stress"}'
+
+
+def test_leading_chatter_is_skipped():
+    stream = JSONObjectStream(REQUIRED)
+    feed_tokens(stream, 'Sure! "here": {"node": "Anxiety", "sublabel": "Dread", "confidence": 0.7}')
+
+    assert json.loads(stream.text)["node"] == "Anxiety"
+
+
+def test_stop_at_fields_closes_before_reasoning():
+    stream = JSONObjectStream(REQUIRED, stop_at_fields=True)
+    text = '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "a very long explanation'
+
+    feed_tokens(stream, text)
+
+    assert stream.complete is True
+    assert json.loads(stream.text) == {"node": "Stress", "sublabel": "Overload", "confidence": 0.9}
+
+
+def test_incomplete_stream_returns_raw_text():
+    stream = JSONObjectStream(REQUIRED)
+    stream.feed('{"node": "Stress", "sub')
+
+    assert stream.complete is False
+    assert stream.text == '{"node": "Stress", "sub'
+
+
+def test_query_local_ai_streams_and_aborts_tail(monkeypatch):
+    text = "I can't start my work"
+    recordings = {text: '{"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "r"}'}
+    # ~4ms per token, so the stub is still generating the tail when the client hangs up
+    timing = StubTiming(time_scale=0.1, load_seconds=0.0, tail_tokens=400)
+
+    with StubOllamaServer(recordings, timing) as stub:
+        monkeypatch.setenv("OLLAMA_URL", stub.url)
+        monkeypatch.setenv("AI_STREAM_EARLY_STOP", "true")
+        result = asyncio.run(query_local_ai(text))
+        deadline = time.monotonic() + 5
+        while stub.requests_served == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert result["detected_node"] == "Procrastination"
+    assert result["emotion_sublabel"] == "Avoidance"
+    assert result["reasoning"] == "r"
+    # The 400-character whitespace tail is ~100 tokens; far fewer were generated
+    assert stub.streams_aborted == 1
+    assert stub.tokens_generated < 100
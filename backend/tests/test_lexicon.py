@@ -0,0 +1,183 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import lexicon as lexicon_module
+from app import main as app_main
+from app.crisis import CrisisSafetyService
+from app.lexicon import Lexicon, LexiconError, LexiconReloader, load_lexicon_file, validate_lexicon
+
+
+def _write(path, version, keywords, checks=None):
+    data = {"version": version, "keywords": keywords}
+    if checks:
+        data["checks"] = checks
+    path.write_text(json.dumps(data))
+    # Make sure the watcher sees a new mtime even on coarse filesystems
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+
+
+def test_load_lexicon_merges_languages_and_runs_checks(tmp_path):
+    path = tmp_path / "lexicon.json"
+    _write(
+        path,
+        "2026-10-01",
+        {"en": ["end my life", "hopeless"], "es": ["quiero morir", "hopeless"]},
+        checks={"match": ["Quiero morir hoy"], "no_match": ["A hopeful day"]},
+    )
+
+    lexicon = load_lexicon_file(str(path))
+
+    assert lexicon.version == "2026-10-01"
+    assert lexicon.keywords == ["end my life", "hopeless", "quiero morir"]
+    assert lexicon.matcher.find_all("I feel hopeless") == ["hopeless"]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({"keywords": ["suicide"]}, "version"),
+        ({"version": "v2", "keywords": []}, "no keywords"),
+        ({"version": "v2", "keywords": ["suicide", " "]}, "empty keyword"),
+        ({"version": "v2", "keywords": "suicide"}, "list of strings"),
+        ({"version": "v2", "keywords": ["suicide", "why bother?"]}, "never match"),
+        ({"version": "v2", "keywords": ["suicide"], "checks": {"match": ["I want to die"]}}, "not detected"),
+        ({"version": "v2", "keywords": ["od"], "checks": {"no_match": ["an od day"]}}, "wrongly detected"),
+    ],
+)
+def test_invalid_lexicons_are_rejected(tmp_path, data, message):
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps(data))
+
+    with pytest.raises(LexiconError, match=message):
+        load_lexicon_file(str(path))
+
+
+def test_default_keywords_pass_validation():
+    validate_lexicon(Lexicon("builtin", list(CrisisSafetyService.DEFAULT_KEYWORDS)))
+
+
+def test_invalid_startup_lexicon_falls_back_to_builtin(tmp_path):
+    path = tmp_path / "lexicon.json"
+    path.write_text("{not json")
+
+    service = CrisisSafetyService(lexicon_path=str(path))
+
+    assert service.lexicon_version == "builtin"
+    assert service.detect_crisis("I'm thinking about suicide")[0] is True
+
+
+def test_reload_swaps_only_valid_new_versions(tmp_path):
+    path = tmp_path / "lexicon.json"
+    _write(path, "v1", ["suicide"])
+    service = CrisisSafetyService(lexicon_path=str(path))
+    reloader = LexiconReloader(str(path))
+    reloader.service = service
+    reloader._mtime = reloader._current_mtime()
+    assert asyncio.run(reloader.check()) is None
+
+    _write(path, "v2", ["suicide", "quiero morir"])
+    assert asyncio.run(reloader.check()) == "applied"
+    assert service.detect_crisis_versioned("Hoy quiero morir, lo siento") == (True, ["quiero morir"], "v2")
+
+    _write(path, "v2", ["suicide", "quiero morir"])
+    assert asyncio.run(reloader.check()) == "unchanged"
+
+    _write(path, "v2", ["suicide"])
+    assert asyncio.run(reloader.check()) == "rejected"
+    assert "version is still 'v2'" in reloader.last_error
+
+    _write(path, "v3", ["suicide", "bother?"])
+    assert asyncio.run(reloader.check()) == "rejected"
+    assert service.lexicon_version == "v2"
+
+
+def test_detection_continues_while_a_lexicon_compiles(tmp_path, monkeypatch):
+    path = tmp_path / "lexicon.json"
+    _write(path, "v2", ["suicide", "hopeless"])
+    service = CrisisSafetyService(keywords=["suicide"])
+    reloader = LexiconReloader(str(path))
+    reloader.service = service
+
+    compiling = threading.Event()
+    release = threading.Event()
+    real_load = lexicon_module.load_lexicon_file
+
+    def slow_load(p):
+        compiling.set()
+        release.wait(5)
+        return real_load(p)
+
+    monkeypatch.setattr(lexicon_module, "load_lexicon_file", slow_load)
+
+    async def run():
+        reload = asyncio.create_task(reloader.reload())
+        await asyncio.to_thread(compiling.wait, 5)
+        # The event loop is free and detection uses the old lexicon meanwhile
+        during = service.detect_crisis_versioned("I feel hopeless about suicide")
+        release.set()
+        return during, await reload
+
+    during, outcome = asyncio.run(run())
+
+    assert during == (True, ["suicide"], "custom")
+    assert outcome == "applied"
+    assert service.detect_crisis_versioned("I feel hopeless about suicide") == (True, ["hopeless", "suicide"], "v2")
+
+
+class _RecordingDB:
+    def __init__(self):
+        self.crisis_events = []
+
+    def log_crisis_event(self, user_id=None, keywords=None, detected_state=None, ip_address=None, lexicon_version=None, event_id=None):
+        self.crisis_events.append({"keywords": keywords, "lexicon_version": lexicon_version})
+        return "audit-1"
+
+    def save_journal_entry(self, *args, **kwargs):
+        return True
+
+
+def test_crisis_event_records_lexicon_version(tmp_path, monkeypatch):
+    path = tmp_path / "lexicon.json"
+    _write(path, "2026-10-01", ["suicide"])
+    monkeypatch.setattr(app_main, "FEATURE_CRISIS_SAFETY", True)
+    app_main.app.state.crisis_service = CrisisSafetyService(lexicon_path=str(path))
+    db = _RecordingDB()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: db
+    try:
+        response = TestClient(app_main.app).post("/analyze", json={"user_text": "I'm thinking about suicide"})
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    assert response.json()["crisis_detected"] is True
+    assert db.crisis_events == [{"keywords": ["suicide"], "lexicon_version": "2026-10-01"}]
+
+
+def test_admin_reload_endpoint(tmp_path, monkeypatch):
+    path = tmp_path / "lexicon.json"
+    _write(path, "v1", ["suicide"])
+    service = CrisisSafetyService(lexicon_path=str(path))
+    reloader = LexiconReloader(str(path))
+    reloader.service = service
+    monkeypatch.setattr(app_main, "lexicon_reloader", reloader)
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    client = TestClient(app_main.app)
+    headers = {"X-Admin-Token": "secret"}
+
+    _write(path, "v2", ["suicide", "hopeless"])
+    response = client.post("/admin/crisis-lexicon/reload", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["outcome"] == "applied"
+    assert response.json()["active"] == {"version": "v2", "source": str(path), "keywords": 2, "fuzzy_distance": 0}
+
+    _write(path, "v3", [])
+    assert client.post("/admin/crisis-lexicon/reload", headers=headers).status_code == 422
+    assert client.get("/admin/crisis-lexicon", headers=headers).json()["active"]["version"] == "v2"
+
+    reloader.path = None
+    assert client.post("/admin/crisis-lexicon/reload", headers=headers).status_code == 400
@@ -0,0 +1,101 @@
+import random
+import re
+
+import pytest
+
+from app.crisis import CrisisSafetyService
+from app.matcher import FuzzyKeywordMatcher, KeywordMatcher, edit_distance, is_boundary
+
+
+def _regex_findall(keywords, text):
+    pattern = re.compile(r"\b(" + "|".join(re.escape(k) for k in keywords) + r")\b", re.IGNORECASE)
+    return pattern.findall(text.lower())
+
+
+@pytest.mark.parametrize(
+    "keywords, text",
+    [
+        (["self harm", "self-harm", "harm myself"], "Thoughts of self-harm and self harm; I harm myself."),
+        # Earlier keyword wins at the same position, as in the regex alternation
+        (["end it", "end it all"], "I want to end it all"),
+        (["end it all", "end it"], "I want to end it all"),
+        # A keyword rejected by its trailing boundary lets a later one match
+        (["give upx", "give up"], "i give up now"),
+        # Overlapping keywords: matching resumes after the chosen one
+        (["no point", "point less", "pointless"], "there's no point less to say, pointless"),
+        (["-x", "x-"], "a -x b x- c"),
+        (["Suicide", "OD"], "SUICIDE thoughts, od'd yesterday, methodology"),
+        (["café", "naïve"], "Le Café était naïve, cafés"),
+    ],
+)
+def test_matches_regex_semantics(keywords, text):
+    assert KeywordMatcher(keywords).find_all(text) == _regex_findall(keywords, text)
+
+
+def test_matches_regex_on_random_text():
+    rng = random.Random(7)
+    keywords = CrisisSafetyService.DEFAULT_KEYWORDS
+    vocabulary = [w for k in keywords for w in re.split(r"(\W)", k) if w] + ["the", "a", "my", "x", "-", ".", "  "]
+    matcher = KeywordMatcher(keywords)
+    for _ in range(300):
+        text = "".join(rng.choice(vocabulary) + rng.choice(["", " "]) for _ in range(rng.randint(1, 40)))
+        assert matcher.find_all(text) == _regex_findall(keywords, text), text
+
+
+def test_shared_suffixes_report_every_keyword():
+    matcher = KeywordMatcher(["he", "she", "hers", "his"])
+    assert matcher.find_all("she his hers he") == ["she", "his", "hers", "he"]
+    assert matcher.find_all("ushers") == []
+
+
+def test_empty_keywords_are_ignored():
+    matcher = KeywordMatcher(["", "abuse", ""])
+    assert len(matcher) == 1
+    assert matcher.find_all("words without keywords") == []
+    assert KeywordMatcher([]).find_all("anything") == []
+
+
+def test_is_boundary_matches_regex_word_definition():
+    text = "a_b c-d é!"
+    expected = {m.start() for m in re.finditer(r"\b", text)}
+    assert {i for i in range(len(text) + 1) if is_boundary(text, i)} == expected
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("overdose", "overdoes", 2) == 1
+    assert edit_distance("suicide", "suicde", 2) == 1
+    assert edit_distance("suicide", "sucide", 2) == 1
+    assert edit_distance("kill", "bill", 2) == 1
+    assert edit_distance("hopeless", "hopeful", 1) == 2  # over the limit
+
+
+def test_fuzzy_matcher_respects_word_lengths_and_first_letter():
+    matcher = FuzzyKeywordMatcher(["kill myself", "overdose", "rape", "cutting"])
+
+    assert matcher.find_all("gonna kill myslef") == [(6, 17, "kill myself")]
+    # Short phrase words: exact only
+    assert matcher.find_all("gonna kil myself") == []
+    assert matcher.find_all("overdse") == [(0, 7, "overdose")]
+    # Single short keyword: exact only
+    assert matcher.find_all("rope and grape") == []
+    # First letter must match
+    assert matcher.find_all("putting") == []
+    # Phrase words must be adjacent
+    assert matcher.find_all("kill. myself") == []
+
+
+def test_fuzzy_matcher_distance_two():
+    matcher = FuzzyKeywordMatcher(["overdose"], max_distance=2)
+    assert matcher.find_all("ovrdoes") == [(0, 7, "overdose")]
+    assert FuzzyKeywordMatcher(["overdose"], max_distance=1).find_all("ovrdoes") == []
+
+
+def test_fuzzy_matcher_is_near_linear_in_text_length():
+    matcher = FuzzyKeywordMatcher(CrisisSafetyService.DEFAULT_KEYWORDS)
+    text = "I keep putting things off and feel suicde " * 120
+
+    matches = matcher.find_all(text)
+
+    assert len(matches) == 120
+    # Repeated words are looked up once
+    assert len(matcher._cache) < 20
@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import inference
+from app import main as app_main
+from app.ai import query_local_ai
+from app.inference import get_active_model, set_active_model
+from app.model_swap import ModelSwapManager, SwapInProgressError
+from app.ai import AI_INPUT_TOKENS
+from app.residency import AI_REQUEST_LATENCY, model_residency
+
+GOOD = '{"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "r"}'
+
+
+class _FakeBackend:
+    name = "fake"
+    supports_swap = True
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.pulled = []
+        self.warmed = []
+        self.classified = []
+        self.delay = 0.0
+
+    def default_model(self):
+        return "old:3b"
+
+    async def pull(self, model, timeout=1800.0):
+        self.pulled.append(model)
+
+    async def warm(self, model, keep_alive, timeout=120.0):
+        self.warmed.append(model)
+
+    async def classify(self, prompt, model, required_fields=(), stream_early_stop=False, options=None, stop_at_fields=False):
+        await asyncio.sleep(self.delay)
+        self.classified.append(model)
+        if model in self.broken:
+            return {"response": "not json"}
+        return {"response": GOOD}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = _FakeBackend()
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", fake)
+    monkeypatch.setattr(model_residency, "backend", fake)
+    monkeypatch.setattr(model_residency, "models", ["old:3b"])
+    set_active_model(None)
+    yield fake
+    set_active_model(None)
+
+
+def test_swap_pulls_warms_smoke_tests_then_switches(backend):
+    manager = ModelSwapManager()
+
+    async def run():
+        manager.start_swap("new:1b")
+        await manager.wait()
+
+    asyncio.run(run())
+
+    assert backend.pulled == ["new:1b"]
+    assert backend.warmed == ["new:1b"]
+    assert backend.classified == ["new:1b"]
+    assert get_active_model() == "new:1b"
+    status = manager.status()
+    assert status["state"] == "switched"
+    assert status["previous_model"] == "old:3b"
+    # The old model stays warm so rollback is instant
+    assert model_residency.models == ["new:1b", "old:3b"]
+
+
+def test_smoke_test_stays_out_of_production_metrics(backend):
+    manager = ModelSwapManager()
+    inputs_before = AI_INPUT_TOKENS.count(stage="original")
+
+    async def run():
+        manager.start_swap("metrics-check:1b")
+        await manager.wait()
+
+    asyncio.run(run())
+
+    assert backend.classified == ["metrics-check:1b"]
+    assert AI_REQUEST_LATENCY.count(model="metrics-check:1b", residency="warm") == 0
+    assert AI_REQUEST_LATENCY.count(model="metrics-check:1b", residency="cold") == 0
+    assert AI_INPUT_TOKENS.count(stage="original") == inputs_before
+
+
+def test_failed_smoke_test_keeps_current_model(backend):
+    backend.broken = {"bad:1b"}
+    manager = ModelSwapManager()
+
+    async def run():
+        manager.start_swap("bad:1b")
+        await manager.wait()
+
+    asyncio.run(run())
+
+    assert get_active_model() == "old:3b"
+    assert manager.state == "failed"
+    assert "Smoke classification failed" in manager.error
+
+
+def test_in_flight_request_finishes_on_old_model(backend):
+    backend.delay = 0.05
+    manager = ModelSwapManager()
+
+    async def run():
+        live = asyncio.create_task(query_local_ai("I can't start my work"))
+        await asyncio.sleep(0)  # the live request has read the active model
+        manager.start_swap("new:1b")
+        with pytest.raises(SwapInProgressError):
+            manager.start_swap("other:1b")
+        await manager.wait()
+        await live
+
+    asyncio.run(run())
+
+    assert backend.classified[0] == "old:3b"
+    assert get_active_model() == "new:1b"
+
+
+def test_rollback_restores_previous_model(backend):
+    manager = ModelSwapManager()
+    with pytest.raises(ValueError):
+        manager.rollback()
+
+    async def run():
+        manager.start_swap("new:1b")
+        await manager.wait()
+
+    asyncio.run(run())
+    status = manager.rollback()
+
+    assert get_active_model() == "old:3b"
+    assert status["state"] == "rolled_back"
+    assert status["previous_model"] == "new:1b"
+    assert [h["outcome"] for h in status["history"]] == ["switched", "rolled_back"]
+
+
+def test_admin_endpoints_require_token(monkeypatch, backend):
+    client = TestClient(app_main.app)
+
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/admin/model").status_code == 403
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/admin/model").status_code == 401
+    response = client.get("/admin/model", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["active_model"] == "old:3b"
+
+    monkeypatch.setattr(app_main, "model_swap", ModelSwapManager())
+    rollback = client.post("/admin/model/rollback", headers={"X-Admin-Token": "secret"})
+    assert rollback.status_code == 400
+
+
+def test_keep_warm_list_holds_only_active_and_previous(backend):
+    manager = ModelSwapManager()
+
+    async def run():
+        for model in ("new:1b", "newer:1b"):
+            manager.start_swap(model)
+            await manager.wait()
+
+    asyncio.run(run())
+    assert model_residency.models == ["newer:1b", "new:1b"]
+
+    manager.rollback()
+    assert model_residency.models == ["new:1b", "newer:1b"]
+
+
+def test_swap_is_refused_up_front_when_backend_cannot_swap(monkeypatch, backend):
+    monkeypatch.setattr(backend, "supports_swap", False, raising=False)
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(app_main, "model_swap", ModelSwapManager())
+
+    response = TestClient(app_main.app).post(
+        "/admin/model", json={"model": "new:1b"}, headers={"X-Admin-Token": "secret"}
+    )
+
+    assert response.status_code == 400
+    assert "cannot switch models" in response.json()["detail"]
+    assert backend.pulled == []
@@ -0,0 +1,97 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.ai import query_local_ai
+from app.preprocess import estimate_tokens, score_sentence, split_sentences, trim_to_budget
+
+FILLER = "We went to the shop and then walked along the river for a while. "
+
+
+def test_short_text_is_returned_unchanged():
+    text = "I can't start my work today."
+    result = trim_to_budget(text, budget=512)
+
+    assert result.text == text
+    assert result.was_trimmed is False
+    assert result.original_chars == result.trimmed_chars == len(text)
+
+
+def test_long_text_is_trimmed_within_budget():
+    text = FILLER * 60 + "I feel so anxious and worried about everything."
+    result = trim_to_budget(text, budget=64)
+
+    assert result.was_trimmed is True
+    assert result.trimmed_tokens <= 64
+    assert result.original_chars == len(text)
+    assert result.trimmed_chars == len(result.text)
+    assert "anxious and worried" in result.text
+
+
+def test_salient_sentences_are_preferred_and_keep_order():
+    text = (
+        FILLER * 20
+        + "I feel ashamed of how I acted. "
+        + FILLER * 20
+        + "Nobody wants to see me and I am so lonely. "
+        + FILLER * 20
+    )
+    result = trim_to_budget(text, budget=48)
+
+    assert "ashamed" in result.text
+    assert "lonely" in result.text
+    assert result.text.index("ashamed") < result.text.index("lonely")
+
+
+def test_single_oversized_sentence_is_truncated():
+    text = "I am overwhelmed " + "and " * 2000 + "done"
+    result = trim_to_budget(text, budget=32)
+
+    assert result.trimmed_tokens <= 32
+    assert result.text.startswith("I am overwhelmed")
+
+
+def test_budget_read_from_env(monkeypatch):
+    monkeypatch.setenv("AI_INPUT_TOKEN_BUDGET", "16")
+    result = trim_to_budget(FILLER * 10)
+
+    assert result.trimmed_tokens <= 16
+
+
+def test_scoring_ranks_emotional_sentences_higher():
+    assert score_sentence("I'm panicking and scared") > score_sentence("The bus was late on Tuesday")
+
+
+def test_split_and_estimate_helpers():
+    assert split_sentences("One. Two! Three?") == ["One.", "Two!", "Three?"]
+    assert estimate_tokens("a" * 400) == 100
+
+
+def test_query_local_ai_sends_trimmed_text(monkeypatch):
+    monkeypatch.setenv("AI_INPUT_TOKEN_BUDGET", "64")
+    text = FILLER * 70 + "I feel hopeless about my deadlines."
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {"response": '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "x"}'}
+
+        def raise_for_status(self):
+            pass
+
+    class FakeClient:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    client = FakeClient()
+    client.post = AsyncMock(return_value=FakeResponse())
+    with patch("app.ai.httpx.AsyncClient", return_value=client):
+        result = asyncio.run(query_local_ai(text))
+
+    prompt = client.post.call_args.kwargs["json"]["prompt"]
+    assert result["detected_node"] == "Stress"
+    assert "deadlines" in prompt
+    assert prompt.count("shop") < text.count("shop")
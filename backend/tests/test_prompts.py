@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+from app import inference
+from app.ai import query_local_ai
+from app.prompts import PROMPT_REGISTRY, PromptRegistry, PromptVariant, model_tier, strip_reasoning
+from benchmarks.classifier_bench import main as bench_main
+from benchmarks.classifier_bench import prompt_measurements
+
+SYSTEM = 'Pick a state.\nReturn ONLY JSON: {"node": "Stress", "confidence": 0.8, "reasoning": "brief explanation"}'
+
+
+def _registry():
+    return PromptRegistry(
+        [
+            PromptVariant("full", "", SYSTEM * 4, latency_ms={"small": 900.0}, accuracy={"small": 0.90}),
+            PromptVariant("compact", "", SYSTEM * 2, latency_ms={"small": 500.0}, accuracy={"small": 0.89}),
+            PromptVariant("minimal", "", SYSTEM, latency_ms={"small": 300.0}, accuracy={"small": 0.80}),
+        ],
+        default_version="full",
+    )
+
+
+def test_model_tier_uses_parameter_count_and_overrides(monkeypatch):
+    monkeypatch.delenv("AI_MODEL_TIERS", raising=False)
+    assert model_tier("llama3.2:1b") == "small"
+    assert model_tier("llama3.2:3b") == "medium"
+    assert model_tier("qwen2.5:14b-instruct") == "large"
+    assert model_tier("custom-model") == "medium"
+
+    monkeypatch.setenv("AI_MODEL_TIERS", "custom-model=small")
+    assert model_tier("custom-model") == "small"
+
+
+def test_auto_picks_fastest_variant_within_accuracy_budget(monkeypatch):
+    monkeypatch.delenv("AI_PROMPT_VARIANT", raising=False)
+    monkeypatch.setenv("AI_PROMPT_VARIANTS", "small=auto")
+    registry = _registry()
+
+    # minimal is fastest but 10 points less accurate; compact is within 0.02
+    assert registry.select("llama3.2:1b").version == "compact"
+
+    monkeypatch.setenv("AI_PROMPT_MAX_ACCURACY_DROP", "0.2")
+    assert registry.select("llama3.2:1b").version == "minimal"
+
+    # No measurements for the medium tier, and it is not mapped: default
+    assert registry.select("llama3.2:3b").version == "full"
+
+
+def test_forced_variant_and_unknown_versions(monkeypatch):
+    registry = _registry()
+    monkeypatch.setenv("AI_PROMPT_VARIANT", "minimal")
+    assert registry.select("llama3.2:3b").version == "minimal"
+
+    with pytest.raises(ValueError, match="Unknown prompt version"):
+        registry.get("v9")
+
+
+@pytest.mark.parametrize("setting, value", [("AI_PROMPT_VARIANT", "v9"), ("AI_PROMPT_VARIANTS", "medium=v9")])
+def test_unknown_configured_version_falls_back_to_default(monkeypatch, caplog, setting, value):
+    monkeypatch.delenv("AI_PROMPT_VARIANT", raising=False)
+    monkeypatch.setenv(setting, value)
+    registry = _registry()
+
+    assert registry.select("llama3.2:3b").version == "full"
+    assert registry.select("llama3.2:3b").version == "full"
+    # Logged once, not on every request
+    assert len([r for r in caplog.records if "Unknown prompt version" in r.getMessage()]) == 1
+
+
+def test_render_strips_reasoning_for_label_only_calls():
+    variant = PromptVariant("v", "", SYSTEM)
+
+    assert '"reasoning"' in variant.render("hi")
+    label_only = variant.render("hi", include_reasoning=False)
+    assert '"reasoning"' not in label_only
+    assert label_only.endswith('Journal entry: "hi"\n\nJSON response:')
+    assert strip_reasoning(SYSTEM) in label_only
+
+
+def test_builtin_variants_get_shorter():
+    tokens = [v.prompt_tokens for v in PROMPT_REGISTRY.variants()]
+    assert tokens == sorted(tokens, reverse=True)
+
+
+def test_load_measurements_attaches_benchmark_results(tmp_path):
+    path = tmp_path / "measurements.json"
+    path.write_text(json.dumps({"compact": {"latency_ms": {"medium": 120.0}, "accuracy": {"medium": 0.91}}, "gone": {}}))
+    registry = _registry()
+
+    registry.load_measurements(str(path))
+    registry.load_measurements(str(tmp_path / "missing.json"))
+
+    assert registry.get("compact").latency_ms == {"medium": 120.0}
+    assert registry.get("compact").accuracy == {"medium": 0.91}
+
+
+class _FakeBackend:
+    name = "fake"
+
+    def __init__(self):
+        self.prompts = []
+
+    def default_model(self):
+        return "fake:1b"
+
+    async def classify(self, prompt, model, required_fields=(), stream_early_stop=False, options=None, stop_at_fields=False):
+        self.prompts.append(prompt)
+        return {"response": '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "r"}'}
+
+
+def test_prediction_records_prompt_version(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", backend)
+    monkeypatch.setenv("AI_PROMPT_VARIANT", "v3-minimal")
+
+    result = asyncio.run(query_local_ai("I'm behind on deadlines"))
+
+    assert result["prompt_version"] == "v3-minimal"
+    assert backend.prompts[0].startswith(PROMPT_REGISTRY.get("v3-minimal").system)
+
+
+def test_misconfigured_prompt_version_still_classifies(monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.delenv("AI_PROMPT_VARIANT", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", backend)
+    monkeypatch.setenv("AI_PROMPT_VARIANTS", "small=v9-typo,medium=v9-typo,large=v9-typo")
+
+    result = asyncio.run(query_local_ai("I'm behind on deadlines"))
+
+    assert result["detected_node"] == "Stress"
+    assert result["prompt_version"] == PROMPT_REGISTRY.default_version
+
+
+def test_prompt_measurements_use_lowest_concurrency_run():
+    runs = [
+        {"prompt_version": "a", "concurrency": 4, "latency_ms": {"p50": 400.0}, "accuracy": 0.8},
+        {"prompt_version": "a", "concurrency": 1, "latency_ms": {"p50": 100.0}, "accuracy": 0.9},
+    ]
+    existing = {"a": {"latency_ms": {"large": 50.0}, "accuracy": {"large": 0.95}}}
+
+    merged = prompt_measurements(runs, "small", existing)
+
+    assert merged["a"] == {"latency_ms": {"large": 50.0, "small": 100.0}, "accuracy": {"large": 0.95, "small": 0.9}}
+
+
+def test_bench_cli_compares_prompt_variants(tmp_path, capsys):
+    measurements = tmp_path / "measurements.json"
+    assert bench_main(["--stub", "--stub-time-scale", "0", "--prompt-variant", "v1-full,v3-minimal",
+                       "--save-prompt-measurements", str(measurements)]) == 0
+
+    saved = json.loads(measurements.read_text())
+    assert set(saved) == {"v1-full", "v3-minimal"}
+    assert "ollama/v1-full -> ollama/v3-minimal concurrency=1" in capsys.readouterr().out
+
+    assert bench_main(["--stub", "--prompt-variant", "v9"]) == 2
@@ -0,0 +1,170 @@
+"""Tests for the versioned read-through cache behind the analytics reads."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.db import BehavioralStateManager
+from app.read_cache import ReadCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hit_until_version_changes():
+    cache = ReadCache(ttl=30)
+    version = ["v1"]
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get("k", lambda: version[0], compute) == 1
+    assert cache.get("k", lambda: version[0], compute) == 1
+    version[0] = "v2"
+    assert cache.get("k", lambda: version[0], compute) == 2
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_served_stale_while_one_reader_refreshes():
+    clock = _Clock()
+    cache = ReadCache(ttl=10, clock=clock)
+    cache.get("k", lambda: "v1", lambda: "old")
+    clock.now = 11
+    refreshing = threading.Event()
+    release = threading.Event()
+
+    def slow_refresh():
+        refreshing.set()
+        release.wait(5)
+        return "new"
+
+    leader = threading.Thread(target=lambda: cache.get("k", lambda: "v1", slow_refresh))
+    leader.start()
+    assert refreshing.wait(5)
+
+    # Another reader is not blocked and does not query again
+    assert cache.get("k", lambda: "v1", lambda: pytest.fail("second query")) == "old"
+
+    release.set()
+    leader.join(5)
+    assert cache.get("k", lambda: "v1", lambda: pytest.fail("third query")) == "new"
+
+
+def test_concurrent_misses_run_one_query():
+    cache = ReadCache(ttl=30)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", lambda: "v1", compute))) for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_failed_query_is_not_cached_and_waiters_retry():
+    cache = ReadCache(ttl=30)
+
+    def boom():
+        raise RuntimeError("neo4j down")
+
+    with pytest.raises(RuntimeError):
+        cache.get("k", lambda: "v1", boom)
+    assert cache.get("k", lambda: "v1", lambda: "ok") == "ok"
+
+
+def test_write_during_query_leaves_entry_out_of_date():
+    cache = ReadCache(ttl=30)
+    version = ["v1"]
+
+    def compute_then_write():
+        version[0] = "v2"
+        return "before write"
+
+    cache.get("k", lambda: version[0], compute_then_write)
+    assert cache.get("k", lambda: version[0], lambda: "after write") == "after write"
+
+
+class _Session:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def run(self, query, *args, **params):
+        self.driver.queries.append(query)
+        if self.driver.fail:
+            raise RuntimeError("neo4j down")
+        return [{"state": "Stress", "count": 3}]
+
+
+class _Driver:
+    def __init__(self):
+        self.queries = []
+        self.fail = False
+
+    def session(self):
+        return _Session(self)
+
+
+@pytest.fixture
+def manager():
+    driver = _Driver()
+    with patch("app.db.GraphDatabase.driver", return_value=driver):
+        with patch.object(BehavioralStateManager, "_bootstrap_nodes"):
+            yield BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+
+def test_manager_caches_reads_until_a_write(manager):
+    assert manager.get_trend_stats() == {"Stress": 3}
+    assert manager.get_trend_stats() == {"Stress": 3}
+    assert len(manager.driver.queries) == 1
+
+    manager.record_journal_outcome("e1", "helped")
+    manager.get_trend_stats()
+    assert len(manager.driver.queries) == 3
+
+
+def test_manager_does_not_cache_failed_reads(manager):
+    manager.driver.fail = True
+    assert manager.get_trend_stats() == {}
+    manager.driver.fail = False
+
+    assert manager.get_trend_stats() == {"Stress": 3}
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("DB_READ_CACHE_TTL_SECONDS", "0")
+    with patch("app.db.GraphDatabase.driver", return_value=_Driver()):
+        with patch.object(BehavioralStateManager, "_bootstrap_nodes"):
+            manager = BehavioralStateManager(uri="bolt://localhost:7687", user="neo4j", password="test")
+
+    manager.get_trend_stats()
+    manager.get_trend_stats()
+    assert len(manager.driver.queries) == 2
@@ -0,0 +1,115 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.residency import AI_REQUEST_LATENCY, ModelResidencyManager, model_residency
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            request = httpx.Request("POST", "http://localhost")
+            raise httpx.HTTPStatusError("HTTP error", request=request, response=self)
+
+
+class RecordingClient:
+    def __init__(self, response):
+        self._response = response
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def post(self, url, json=None, **kwargs):
+        self.calls.append((url, json))
+        return self._response
+
+
+def test_warm_marks_model_resident_and_sends_tiny_generate():
+    manager = ModelResidencyManager(models=["tiny:1b"], ollama_url="http://ollama:11434")
+    client = RecordingClient(FakeResponse({"response": "ok"}))
+
+    assert manager.ready is False
+    with patch("app.inference.httpx.AsyncClient", return_value=client):
+        assert asyncio.run(manager.warm_all()) is True
+
+    assert manager.ready is True
+    url, payload = client.calls[0]
+    assert url == "http://ollama:11434/api/generate"
+    assert payload["model"] == "tiny:1b"
+    assert payload["options"]["num_predict"] == 1
+    assert payload["keep_alive"] == manager.keep_alive
+
+
+def test_warm_failure_keeps_manager_not_ready():
+    manager = ModelResidencyManager(models=["tiny:1b"])
+    client = RecordingClient(FakeResponse({}, status_code=500))
+
+    with patch("app.inference.httpx.AsyncClient", return_value=client):
+        assert asyncio.run(manager.warm_all()) is False
+
+    assert manager.ready is False
+    assert manager.status()["models"] == {"tiny:1b": "loading"}
+
+
+def test_ping_only_targets_idle_or_unloaded_models():
+    manager = ModelResidencyManager(models=["busy:1b", "idle:1b"], ping_interval=60)
+    manager.record_request("busy:1b", 0.2, was_resident=True)
+    manager.mark_unloaded("idle:1b")
+    client = RecordingClient(FakeResponse({"response": "ok"}))
+
+    with patch("app.inference.httpx.AsyncClient", return_value=client):
+        asyncio.run(manager.ping_idle_models())
+
+    assert [payload["model"] for _, payload in client.calls] == ["idle:1b"]
+
+
+def test_record_request_labels_cold_and_warm_latency():
+    manager = ModelResidencyManager(models=["label-test:1b"])
+    cold_before = AI_REQUEST_LATENCY.count(model="label-test:1b", residency="cold")
+    warm_before = AI_REQUEST_LATENCY.count(model="label-test:1b", residency="warm")
+
+    assert manager.record_request("label-test:1b", 4.0, was_resident=False) == "cold"
+    assert manager.record_request("label-test:1b", 0.3, was_resident=True) == "warm"
+    # Server-reported reload counts as cold even if we believed it was resident
+    assert manager.record_request("label-test:1b", 3.0, was_resident=True, load_duration_seconds=2.5) == "cold"
+
+    assert AI_REQUEST_LATENCY.count(model="label-test:1b", residency="cold") == cold_before + 2
+    assert AI_REQUEST_LATENCY.count(model="label-test:1b", residency="warm") == warm_before + 1
+
+
+def test_ready_endpoint_reflects_residency(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(model_residency, "models", ["ready-test:1b"])
+    monkeypatch.setattr(model_residency, "_resident", {})
+    client = TestClient(app_main.app)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["models"] == {"ready-test:1b": "loading"}
+
+    model_residency.record_request("ready-test:1b", 0.1, was_resident=False)
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+
+
+def test_metrics_endpoint_exports_latency_histogram():
+    model_residency.record_request("metrics-test:1b", 0.1, was_resident=True)
+    response = TestClient(app_main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert 'ai_request_latency_seconds_count{model="metrics-test:1b",residency="warm"}' in response.text
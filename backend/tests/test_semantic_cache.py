@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from app import ai, inference
+from app.ai import UNAVAILABLE_REASONING, query_local_ai
+from app.semantic_cache import DEFAULT_CAPACITY_PURE_PYTHON, SEMANTIC_CACHE_LOOKUPS, SemanticCache
+
+PRED = {"detected_node": "Procrastination", "emotion_sublabel": "Avoidance", "confidence": 0.9, "reasoning": "r"}
+
+
+def test_lookup_returns_close_match_above_threshold():
+    cache = SemanticCache(capacity=4, threshold=0.9, use_numpy=False)
+    cache.add([1.0, 0.0, 0.0], "m|full", PRED)
+
+    hit = cache.lookup([0.95, 0.1, 0.0], "m|full")
+    assert hit is not None
+    prediction, similarity = hit
+    assert prediction == PRED
+    assert similarity > 0.99
+
+    assert cache.lookup([0.0, 1.0, 0.0], "m|full") is None  # orthogonal
+    assert cache.lookup([1.0, 0.0, 0.0], "other|full") is None  # different model/prompt
+    assert cache.stats()["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_cached_prediction_is_a_copy():
+    cache = SemanticCache(capacity=2, use_numpy=False)
+    cache.add([1.0, 0.0], "ns", PRED)
+
+    first, _ = cache.lookup([1.0, 0.0], "ns")
+    first["detected_node"] = "Changed"
+
+    assert cache.lookup([1.0, 0.0], "ns")[0]["detected_node"] == "Procrastination"
+
+
+def test_capacity_evicts_least_recently_used():
+    cache = SemanticCache(capacity=2, threshold=0.99, use_numpy=False)
+    cache.add([1.0, 0.0, 0.0], "ns", {**PRED, "detected_node": "A"})
+    cache.add([0.0, 1.0, 0.0], "ns", {**PRED, "detected_node": "B"})
+    cache.lookup([1.0, 0.0, 0.0], "ns")  # A is now more recent than B
+
+    cache.add([0.0, 0.0, 1.0], "ns", {**PRED, "detected_node": "C"})
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0], "ns")[0]["detected_node"] == "A"
+    assert cache.lookup([0.0, 1.0, 0.0], "ns") is None
+
+
+def test_expired_entries_are_not_returned():
+    cache = SemanticCache(capacity=2, ttl_seconds=0.0, use_numpy=False)
+    cache.add([1.0, 0.0], "ns", PRED)
+
+    assert cache.lookup([1.0, 0.0], "ns") is None
+
+
+class _EmbeddingBackend:
+    """Embeds by keyword so paraphrases land on the same vector."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.classified = 0
+
+    def default_model(self):
+        return "fake:1b"
+
+    async def embed(self, text, model=None):
+        lowered = text.lower()
+        return [1.0 if "work" in lowered else 0.0, 1.0 if "alone" in lowered else 0.0, 0.1]
+
+    async def classify(self, prompt, model, required_fields=(), stream_early_stop=False, options=None, stop_at_fields=False):
+        self.classified += 1
+        return {"response": '{"node": "Procrastination", "sublabel": "Avoidance", "confidence": 0.9, "reasoning": "r"}'}
+
+
+@pytest.fixture
+def cached_backend(monkeypatch):
+    backend = _EmbeddingBackend()
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", backend)
+    monkeypatch.setenv("AI_SEMANTIC_CACHE", "true")
+    monkeypatch.setattr(ai, "semantic_cache", SemanticCache(capacity=8, threshold=0.95, use_numpy=False))
+    return backend
+
+
+def test_paraphrase_reuses_classification(cached_backend):
+    hits_before = SEMANTIC_CACHE_LOOKUPS.value(result="hit")
+
+    first = asyncio.run(query_local_ai("I can't start my work"))
+    second = asyncio.run(query_local_ai("I can't get started on work"))
+
+    assert cached_backend.classified == 1
+    # The cached reasoning explained the first entry; the hit comes back without it
+    assert second == {**first, "reasoning": ""}
+    assert SEMANTIC_CACHE_LOOKUPS.value(result="hit") == hits_before + 1
+
+    asyncio.run(query_local_ai("I feel so alone tonight"))
+    assert cached_backend.classified == 2
+
+
+def test_model_override_bypasses_cache(cached_backend):
+    asyncio.run(query_local_ai("I can't start my work"))
+    asyncio.run(query_local_ai("I can't start my work", model="candidate:1b"))
+
+    assert cached_backend.classified == 2
+
+
+def test_fallbacks_are_not_cached(cached_backend, monkeypatch):
+    async def unavailable(text, request_id="", include_reasoning=True, model=None, record_metrics=True):
+        return {**PRED, "reasoning": UNAVAILABLE_REASONING}
+
+    monkeypatch.setattr(ai, "_query_single", unavailable)
+    asyncio.run(query_local_ai("I can't start my work"))
+
+    assert len(ai.semantic_cache) == 0
+
+
+def test_default_capacity_is_smaller_without_numpy(monkeypatch):
+    monkeypatch.delenv("AI_SEMANTIC_CACHE_SIZE", raising=False)
+    cache = SemanticCache(use_numpy=False)
+    assert cache.capacity == DEFAULT_CAPACITY_PURE_PYTHON
+
+    cache.configure()
+    assert cache.capacity == DEFAULT_CAPACITY_PURE_PYTHON
@@ -0,0 +1,78 @@
+"""Tests for the trusted JSON response path."""
+
+import json
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app import serialization
+from app.models import AnalysisResponse, JournalEntryResponse
+from app.serialization import TrustedJSONResponse, shaper
+from benchmarks.serialization_bench import analysis_payload, journal_rows, validated
+
+
+def test_trusted_output_matches_response_model_validation():
+    payload = analysis_payload()
+    # Keys the handler may carry that are not part of the response contract
+    payload["intervention_variants"][0]["internal_note"] = "not for clients"
+    payload["debug"] = True
+
+    body = json.loads(TrustedJSONResponse(payload, AnalysisResponse).body)
+
+    assert body == json.loads(validated(AnalysisResponse)(payload))
+    assert "debug" not in body
+    assert "internal_note" not in body["intervention_variants"][0]
+    assert body["crisis_detected"] is None
+    assert body["personal_loop"]["cycle_length_hours"] == 4.5
+    assert body["intervention_effectiveness"]["Physiological Sigh"]["percentage"] == 62
+
+
+def test_rows_that_already_match_are_not_copied():
+    rows = journal_rows(3)
+    shaped = shaper(List[JournalEntryResponse])(rows)
+
+    assert all(out is row for out, row in zip(shaped, rows))
+
+
+def test_missing_optional_fields_take_defaults():
+    row = journal_rows(1)[0]
+    del row["prompt_version"], row["user_notes"]
+
+    assert shaper(JournalEntryResponse)(row)["prompt_version"] is None
+
+
+def test_stdlib_fallback_without_orjson(monkeypatch):
+    payload = analysis_payload()
+    fast = TrustedJSONResponse(payload, AnalysisResponse).body
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    assert json.loads(TrustedJSONResponse(payload, AnalysisResponse).body) == json.loads(fast)
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        serialization.dumps({"value": object()})
+
+
+def test_journal_entries_endpoint_records_serialization_time():
+    class _DB:
+        is_available = True
+        data_version = "v1"
+
+        def get_journal_entries(self, limit=50):
+            return journal_rows(limit)
+
+    before = serialization.RESPONSE_SERIALIZATION.count(endpoint="journal_entries")
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: _DB()
+    try:
+        response = TestClient(app_main.app).get("/journal-entries", params={"limit": 500})
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert len(response.json()) == 500
+    assert serialization.RESPONSE_SERIALIZATION.count(endpoint="journal_entries") == before + 1
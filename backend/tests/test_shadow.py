@@ -0,0 +1,168 @@
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.ai import UNAVAILABLE_REASONING
+from app.shadow import SHADOW_COMPARISONS, ShadowEvaluator
+
+
+def prediction(node, sublabel="Overload", reasoning="r"):
+    return {"detected_node": node, "emotion_sublabel": sublabel, "confidence": 0.9, "reasoning": reasoning}
+
+
+def test_record_tracks_agreement_fallbacks_and_latency():
+    evaluator = ShadowEvaluator(sample_rate=1.0, candidate_model="small:1b", candidate_prompt="classify_only")
+    before = SHADOW_COMPARISONS.value(candidate="small:1b/classify_only", node_agreement="true")
+
+    evaluator.record(prediction("Stress"), 0.8, prediction("Stress"), 0.2)
+    evaluator.record(prediction("Stress"), 0.8, prediction("Stress", "Tension"), 0.2)
+    evaluator.record(prediction("Shame"), 0.9, prediction("Stress", reasoning=UNAVAILABLE_REASONING), 0.1)
+
+    report = evaluator.report()
+    assert report["samples"] == 3
+    assert report["node_agreement_rate"] == pytest.approx(0.6667)
+    assert report["sublabel_agreement_rate"] == pytest.approx(0.3333)
+    assert report["fallback_rate"] == {"production": 0.0, "candidate": 0.3333}
+    assert report["latency"]["candidate"]["p50_ms"] == 200.0
+    assert report["latency"]["production"]["p50_ms"] == 800.0
+    assert SHADOW_COMPARISONS.value(candidate="small:1b/classify_only", node_agreement="true") == before + 2
+
+
+def test_sampling_follows_rate():
+    evaluator = ShadowEvaluator(sample_rate=0.25, rng=random.Random(7))
+    sampled = sum(evaluator.should_sample() for _ in range(4000))
+
+    assert 850 < sampled < 1150
+    assert ShadowEvaluator(sample_rate=0.0).should_sample() is False
+
+
+def test_full_queue_drops_instead_of_blocking():
+    evaluator = ShadowEvaluator(sample_rate=1.0, max_queue=1)
+
+    assert asyncio.run(evaluator.submit("a", prediction("Stress"), 0.1)) is True
+    assert asyncio.run(evaluator.submit("b", prediction("Stress"), 0.1)) is False
+    assert evaluator.report()["dropped"] == 1
+
+
+def test_shadow_call_waits_for_live_calls():
+    order = []
+
+    async def candidate(text, request_id="", include_reasoning=True, model=None):
+        order.append(("shadow", model, include_reasoning))
+        return prediction("Stress")
+
+    evaluator = ShadowEvaluator(sample_rate=1.0, candidate_model="small:1b", candidate_prompt="classify_only", classify=candidate)
+
+    async def run():
+        async def live():
+            with evaluator.live_call():
+                await asyncio.sleep(0.05)
+                order.append(("live done",))
+
+        live_task = asyncio.create_task(live())
+        await asyncio.sleep(0)
+        await evaluator.evaluate("text", prediction("Stress"), 0.1)
+        await live_task
+
+    asyncio.run(run())
+
+    assert order == [("live done",), ("shadow", "small:1b", False)]
+    assert evaluator.samples == 1
+
+
+def test_worker_drains_queue():
+    async def candidate(text, request_id="", include_reasoning=True, model=None):
+        return prediction("Anxiety")
+
+    evaluator = ShadowEvaluator(sample_rate=1.0, classify=candidate)
+
+    async def run():
+        evaluator.start()
+        await evaluator.submit("one", prediction("Anxiety"), 0.1)
+        await evaluator.submit("two", prediction("Stress"), 0.1)
+        await asyncio.wait_for(evaluator._get_queue().join(), timeout=2)
+        await evaluator.stop()
+
+    asyncio.run(run())
+
+    assert evaluator.samples == 2
+    assert evaluator.report()["node_agreement_rate"] == 0.5
+
+
+def test_analyze_mirrors_sampled_requests(monkeypatch):
+    async def fake_query_local_ai(text, request_id=""):
+        return prediction("Stress")
+
+    class _DB:
+        def __getattr__(self, name):
+            raise RuntimeError("db unavailable")
+
+    evaluator = ShadowEvaluator(sample_rate=1.0)
+    queue = evaluator._get_queue
+    on_loop = []
+
+    def get_queue():
+        try:
+            on_loop.append(asyncio.get_running_loop() is not None)
+        except RuntimeError:
+            on_loop.append(False)
+        return queue()
+
+    monkeypatch.setattr(evaluator, "_get_queue", get_queue)
+    monkeypatch.setattr(app_main, "shadow_evaluator", evaluator)
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(app_main, "query_local_ai", fake_query_local_ai)
+    from app.crisis import CrisisSafetyService
+    app_main.app.state.crisis_service = CrisisSafetyService()
+    app_main.app.dependency_overrides[app_main.get_db] = lambda: _DB()
+    try:
+        client = TestClient(app_main.app)
+        assert client.post("/analyze", json={"user_text": "I'm behind on deadlines"}).status_code == 200
+        unauthorized = client.get("/shadow/report")
+        report = client.get("/shadow/report", headers={"X-Admin-Token": "secret"}).json()
+    finally:
+        app_main.app.dependency_overrides.clear()
+
+    # The queue is not thread-safe, so the submit must run on the event loop
+    assert on_loop == [True]
+    assert unauthorized.status_code == 401
+    assert report["queued"] == 1
+    assert report["enabled"] is True
+
+
+class _Backend:
+    name = "fake"
+
+    def default_model(self):
+        return "prod:3b"
+
+    async def classify(self, prompt, model, required_fields=(), stream_early_stop=False, options=None, stop_at_fields=False):
+        return {
+            "response": '{"node": "Stress", "sublabel": "Overload", "confidence": 0.9, "reasoning": "r"}',
+            "prompt_eval_count": 120,
+            "eval_count": 20,
+        }
+
+
+def test_shadow_calls_stay_out_of_production_metrics(monkeypatch):
+    from app import inference
+    from app.ai import AI_PROMPT_TOKENS
+    from app.residency import AI_REQUEST_LATENCY, model_residency
+
+    monkeypatch.delenv("INFERENCE_BACKEND", raising=False)
+    monkeypatch.setitem(inference._instances, "ollama", _Backend())
+    monkeypatch.setattr(model_residency, "_resident", {})
+    evaluator = ShadowEvaluator(sample_rate=1.0, candidate_model="shadow:1b")
+
+    def latency_count():
+        return sum(AI_REQUEST_LATENCY.count(model="shadow:1b", residency=r) for r in ("cold", "warm"))
+
+    before = latency_count(), AI_PROMPT_TOKENS.count(model="shadow:1b")
+    result = asyncio.run(evaluator.classify("Too much to do this week", model="shadow:1b"))
+
+    assert result["detected_node"] == "Stress"
+    assert (latency_count(), AI_PROMPT_TOKENS.count(model="shadow:1b")) == before
+    assert not model_residency.is_resident("shadow:1b")